@@ -0,0 +1,313 @@
+"""
+Bulk catalogue import for Deep-Shiva database
+Streams CSV/JSONL files into tables with COPY FROM STDIN on Postgres and batched executemany elsewhere
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from .logging_config import get_logger
+from .models import Base
+
+logger = get_logger("bulk_import")
+
+# Catalogue tables that can be refreshed from files (parents before children)
+IMPORT_TABLES = [
+    "cultural_sites", "artisans", "artisan_products", "tourism_places", "yoga_poses", "emergency_contacts"
+]
+BATCH_SIZE = 5000
+COPY_NULL = r"\N"
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, "r", newline="", encoding="utf-8")
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream dicts from a .csv or .jsonl file (optionally gzipped)"""
+    name = path[:-3] if path.endswith(".gz") else path
+    with _open(path) as handle:
+        if name.endswith(".csv"):
+            yield from csv.DictReader(handle)
+        elif name.endswith((".jsonl", ".ndjson")):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported file type: {path} (expected .csv or .jsonl)")
+
+def _coerce(column, value):
+    """Convert a CSV string (or JSON value) to the column's Python type"""
+    if value is None:
+        return None
+    column_type = column.type
+    if not isinstance(value, str):
+        return value
+    if value == "":
+        return value if isinstance(column_type, String) else None
+    if isinstance(column_type, JSON):
+        return json.loads(value)
+    if isinstance(column_type, Boolean):
+        return value.strip().lower() in TRUE_VALUES
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, Float):
+        return float(value)
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    return value
+
+def _columns(table: Table, first: Dict[str, Any]) -> List[str]:
+    """Columns named by the file plus ones with a Python-side default (COPY only applies server defaults)"""
+    unknown = [name for name in first if name not in table.c]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table.name}: {', '.join(unknown)}")
+    defaults = [
+        column.name for column in table.columns
+        if column.name not in first and column.default is not None and column.default.is_scalar
+    ]
+    return list(first) + defaults
+
+def _rows(
+    table: Table,
+    columns: List[str],
+    records: Iterable[Dict[str, Any]],
+    fixed: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    fixed = fixed or {}
+    for record in records:
+        row = {}
+        for name in columns:
+            column = table.c[name]
+            if name in record:
+                row[name] = _coerce(column, record[name])
+            elif name in fixed:
+                row[name] = fixed[name]
+            else:
+                row[name] = column.default.arg if column.default is not None and column.default.is_scalar else None
+        yield row
+
+def _copy_value(value) -> Any:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+class CopyStream(io.TextIOBase):
+    """File-like CSV view over row dicts, read lazily by cursor.copy_expert"""
+
+    def __init__(self, columns: List[str], rows: Iterator[Dict[str, Any]]):
+        self.columns = columns
+        self.rows = rows
+        self.count = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self, size: int):
+        while len(self._pending) < size:
+            batch = list(islice(self.rows, 1000))
+            if not batch:
+                break
+            self._writer.writerows([_copy_value(row[name]) for name in self.columns] for row in batch)
+            self.count += len(batch)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+    def read(self, size: int = -1) -> str:
+        self._fill(size if size and size > 0 else float("inf"))
+        if size is None or size < 0:
+            data, self._pending = self._pending, ""
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+def _copy(conn: Connection, table: Table, columns: List[str], rows: Iterator[Dict[str, Any]]) -> int:
+    """COPY FROM STDIN through the psycopg2 cursor of this connection"""
+    stream = CopyStream(columns, rows)
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            stream
+        )
+    finally:
+        cursor.close()
+    return stream.count
+
+def _executemany(conn: Connection, table: Table, rows: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return count
+        conn.execute(table.insert(), batch)
+        count += len(batch)
+
+def _secondary_indexes(table: Table):
+    """Model indexes that only speed up reads; unique ones stay to enforce constraints"""
+    return [index for index in table.indexes if not index.unique]
+
+def invalidate_read_caches():
+    """
+    Make this process's catalogue, search and geo indexes re-check their tables.
+
+    Other processes (the API when importing from the CLI) notice through the tables'
+    fingerprints, which the import moves by stamping updated_at.
+    """
+    from .catalogue import catalogue
+    from .geo_index import geo_index
+    from .search_index import search_service
+
+    for cache in (catalogue, search_service, geo_index):
+        cache.invalidate()
+
+def import_file(
+    engine: Engine,
+    table_name: str,
+    path: str,
+    replace: bool = False,
+    rebuild_indexes: Optional[bool] = None,
+    batch_size: int = BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Load one CSV/JSONL file into a catalogue table in a single transaction.
+
+    With rebuild_indexes the table's secondary indexes are dropped before the load and
+    rebuilt afterwards (one sorted build instead of per-row maintenance). Dropping an
+    index locks the table (ACCESS EXCLUSIVE on Postgres) until the load commits, so
+    by default (None) this only happens while the table is empty; pass True for
+    offline loads only. replace deletes the existing rows first. ANALYZE runs once the
+    load is committed, then the in-process read caches are invalidated.
+    """
+    if table_name not in IMPORT_TABLES:
+        raise ValueError(f"Unknown table {table_name}. Available: {', '.join(IMPORT_TABLES)}")
+    table = Base.metadata.tables[table_name]
+
+    records = read_records(path)
+    first = next(records, None)
+    report: Dict[str, Any] = {"table": table_name, "file": path, "rows": 0}
+    if first is None:
+        return report
+
+    columns = _columns(table, first)
+    fixed = {}
+    if "updated_at" in table.c and "updated_at" not in columns:
+        # Moves the change fingerprints even when counts and created_at stay the same
+        columns.append("updated_at")
+        fixed["updated_at"] = datetime.now(timezone.utc)
+    rows = _rows(table, columns, chain([first], records), fixed)
+    start = time.perf_counter()
+
+    with engine.begin() as conn:
+        dialect_name = conn.dialect.name
+        use_copy = dialect_name == "postgresql" and conn.dialect.driver == "psycopg2"
+        if rebuild_indexes is None:
+            rebuild_indexes = conn.execute(select(table.c.id).limit(1)).first() is None
+        indexes = _secondary_indexes(table) if rebuild_indexes else []
+        if replace:
+            report["deleted"] = conn.execute(table.delete()).rowcount
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+
+        load_start = time.perf_counter()
+        if use_copy:
+            report["rows"] = _copy(conn, table, columns, rows)
+        else:
+            report["rows"] = _executemany(conn, table, rows, batch_size)
+        report["load_seconds"] = round(time.perf_counter() - load_start, 3)
+
+        index_start = time.perf_counter()
+        for index in indexes:
+            index.create(conn)
+        report["index_seconds"] = round(time.perf_counter() - index_start, 3)
+
+        if dialect_name == "postgresql" and "id" in columns:
+            # Explicit ids bypass the sequence; move it past them
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table_name}), 1))"
+            ))
+
+    analyze_start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f"ANALYZE {table_name}"))
+    report["analyze_seconds"] = round(time.perf_counter() - analyze_start, 3)
+    invalidate_read_caches()
+
+    total = time.perf_counter() - start
+    report.update({
+        "method": "copy" if use_copy else "executemany",
+        "indexes_rebuilt": [index.name for index in indexes],
+        "seconds": round(total, 3),
+        "rows_per_sec": round(report["rows"] / total) if total > 0 else None
+    })
+    logger.info("Bulk import completed", extra=report)
+    return report
+
+def _table_for(path: str) -> str:
+    """Table named by the file, e.g. tourism_places.csv or tourism_places.jsonl.gz"""
+    name = os.path.basename(path)
+    return name.split(".", 1)[0]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from .database import engine
+
+    parser = argparse.ArgumentParser(description="Bulk import catalogue CSV/JSONL files")
+    parser.add_argument("files", nargs="+", help="<table>.csv / <table>.jsonl (optionally .gz)")
+    parser.add_argument("--table", help="target table (default: taken from each file name)")
+    parser.add_argument("--replace", action="store_true", help="delete existing rows first")
+    indexes = parser.add_mutually_exclusive_group()
+    indexes.add_argument(
+        "--rebuild-indexes", dest="rebuild_indexes", action="store_true", default=None,
+        help="drop and rebuild secondary indexes even if the table has rows (locks it: offline loads only)"
+    )
+    indexes.add_argument(
+        "--keep-indexes", dest="rebuild_indexes", action="store_false",
+        help="maintain indexes row by row (default unless the table is empty)"
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per executemany batch")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        report = import_file(
+            engine, args.table or _table_for(path), path,
+            replace=args.replace,
+            rebuild_indexes=args.rebuild_indexes,
+            batch_size=args.batch_size
+        )
+        if not report["rows"]:
+            print(f"⚠️  {path}: no rows")
+            continue
+        print(
+            f"📥 {report['table']}: {report['rows']} rows via {report['method']} in {report['seconds']}s "
+            f"({report['rows_per_sec']} rows/sec; load {report['load_seconds']}s, "
+            f"indexes {report['index_seconds']}s, analyze {report['analyze_seconds']}s)"
+        )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,372 @@
+"""
+Product catalogue engine for Deep-Shiva API
+Loads artisan products once into validated, presorted, immutable snapshots and swaps them atomically when the data changes
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, ValidationError
+from sqlalchemy import String, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .facets import FacetIndex
+from .http_cache import bump_data_version
+from .logging_config import get_logger
+from .models import Artisan, ArtisanProduct, RatingAggregate
+from .product_search import ProductSearchIndex
+from .replicas import read_session
+
+logger = get_logger("catalogue")
+
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "products.json")
+FEATURED_COUNT = 5
+SORT_KEYS = {
+    "name": (lambda product: product.name, False),
+    "price": (lambda product: product.price, False),
+    "rating": (lambda product: product.rating, True),
+}
+
+class Product(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    description: str
+    price: int
+    artisan: str
+    image: str
+    category: str
+    rating: float
+    reviews_count: int
+    in_stock: bool
+    materials: List[str]
+    origin_village: str
+    crafting_time_days: int
+    eco_friendly: bool
+
+def product_from_row(row) -> Dict[str, Any]:
+    """Product fields for an artisan_products row joined with its artisan"""
+    images = row.images if isinstance(row.images, list) else []
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description or "",
+        "price": int(round(row.price or 0)),
+        "artisan": row.artisan_name,
+        "image": images[0] if images else "",
+        "category": row.category,
+        "rating": 0.0,
+        "reviews_count": 0,
+        "in_stock": row.availability_status == "available",
+        "materials": [material.strip() for material in (row.materials_used or "").split(",") if material.strip()],
+        "origin_village": row.artisan_location,
+        "crafting_time_days": row.crafting_time_days or 0,
+        "eco_friendly": bool(row.eco_friendly),
+    }
+
+async def load_product_rows(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Active products of active artisans, in id order"""
+    result = await db.execute(
+        select(
+            ArtisanProduct.id, ArtisanProduct.name, ArtisanProduct.description, ArtisanProduct.price,
+            ArtisanProduct.images, ArtisanProduct.category, ArtisanProduct.availability_status,
+            ArtisanProduct.materials_used, ArtisanProduct.crafting_time_days, ArtisanProduct.eco_friendly,
+            Artisan.name.label("artisan_name"), Artisan.location.label("artisan_location")
+        )
+        .join(Artisan, ArtisanProduct.artisan_id == Artisan.id)
+        .where(ArtisanProduct.is_active == True, Artisan.is_active == True)
+        .order_by(ArtisanProduct.id)
+    )
+    return [product_from_row(row) for row in result]
+
+def load_snapshot_file(path: str = SNAPSHOT_FILE) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+def fingerprint_query():
+    """Row count and newest change of the product, artisan and rating tables, in one round trip"""
+    changed = lambda model: func.max(func.coalesce(model.updated_at, model.created_at)).cast(String)
+    return union_all(*[
+        select(literal(model.__tablename__, String), func.count(), changed(model)).select_from(model)
+        for model in (ArtisanProduct, Artisan, RatingAggregate)
+    ])
+
+async def load_product_ratings(db: AsyncSession) -> Dict[int, Tuple[int, int]]:
+    """(review count, rating sum) per product from the running review aggregates"""
+    result = await db.execute(
+        select(RatingAggregate.subject, RatingAggregate.review_count, RatingAggregate.rating_sum)
+        .where(RatingAggregate.scope == "product", RatingAggregate.review_count > 0)
+    )
+    return {int(subject): (count, total) for subject, count, total in result if subject.isdigit()}
+
+def apply_ratings(rows: List[Dict[str, Any]], ratings: Dict[int, Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """Rows with stored reviews added to their rating (existing rating/reviews_count are the baseline)"""
+    if not ratings:
+        return rows
+    merged = []
+    for row in rows:
+        rating = ratings.get(row.get("id"))
+        if rating is not None:
+            base_count = row.get("reviews_count") or 0
+            count = base_count + rating[0]
+            row = {
+                **row,
+                "reviews_count": count,
+                "rating": round(((row.get("rating") or 0) * base_count + rating[1]) / count, 1)
+            }
+        merged.append(row)
+    return merged
+
+def _material_label(product, key: str) -> str:
+    return next(material for material in product.materials if material.lower() == key)
+
+# Browse facets: keys of a product (lower-cased text, booleans) and their display label
+PRODUCT_FACETS = {
+    "category": (lambda product: (product.category.lower(),), lambda product, key: product.category),
+    "village": (lambda product: (product.origin_village.lower(),), lambda product, key: product.origin_village),
+    "material": (lambda product: {material.lower() for material in product.materials}, _material_label),
+    "eco_friendly": (lambda product: (product.eco_friendly,), lambda product, key: "true" if key else "false"),
+    "in_stock": (lambda product: (product.in_stock,), lambda product, key: "true" if key else "false"),
+}
+
+def validate_products(items: Iterable[Dict[str, Any]]) -> List[Product]:
+    """Product models for items, skipping (and logging) invalid ones"""
+    products = []
+    for item in items:
+        try:
+            products.append(Product(**item))
+        except ValidationError as e:
+            logger.warning("Skipping invalid catalogue product", extra={
+                "product_id": item.get("id"),
+                "error": str(e)
+            })
+    return products
+
+class CatalogueSnapshot:
+    """
+    One immutable catalogue version: products in id order, an id lookup and the
+    name/price/rating orderings, all computed once when the snapshot is built.
+    """
+
+    def __init__(self, products: List[Product], source: str, search_index: Optional[ProductSearchIndex] = None):
+        products = sorted(products, key=lambda product: product.id)
+        self.source = source
+        self.built_at = datetime.now().isoformat()
+        self.products: Tuple[Product, ...] = tuple(products)
+        self.by_id: Dict[int, Product] = {product.id: product for product in products}
+        # Stable sorts over id order, so ties keep the order the old per-request sort gave
+        positions = {
+            name: np.array(sorted(range(len(products)), key=lambda i: key(products[i]), reverse=reverse), dtype=np.int64)
+            for name, (key, reverse) in SORT_KEYS.items()
+        }
+        self.orderings: Dict[str, Tuple[Product, ...]] = {
+            name: tuple(products[i] for i in order) for name, order in positions.items()
+        }
+        self.facets = FacetIndex(products, PRODUCT_FACETS, lambda product: product.price, positions)
+        self.featured: Tuple[Product, ...] = tuple(sorted(
+            (product for product in self.orderings["name"] if product.in_stock),
+            key=lambda product: product.rating, reverse=True
+        )[:FEATURED_COUNT])
+        self._search_index = search_index
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def get(self, product_id: int) -> Optional[Product]:
+        return self.by_id.get(product_id)
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        eco_friendly: Optional[bool] = None,
+        in_stock: Optional[bool] = True,
+        sort_by: Optional[str] = "name",
+        limit: Optional[int] = 20
+    ) -> List[Product]:
+        """Filtered products in the requested order"""
+        filters = {}
+        if category:
+            filters["category"] = [category.lower()]
+        if eco_friendly is not None:
+            filters["eco_friendly"] = [eco_friendly]
+        if in_stock is not None:
+            filters["in_stock"] = [in_stock]
+        found = self.facets.search(filters, min_price, max_price, sort_by, limit=limit)
+        return [self.products[i] for i in found["positions"]]
+
+    def browse(
+        self,
+        categories: Sequence[str] = (),
+        villages: Sequence[str] = (),
+        materials: Sequence[str] = (),
+        eco_friendly: Optional[bool] = None,
+        in_stock: Optional[bool] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        sort_by: Optional[str] = "name",
+        offset: int = 0,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """One page of matching products with facet counts and the available price range"""
+        filters = {
+            "category": [value.lower() for value in categories],
+            "village": [value.lower() for value in villages],
+            "material": [value.lower() for value in materials],
+            "eco_friendly": [] if eco_friendly is None else [eco_friendly],
+            "in_stock": [] if in_stock is None else [in_stock],
+        }
+        found = self.facets.search(filters, min_price, max_price, sort_by, offset, limit, with_counts=True)
+        return {
+            "total": found["total"],
+            "results": [self.products[i] for i in found["positions"]],
+            "facets": found["facets"],
+            "price_range": found["price_range"],
+        }
+
+    @property
+    def search_index(self) -> ProductSearchIndex:
+        """The catalogue's shared index, or one built for this snapshot on first search"""
+        if self._search_index is None:
+            index = ProductSearchIndex()
+            index.sync(self.products)
+            self._search_index = index
+        return self._search_index
+
+    def search(self, q: str, limit: int = 10) -> Tuple[int, List[Product]]:
+        """Number of matching in-stock products and the best limit of them, by relevance and rating"""
+        total, hits = self.search_index.search_products(q, limit)
+        # A shared index may already hold a newer catalogue than this snapshot
+        return total, [self.by_id[product_id] for _, product_id in hits if product_id in self.by_id]
+
+    def suggest(self, q: str, limit: int = 5) -> Dict[str, Any]:
+        """Search-as-you-type: completions of the last word and the top matching products"""
+        _, products = self.search(q, limit)
+        return {
+            "completions": self.search_index.completions(q, limit),
+            "products": [{"id": product.id, "name": product.name, "category": product.category} for product in products],
+        }
+
+class ProductCatalogue:
+    """
+    The culture router's product catalogue.
+
+    Products come from artisan_products joined with artisans, or from the bundled
+    snapshot file while the table is empty, with ratings from the review aggregates. Each build produces a new
+    CatalogueSnapshot that replaces the old one in a single assignment and bumps the
+    "catalogue" ETag version; requests only read the current snapshot. Changes are
+    detected by a row-count/timestamp fingerprint checked in the background.
+    """
+
+    def __init__(
+        self,
+        snapshot_file: str = SNAPSHOT_FILE,
+        session_factory=read_session,
+        check_interval: float = 60.0,
+        data_name: str = "catalogue"
+    ):
+        self.snapshot_file = snapshot_file
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self.data_name = data_name
+        self.snapshot: Optional[CatalogueSnapshot] = None
+        # Shared across snapshots and updated in place, so a rebuild only re-indexes changed products
+        self.search_index = ProductSearchIndex()
+        self._fingerprint: Any = None
+        self._checked_at = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.last_build_ms: Optional[float] = None
+
+    def swap(self, products: List[Product], source: str) -> CatalogueSnapshot:
+        self.search_index.sync(products)
+        snapshot = CatalogueSnapshot(products, source, self.search_index)
+        self.snapshot = snapshot
+        self.builds += 1
+        bump_data_version(self.data_name)
+        return snapshot
+
+    async def ensure_fresh(self) -> CatalogueSnapshot:
+        """Current snapshot; built on first use, re-checked in the background afterwards"""
+        if self.snapshot is None:
+            await asyncio.shield(self._ensure_refresh())
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            self._ensure_refresh()
+        return self.snapshot
+
+    def invalidate(self):
+        """Force a change check on the next request"""
+        self._checked_at = float("-inf")
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._checked_at = time.monotonic()
+            task = self._task = asyncio.create_task(self._refresh())
+        return task
+
+    def _snapshot_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.snapshot_file).st_mtime_ns
+        except OSError:
+            return None
+
+    async def _refresh(self):
+        start = time.perf_counter()
+        rows = None
+        ratings: Dict[int, Tuple[int, int]] = {}
+        try:
+            async with self.session_factory() as db:
+                fingerprint = (
+                    tuple(sorted(tuple(row) for row in (await db.execute(fingerprint_query())).all())),
+                    self._snapshot_mtime()
+                )
+                if fingerprint == self._fingerprint and self.snapshot is not None:
+                    return
+                rows = await load_product_rows(db)
+                ratings = await load_product_ratings(db)
+        except Exception as e:
+            logger.error("Catalogue refresh failed", extra={"error": str(e)})
+            if self.snapshot is not None:
+                return
+            fingerprint = None
+
+        if rows:
+            source = "database"
+        else:
+            rows = await asyncio.to_thread(load_snapshot_file, self.snapshot_file)
+            source = "snapshot"
+        snapshot = self.swap(validate_products(apply_ratings(rows, ratings)), source)
+        self._fingerprint = fingerprint
+        self.last_build_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info("Catalogue snapshot built", extra={
+            "source": source,
+            "products": len(snapshot),
+            "duration_ms": self.last_build_ms
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "products": len(snapshot) if snapshot else 0,
+            "source": snapshot.source if snapshot else None,
+            "built_at": snapshot.built_at if snapshot else None,
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+            "search_terms": len(self.search_index.postings),
+            "check_interval_seconds": self.check_interval
+        }
+
+# Global catalogue for the culture router
+catalogue = ProductCatalogue(
+    snapshot_file=settings.catalogue_snapshot_file or SNAPSHOT_FILE,
+    check_interval=settings.catalogue_check_interval
+)
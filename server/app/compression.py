@@ -0,0 +1,315 @@
+"""
+Response compression middleware for Deep-Shiva API
+Negotiates brotli/zstd/gzip with per-route levels and streams compressed chunks for SSE
+"""
+
+import threading
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+from .logging_config import get_logger
+
+logger = get_logger("compression")
+
+# Compression level per route on gzip's 1-9 scale (mapped onto brotli's and zstd's ranges).
+# Latency-sensitive chat answers compress fast; catalogue and log dumps compress hard.
+DEFAULT_ROUTE_LEVELS: Dict[str, int] = {
+    "/api/v1/chat/query": 4,
+    "/api/v1/chat/ai-logs": 9,
+    "/api/v1/culture/products": 9,
+    "/api/v1/culture/categories": 9,
+    "/api/v1/vision/poses": 9,
+}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+)
+
+# Codec levels the 1-9 scale spans (zstd stops at 19; 20-22 need far more memory)
+LEVEL_RANGES = {"gzip": (1, 9), "br": (1, 11), "zstd": (1, 19)}
+
+def codec_level(encoding: str, level: int) -> int:
+    """Map a 1-9 level linearly onto encoding's range (1 -> fastest, 9 -> strongest)"""
+    low, high = LEVEL_RANGES[encoding]
+    level = max(1, min(9, level))
+    return low + round((level - 1) * (high - low) / 8)
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+# Server preference order; only codecs whose module is installed are offered
+CODECS = {"br": _BrotliStream, "zstd": _ZstdStream, "gzip": _GzipStream}
+AVAILABLE_ENCODINGS = tuple(
+    name for name, available in (("br", brotli), ("zstd", zstandard), ("gzip", zlib)) if available
+)
+
+class CompressionStats:
+    """Running totals of bytes before and after compression"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses: Dict[str, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.streamed_responses = 0
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, streamed: bool):
+        with self._lock:
+            self.responses[encoding] = self.responses.get(encoding, 0) + 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            if streamed:
+                self.streamed_responses += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            saved = self.bytes_in - self.bytes_out
+            return {
+                "responses_by_encoding": dict(self.responses),
+                "streamed_responses": self.streamed_responses,
+                "bytes_uncompressed": self.bytes_in,
+                "bytes_sent": self.bytes_out,
+                "bytes_saved": saved,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+                "available_encodings": list(AVAILABLE_ENCODINGS)
+            }
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred available encoding the client accepts (q > 0)"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    for encoding in AVAILABLE_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def parse_route_levels(raw: Optional[str]) -> Dict[str, int]:
+    """Parse "path=level,path=level" overrides on top of the defaults"""
+    levels = dict(DEFAULT_ROUTE_LEVELS)
+    if not raw:
+        return levels
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        path, level = item.rsplit("=", 1)
+        try:
+            levels[path.strip()] = max(1, min(9, int(level)))
+        except ValueError:
+            logger.warning("Ignoring invalid compression level", extra={"route_level": item})
+    return levels
+
+# Global stats shared by the middleware and monitoring router
+compression_stats = CompressionStats()
+
+class CompressionMiddleware:
+    """Pure ASGI middleware so streaming responses are compressed chunk by chunk"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        default_level: int = 6,
+        route_levels: Optional[Dict[str, int]] = None,
+        stats: Optional[CompressionStats] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.default_level = default_level
+        self.route_levels = dict(DEFAULT_ROUTE_LEVELS if route_levels is None else route_levels)
+        self._prefixes = sorted(self.route_levels, key=len, reverse=True)
+        self.stats = stats or compression_stats
+        self.level_for = lru_cache(maxsize=2048)(self._level_for)
+
+    def _level_for(self, path: str) -> int:
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                return self.route_levels[prefix]
+        return self.default_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send, encoding, self.level_for(scope["path"]), self.minimum_size, self.stats
+        )
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """Per-response state: decides once enough of the body is known whether to compress"""
+
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int, stats: CompressionStats):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.stats = stats
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+        self.flush_each_chunk = False
+        self.pending = []
+        self.pending_size = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body":
+            await self._send_start()
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not self._is_compressible(headers):
+                self.passthrough = True
+                await self._send_start()
+                await self._send(message)
+                return
+
+            self.flush_each_chunk = headers.get("content-type", "").startswith("text/event-stream")
+
+            # Responses that pass through BaseHTTPMiddleware arrive in several chunks, so
+            # buffer until we know the body reaches minimum_size (SSE never waits)
+            self.pending.append(body)
+            self.pending_size += len(body)
+            if more_body and not self.flush_each_chunk and self.pending_size < self.minimum_size:
+                return
+
+            body = b"".join(self.pending)
+            self.pending = []
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send_start()
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            self.compressor = CODECS[self.encoding](codec_level(self.encoding, self.level))
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                # Whole response known - compress once and set exact length
+                data = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(data))
+                self.stats.record(self.encoding, len(body), len(data), streamed=False)
+                await self._send_start()
+                await self._send({"type": "http.response.body", "body": data})
+                return
+
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self._send_start()
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        elif self.flush_each_chunk:
+            # SSE clients need each event now, not when the compressor's buffer fills
+            data += self.compressor.flush()
+
+        self.bytes_in += len(body)
+        self.bytes_out += len(data)
+        if not more_body:
+            self.stats.record(self.encoding, self.bytes_in, self.bytes_out, streamed=True)
+
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _is_compressible(self, headers: MutableHeaders) -> bool:
+        if self.start_message.get("status", 200) in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+    async def _send_start(self):
+        if self.start_message is not None:
+            await self._send(self.start_message)
+            self.start_message = None
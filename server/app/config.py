@@ -17,6 +17,53 @@ class Settings:
         
         # Database settings
         self.database_url = os.getenv("DATABASE_URL")
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))    # seconds to wait for a connection
+        self.db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))     # seconds; -1 disables
+        self.db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+        self.health_db_check_ttl = float(os.getenv("HEALTH_DB_CHECK_TTL", "5"))  # seconds between /health DB pings
+        # Worker startup: check (schema must already be at the migration head), migrate
+        # (upgrade on boot; single-process dev only), create (create_all, no migrations) or skip
+        self.db_startup_mode = os.getenv("DB_STARTUP_MODE", "check").lower()
+        # Read replicas for read-only endpoints (comma-separated URLs; empty = primary only)
+        self.database_replica_urls = [
+            url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+        ]
+        self.replica_max_lag_seconds = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+        self.replica_check_interval = float(os.getenv("REPLICA_CHECK_INTERVAL", "10"))
+        self.dashboard_overview_ttl = float(os.getenv("DASHBOARD_OVERVIEW_TTL", "30"))  # seconds before background refresh
+        self.dashboard_overview_max_stale = float(os.getenv("DASHBOARD_OVERVIEW_MAX_STALE", "300"))  # never serve older
+        self.geo_index_check_interval = float(os.getenv("GEO_INDEX_CHECK_INTERVAL", "60"))  # seconds between change checks
+        # Culture product catalogue (snapshot file is used while artisan_products is empty)
+        self.catalogue_snapshot_file = os.getenv("CATALOGUE_SNAPSHOT_FILE", "")
+        self.catalogue_check_interval = float(os.getenv("CATALOGUE_CHECK_INTERVAL", "60"))  # seconds between change checks
+        # Product recommendations (neighbours kept per product; sessions and co-views are in memory per worker)
+        self.recommend_neighbours = int(os.getenv("RECOMMEND_NEIGHBOURS", "20"))
+        self.recommend_co_view_weight = float(os.getenv("RECOMMEND_CO_VIEW_WEIGHT", "0.5"))
+        self.recommend_recent_views = int(os.getenv("RECOMMEND_RECENT_VIEWS", "10"))
+        self.recommend_max_sessions = int(os.getenv("RECOMMEND_MAX_SESSIONS", "10000"))
+        # Product reviews (buffered per worker and written in batches; ratings are kept as running aggregates)
+        self.review_flush_interval = float(os.getenv("REVIEW_FLUSH_INTERVAL", "2"))  # seconds; 0 disables the background flush
+        self.review_batch_size = int(os.getenv("REVIEW_BATCH_SIZE", "200"))  # flush early once this many are buffered
+        self.review_auto_approve = os.getenv("REVIEW_AUTO_APPROVE", "true").lower() == "true"
+        self.review_blocked_terms = os.getenv("REVIEW_BLOCKED_TERMS", "")  # comma-separated, always held for moderation
+        self.review_admin_token = os.getenv("REVIEW_ADMIN_TOKEN", "")  # X-Admin-Token for the moderation endpoints; empty disables them
+        # Full-text search: auto (Postgres tsvector when DATABASE_URL is Postgres), postgres or memory (BM25)
+        self.search_backend = os.getenv("SEARCH_BACKEND", "auto").lower()
+        self.search_check_interval = float(os.getenv("SEARCH_CHECK_INTERVAL", "30"))  # seconds between change checks
+
+        # chat_messages partitioning and retention
+        self.chat_partition_months_ahead = int(os.getenv("CHAT_PARTITION_MONTHS_AHEAD", "3"))
+        self.chat_retention_months = int(os.getenv("CHAT_RETENTION_MONTHS", "0"))  # 0 keeps everything
+        self.chat_archive_dir = os.getenv("CHAT_ARCHIVE_DIR", "archive")
+        self.chat_partition_maintenance_interval = int(os.getenv("CHAT_PARTITION_MAINTENANCE_INTERVAL", "86400"))  # 0 disables
+
+        # Dashboard metric rollups (retention 0 keeps a level forever)
+        self.metrics_flush_interval = float(os.getenv("METRICS_FLUSH_INTERVAL", "60"))  # seconds; 0 disables
+        self.metrics_minute_retention_hours = float(os.getenv("METRICS_MINUTE_RETENTION_HOURS", "48"))
+        self.metrics_hour_retention_days = float(os.getenv("METRICS_HOUR_RETENTION_DAYS", "90"))
+        self.metrics_day_retention_days = float(os.getenv("METRICS_DAY_RETENTION_DAYS", "0"))
         
         # Logging settings
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
@@ -27,11 +74,26 @@ class Settings:
         # Security settings
         self.rate_limit_requests = int(os.getenv("RATE_LIMIT_REQUESTS", "60"))  # requests per minute
         self.rate_limit_window = int(os.getenv("RATE_LIMIT_WINDOW", "60"))    # seconds
+        self.rate_limit_backend = os.getenv("RATE_LIMIT_BACKEND", "shared")  # shared (all workers) or local
+        self.rate_limit_shared_path = os.getenv("RATE_LIMIT_SHARED_PATH")  # defaults to /dev/shm or temp dir
+        self.rate_limit_slots = int(os.getenv("RATE_LIMIT_SLOTS", "4096"))  # max tracked clients
+        self.rate_limit_route_costs = os.getenv("RATE_LIMIT_ROUTE_COSTS")  # e.g. "/api/v1/chat/query=5,/health=0.2"
+        
+        # Suspicious request scanning
+        self.security_scan_rules_file = os.getenv("SECURITY_SCAN_RULES_FILE")  # JSON {"rule": ["pattern", ...]}
+        self.security_scan_bodies = os.getenv("SECURITY_SCAN_BODIES", "true").lower() == "true"
+        self.security_scan_max_body_bytes = int(os.getenv("SECURITY_SCAN_MAX_BODY_BYTES", "65536"))
         
         # Performance settings
         self.slow_query_threshold = float(os.getenv("SLOW_QUERY_THRESHOLD", "1000.0"))  # milliseconds
         self.slow_api_threshold = float(os.getenv("SLOW_API_THRESHOLD", "2000.0"))    # milliseconds
         
+        # Response compression
+        self.compression_enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.compression_min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))  # bytes
+        self.compression_level = int(os.getenv("COMPRESSION_LEVEL", "6"))  # 1-9, scaled to brotli/zstd ranges
+        self.compression_route_levels = os.getenv("COMPRESSION_ROUTE_LEVELS")  # e.g. "/api/v1/chat/query=4"
+        
         # Monitoring settings
         self.enable_performance_monitoring = os.getenv("ENABLE_PERFORMANCE_MONITORING", "true").lower() == "true"
         self.enable_security_monitoring = os.getenv("ENABLE_SECURITY_MONITORING", "true").lower() == "true"
@@ -49,6 +111,21 @@ class Settings:
         self.ollama_timeout = int(os.getenv("OLLAMA_TIMEOUT", "30"))
         self.ollama_temperature = float(os.getenv("OLLAMA_TEMPERATURE", "0.7"))
         self.ollama_max_tokens = int(os.getenv("OLLAMA_MAX_TOKENS", "1000"))
+        
+        # Embeddings: content-addressed store, micro-batched Ollama embed calls
+        self.embedding_model = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+        self.embedding_store_dir = os.getenv("EMBEDDING_STORE_DIR", "data/embeddings")
+        self.embedding_dtype = os.getenv("EMBEDDING_DTYPE", "float16")  # float16 or float32
+        self.embedding_batch_window_ms = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10"))
+        self.embedding_max_batch = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+        
+        # Chat retrieval (RAG): database facts injected into the system prompt
+        self.rag_enabled = os.getenv("RAG_ENABLED", "true").lower() == "true"
+        self.rag_index_dir = os.getenv("RAG_INDEX_DIR", "data/rag_index")
+        self.rag_top_k = int(os.getenv("RAG_TOP_K", "5"))
+        self.rag_token_budget = int(os.getenv("RAG_TOKEN_BUDGET", "400"))  # approximate prompt tokens for facts
+        self.rag_min_score = float(os.getenv("RAG_MIN_SCORE", "0.15"))  # cosine similarity cut-off
+        self.rag_check_interval = float(os.getenv("RAG_CHECK_INTERVAL", "60"))  # seconds between change checks
 
 # Global settings instance
 settings = Settings()
@@ -75,5 +152,6 @@ def get_security_config():
     return {
         "rate_limit_requests": settings.rate_limit_requests,
         "rate_limit_window": settings.rate_limit_window,
+        "rate_limit_backend": settings.rate_limit_backend,
         "enable_monitoring": settings.enable_security_monitoring
     }
\ No newline at end of file
@@ -1,8 +1,12 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from app.config import settings
+from app.db_pool import PoolMetrics, attach_pool_metrics, pool_options
 
 # Load environment variables
 load_dotenv()
@@ -13,12 +17,55 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Async drivers per sync URL scheme (asyncpg for Postgres, aiosqlite as local stand-in)
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Translate a sync DATABASE_URL into its async-driver equivalent"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    query = dict(parsed.query)
+    if drivername == "postgresql+asyncpg":
+        # asyncpg takes ssl=<mode> instead of libpq's sslmode and rejects other libpq options
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        query.pop("options", None)
+    return parsed.set(drivername=drivername, query=query).render_as_string(hide_password=False)
+
+# Pool metrics per engine, surfaced in /api/v1/monitoring/health-detailed
+pool_metrics = {
+    "sync": PoolMetrics("sync"),
+    "async": PoolMetrics("async"),
+}
+
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, settings, pool_metrics["sync"]))
+attach_pool_metrics(engine, pool_metrics["sync"])
+
+# Async engine for request handlers so DB latency never blocks the event loop
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    **pool_options(DATABASE_URL, settings, pool_metrics["async"], is_async=True)
+)
+attach_pool_metrics(async_engine.sync_engine, pool_metrics["async"])
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async session factory; objects stay usable after commit for serialization
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class
 Base = declarative_base()
 
@@ -28,4 +75,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
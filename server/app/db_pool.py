@@ -0,0 +1,157 @@
+"""
+Connection pool configuration and instrumentation for Deep-Shiva API
+Builds pool options from Settings and records checkout, overflow, wait-time and failure metrics
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+class PoolMetrics:
+    """Counters and a wait-time histogram for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        # Configured overflow (QueuePool keeps it private); set by pool_options
+        self.max_overflow: Optional[int] = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.connect_failures = 0
+        self.checkout_timeouts = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def record_wait(self, wait_ms: float):
+        with self._lock:
+            self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def _increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def wait_percentile(self, percentile: float) -> Optional[float]:
+        """Upper bound of the bucket containing the given percentile (ms)"""
+        total = sum(self.wait_buckets)
+        if not total:
+            return None
+        threshold = total * percentile / 100.0
+        running = 0
+        for index, count in enumerate(self.wait_buckets):
+            running += count
+            if running >= threshold:
+                return WAIT_BUCKETS_MS[index] if index < len(WAIT_BUCKETS_MS) else self.wait_max_ms
+        return self.wait_max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        waits = sum(self.wait_buckets)
+        stats: Dict[str, Any] = {
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "connects": self.connects,
+            "connect_failures": self.connect_failures,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "wait_time_ms": {
+                "count": waits,
+                "avg": round(self.wait_total_ms / waits, 3) if waits else None,
+                "p50": self.wait_percentile(50),
+                "p95": self.wait_percentile(95),
+                "p99": self.wait_percentile(99),
+                "max": round(self.wait_max_ms, 3),
+                "histogram": {
+                    **{f"le_{bound:g}": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)},
+                    "gt_last": self.wait_buckets[-1]
+                }
+            }
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": self.max_overflow,
+                "timeout": pool.timeout()
+            })
+        return stats
+
+def _instrumented_pool_class(base, metrics: PoolMetrics):
+    """Subclass base so every checkout's wait time and failures are recorded"""
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                metrics._increment("checkout_timeouts")
+                raise
+            except Exception:
+                metrics._increment("connect_failures")
+                raise
+            finally:
+                metrics.record_wait((time.perf_counter() - start) * 1000)
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+def pool_options(url: str, settings, metrics: PoolMetrics, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine keyword arguments for the configured pool"""
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a singleton/static pool that has no size settings
+        return options
+
+    metrics.max_overflow = settings.db_max_overflow
+    options.update({
+        "poolclass": _instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    })
+    return options
+
+def attach_pool_metrics(engine, metrics: PoolMetrics):
+    """Listen to pool events on a (sync) engine; survives pool recreation"""
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics._increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics._increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics._increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics._increment("invalidations")
+
+    @event.listens_for(engine, "engine_disposed")
+    def _on_dispose(disposed_engine):
+        metrics.pool = disposed_engine.pool
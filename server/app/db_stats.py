@@ -0,0 +1,200 @@
+"""
+Dashboard statistics for Deep-Shiva API
+One aggregate round trip for the overview counts, served from a TTL snapshot refreshed in the background
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import String, func, literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .logging_config import get_logger
+from .models import (
+    Artisan, ArtisanProduct, Chat, ChatMessage, CulturalSite,
+    EmergencyContact, TourismPlace, User, YogaPose
+)
+from .replicas import read_session
+
+logger = get_logger("db_stats")
+
+def _row(metric: str, model, total, filtered=None, key=None):
+    """One (metric, key, total, filtered) row; every UNION branch has the same shape"""
+    return select(
+        literal(metric, String).label("metric"),
+        (key if key is not None else null()).cast(String).label("key"),
+        total.label("total"),
+        (filtered if filtered is not None else literal(0)).label("filtered"),
+    ).select_from(model)
+
+def overview_query():
+    """Every dashboard count as a single UNION ALL of FILTER aggregates and grouped counts"""
+    count = func.count()
+    return union_all(
+        _row("users", User, count, count.filter(User.is_active == True)),
+        _row("chats", Chat, count, count.filter(Chat.is_active == True)),
+        _row("messages", ChatMessage, count),
+        _row("chat_types", Chat, count, key=Chat.chat_type).group_by(Chat.chat_type),
+        _row("cultural_sites", CulturalSite, count.filter(CulturalSite.is_active == True)),
+        _row(
+            "artisans", Artisan,
+            count.filter(Artisan.is_active == True),
+            count.filter(Artisan.is_active == True, Artisan.is_verified == True)
+        ),
+        _row("products", ArtisanProduct, count.filter(ArtisanProduct.is_active == True)),
+        _row("tourism_places", TourismPlace, count.filter(TourismPlace.is_active == True)),
+        _row("tourism_categories", TourismPlace, count, key=TourismPlace.category)
+            .where(TourismPlace.is_active == True)
+            .group_by(TourismPlace.category),
+        _row("yoga_poses", YogaPose, count.filter(YogaPose.is_active == True)),
+        _row("emergency_contacts", EmergencyContact, count.filter(EmergencyContact.is_active == True)),
+    )
+
+async def fetch_overview(db: AsyncSession) -> Dict[str, Any]:
+    """Run the overview query and shape it like /api/v1/database/stats/overview"""
+    scalars: Dict[str, Tuple[int, int]] = {}
+    chat_types: Dict[Optional[str], int] = {}
+    tourism_categories: Dict[Optional[str], int] = {}
+
+    for metric, key, total, filtered in (await db.execute(overview_query())).all():
+        if metric == "chat_types":
+            chat_types[key] = total
+        elif metric == "tourism_categories":
+            tourism_categories[key] = total
+        else:
+            scalars[metric] = (total, filtered)
+
+    total_users, active_users = scalars["users"]
+    total_chats, active_chats = scalars["chats"]
+    total_artisans, verified_artisans = scalars["artisans"]
+
+    return {
+        "users": {
+            "total": total_users,
+            "active": active_users,
+            "inactive": total_users - active_users
+        },
+        "chats": {
+            "total": total_chats,
+            "active": active_chats,
+            "messages": scalars["messages"][0],
+            "types": chat_types
+        },
+        "culture": {
+            "sites": scalars["cultural_sites"][0],
+            "artisans": {
+                "total": total_artisans,
+                "verified": verified_artisans,
+                "pending": total_artisans - verified_artisans
+            },
+            "products": scalars["products"][0]
+        },
+        "tourism": {
+            "places": scalars["tourism_places"][0],
+            "categories": tourism_categories
+        },
+        "yoga": {
+            "poses": scalars["yoga_poses"][0]
+        },
+        "emergency": {
+            "contacts": scalars["emergency_contacts"][0]
+        }
+    }
+
+class OverviewSnapshotCache:
+    """
+    Serve the overview from a snapshot; refresh it in the background once older than ttl.
+
+    Snapshots older than max_stale (or a missing one) are rebuilt before responding.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[AsyncSession], Any] = fetch_overview,
+        session_factory=read_session,
+        ttl: float = 30.0,
+        max_stale: float = 300.0
+    ):
+        self.loader = loader
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._snapshot: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.last_refresh_ms: Optional[float] = None
+
+    async def get(self) -> Tuple[Dict[str, Any], float]:
+        """Return (overview, snapshot age in seconds)"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            age = time.monotonic() - snapshot[0]
+            if age < self.ttl:
+                self.hits += 1
+                return snapshot[1], age
+            if age < self.max_stale:
+                self.stale_hits += 1
+                self._ensure_refresh()
+                return snapshot[1], age
+
+        # Cold or too stale: wait for the (shared) refresh instead of starting another
+        data = await asyncio.shield(self._ensure_refresh())
+        return data, 0.0
+
+    def invalidate(self):
+        """Drop the snapshot so the next read rebuilds it"""
+        self._snapshot = None
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._task = asyncio.create_task(self._refresh())
+            task.add_done_callback(self._refresh_done)
+        return task
+
+    def _refresh_done(self, task: asyncio.Task):
+        """Retrieve the outcome: stale-path refreshes are never awaited"""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error("Dashboard overview refresh failed", extra={"error": str(error)})
+
+    async def _refresh(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                data = await self.loader(db)
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        self._snapshot = (time.monotonic(), data)
+        self.refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.debug("Dashboard overview refreshed", extra={"duration_ms": self.last_refresh_ms})
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ttl_seconds": self.ttl,
+            "max_stale_seconds": self.max_stale,
+            "snapshot_age_seconds": (
+                round(time.monotonic() - self._snapshot[0], 2) if self._snapshot else None
+            ),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh_ms": self.last_refresh_ms
+        }
+
+# Global snapshot cache for the dashboard overview
+overview_cache = OverviewSnapshotCache(
+    ttl=settings.dashboard_overview_ttl,
+    max_stale=settings.dashboard_overview_max_stale
+)
@@ -0,0 +1,170 @@
+"""
+Faceted filtering for the Deep-Shiva product catalogue
+Per-facet bitmaps over catalogue positions, a sorted price array for ranges, and disjunctive facet counts from one intersection pass
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words)
+else:  # numpy < 2.0
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1)
+        return bits.reshape(words.shape + (-1,)).sum(axis=-1)
+
+class BitmapSpace:
+    """Bitmaps over positions 0..size-1, packed into uint64 words"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.words = max(1, -(-size // WORD_BITS))
+
+    def from_mask(self, mask: np.ndarray) -> np.ndarray:
+        padded = np.zeros(self.words * WORD_BITS, dtype=bool)
+        padded[:len(mask)] = mask
+        return np.packbits(padded, bitorder="little").view(np.uint64)
+
+    def from_positions(self, positions: Iterable[int]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[np.fromiter(positions, dtype=np.int64)] = True
+        return self.from_mask(mask)
+
+    def full(self) -> np.ndarray:
+        return self.from_mask(np.ones(self.size, dtype=bool))
+
+    def to_mask(self, bitmap: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bitmap.view(np.uint8), bitorder="little")[:self.size].view(bool)
+
+class Facet:
+    """One facet: a bitmap per value (stacked so counts for every value are one operation)"""
+
+    def __init__(self, space: BitmapSpace, postings: Dict[Hashable, List[int]], labels: Dict[Hashable, str]):
+        self.keys: List[Hashable] = sorted(postings, key=lambda key: labels[key].lower())
+        self.slots = {key: i for i, key in enumerate(self.keys)}
+        self.labels = labels
+        self.matrix = (
+            np.stack([space.from_positions(postings[key]) for key in self.keys])
+            if self.keys else np.zeros((0, space.words), dtype=np.uint64)
+        )
+
+    def union(self, keys: Sequence[Hashable], space: BitmapSpace) -> np.ndarray:
+        """Products having any of keys (values within one facet are OR-ed)"""
+        slots = [self.slots[key] for key in keys if key in self.slots]
+        if not slots:
+            return np.zeros(space.words, dtype=np.uint64)
+        return np.bitwise_or.reduce(self.matrix[slots], axis=0)
+
+    def counts(self, base: np.ndarray) -> np.ndarray:
+        return _popcount(self.matrix & base).sum(axis=1)
+
+# facet name -> (keys of a product, display label of a key)
+FacetSpec = Tuple[Callable[[Any], Iterable[Hashable]], Callable[[Any, Hashable], str]]
+
+class FacetIndex:
+    """
+    Faceted search over a fixed list of items (positions are list indexes).
+
+    A query intersects the selected facets' bitmaps with the price range in one
+    pass. Counts are disjunctive: each facet is counted against every other
+    filter but not its own, so the sidebar shows what each option would add.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[Any],
+        specs: Dict[str, FacetSpec],
+        price: Callable[[Any], float],
+        orderings: Dict[str, np.ndarray]
+    ):
+        self.space = BitmapSpace(len(items))
+        self.all = self.space.full()
+        self.facets: Dict[str, Facet] = {}
+        for name, (keys_of, label_of) in specs.items():
+            postings: Dict[Hashable, List[int]] = {}
+            labels: Dict[Hashable, str] = {}
+            for position, item in enumerate(items):
+                for key in keys_of(item):
+                    postings.setdefault(key, []).append(position)
+                    labels.setdefault(key, label_of(item, key))
+            self.facets[name] = Facet(self.space, postings, labels)
+
+        self.prices = np.array([price(item) for item in items], dtype=np.float64)
+        self.price_order = np.argsort(self.prices, kind="stable")
+        self.sorted_prices = self.prices[self.price_order]
+        self.orderings = orderings
+        self.identity = np.arange(len(items))
+
+    def price_bitmap(self, min_price: Optional[float], max_price: Optional[float]) -> Optional[np.ndarray]:
+        """Items priced within [min_price, max_price] via binary search on the sorted prices"""
+        if min_price is None and max_price is None:
+            return None
+        low = 0 if min_price is None else int(np.searchsorted(self.sorted_prices, min_price, side="left"))
+        high = len(self.sorted_prices) if max_price is None else int(np.searchsorted(self.sorted_prices, max_price, side="right"))
+        mask = np.zeros(self.space.size, dtype=bool)
+        if low < high:
+            mask[self.price_order[low:high]] = True
+        return self.space.from_mask(mask)
+
+    def _intersect(self, bitmaps: Iterable[np.ndarray]) -> np.ndarray:
+        result = self.all
+        for bitmap in bitmaps:
+            result = result & bitmap
+        return result
+
+    def search(
+        self,
+        filters: Dict[str, Sequence[Hashable]],
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort_by: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        with_counts: bool = False,
+        facet_limit: int = 50
+    ) -> Dict[str, Any]:
+        """Matching positions (sorted, paged), the total, and optionally facet counts and price bounds"""
+        selected = {
+            name: self.facets[name].union(keys, self.space)
+            for name, keys in filters.items()
+            if keys and name in self.facets
+        }
+        price = self.price_bitmap(min_price, max_price)
+        constraints = dict(selected)
+        if price is not None:
+            constraints["price"] = price
+        matched = self._intersect(constraints.values())
+
+        mask = self.space.to_mask(matched)
+        order = self.orderings.get(sort_by, self.identity)
+        positions = order[mask[order]]
+        end = None if limit is None else offset + limit
+        result: Dict[str, Any] = {"total": len(positions), "positions": positions[offset:end].tolist()}
+        if not with_counts:
+            return result
+
+        facets = {}
+        for name, facet in self.facets.items():
+            base = self._intersect(bitmap for other, bitmap in constraints.items() if other != name)
+            counts = facet.counts(base)
+            chosen = set(filters.get(name) or ())
+            values = [
+                {"value": facet.labels[key], "count": int(counts[slot]), "selected": key in chosen}
+                for slot, key in enumerate(facet.keys)
+                if counts[slot] or key in chosen
+            ]
+            values.sort(key=lambda value: (not value["selected"], -value["count"]))
+            facets[name] = values[:facet_limit]
+        result["facets"] = facets
+
+        # Price bounds of everything the other filters allow (for the range slider)
+        in_range = self.prices[self.space.to_mask(self._intersect(selected.values()))]
+        result["price_range"] = {
+            "min": float(in_range.min()) if len(in_range) else None,
+            "max": float(in_range.max()) if len(in_range) else None
+        }
+        return result
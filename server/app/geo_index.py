@@ -0,0 +1,235 @@
+"""
+Nearest-service spatial index for Deep-Shiva API
+Keeps emergency contacts, tourism places and cultural sites as unit-sphere vectors in memory and ranks them with vectorized haversine
+"""
+
+import asyncio
+import math
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import String, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .logging_config import get_logger
+from .models import CulturalSite, EmergencyContact, TourismPlace
+from .replicas import read_session
+
+logger = get_logger("geo_index")
+
+EARTH_RADIUS_KM = 6371.0088
+ALL = "all"
+# Values accepted for a lookup's type: the emergency contact service types plus the two place tables
+SUPPORTED_TYPES = ("hospital", "police", "fire", "tourist_helpline", "tourism_place", "cultural_site")
+
+def unit_vectors(lat_deg: np.ndarray, lon_deg: np.ndarray) -> np.ndarray:
+    """(N, 3) points on the unit sphere; their dot product orders points by great-circle distance"""
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    cos_lat = np.cos(lat)
+    return np.ascontiguousarray(np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat))))
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many (degrees in, km out)"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+class Partition:
+    """Contiguous coordinate arrays for one service type"""
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self.lat = np.array([item["latitude"] for item in items], dtype=np.float64)
+        self.lon = np.array([item["longitude"] for item in items], dtype=np.float64)
+        self.vectors = unit_vectors(self.lat, self.lon) if items else np.empty((0, 3))
+
+    def nearest(self, lat: float, lon: float, k: int, max_km: Optional[float] = None) -> List[Dict[str, Any]]:
+        if not self.items:
+            return []
+        lat_rad, lon_rad = math.radians(lat), math.radians(lon)
+        query = np.array((
+            math.cos(lat_rad) * math.cos(lon_rad), math.cos(lat_rad) * math.sin(lon_rad), math.sin(lat_rad)
+        ))
+        similarity = self.vectors @ query
+        if max_km is not None:
+            # Points within max_km have a dot product of at least cos(max_km / R)
+            candidates = np.flatnonzero(similarity >= math.cos(min(max_km / EARTH_RADIUS_KM, math.pi)))
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(similarity[candidates], len(candidates) - k)[-k:]]
+        elif len(similarity) > k:
+            candidates = np.argpartition(similarity, len(similarity) - k)[-k:]
+        else:
+            candidates = np.arange(len(similarity))
+        if not len(candidates):
+            return []
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        order = np.argsort(distances, kind="stable")
+        return [
+            {**self.items[candidates[i]], "distance_km": round(float(distances[i]), 3)}
+            for i in order
+        ]
+
+def _point(kind: str, source: str, row, **extra) -> Dict[str, Any]:
+    return {
+        "type": kind,
+        "source": source,
+        "id": row.id,
+        "name": row.name,
+        "district": row.district,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        **extra
+    }
+
+async def load_points(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Active rows with coordinates from every geo-tagged table"""
+    located = lambda model: (model.is_active == True, model.latitude.is_not(None), model.longitude.is_not(None))
+    points = []
+    contacts = await db.execute(select(
+        EmergencyContact.id, EmergencyContact.name, EmergencyContact.district, EmergencyContact.service_type,
+        EmergencyContact.phone_number, EmergencyContact.is_24x7,
+        EmergencyContact.latitude, EmergencyContact.longitude
+    ).where(*located(EmergencyContact)))
+    for row in contacts:
+        points.append(_point(
+            row.service_type, "emergency_contact", row, phone_number=row.phone_number, is_24x7=row.is_24x7
+        ))
+    places = await db.execute(select(
+        TourismPlace.id, TourismPlace.name, TourismPlace.district, TourismPlace.category,
+        TourismPlace.latitude, TourismPlace.longitude
+    ).where(*located(TourismPlace)))
+    for row in places:
+        points.append(_point("tourism_place", "tourism_place", row, category=row.category))
+    sites = await db.execute(select(
+        CulturalSite.id, CulturalSite.name, CulturalSite.district, CulturalSite.category,
+        CulturalSite.latitude, CulturalSite.longitude
+    ).where(*located(CulturalSite)))
+    for row in sites:
+        points.append(_point("cultural_site", "cultural_site", row, category=row.category))
+    return points
+
+def fingerprint_query():
+    """Row count and newest change per table, in one round trip"""
+    changed = lambda model: func.max(func.coalesce(model.updated_at, model.created_at)).cast(String)
+    return union_all(*[
+        select(literal(model.__tablename__, String), func.count(), changed(model)).select_from(model)
+        for model in (EmergencyContact, TourismPlace, CulturalSite)
+    ])
+
+async def load_fingerprint(db: AsyncSession) -> tuple:
+    return tuple(sorted(tuple(row) for row in (await db.execute(fingerprint_query())).all()))
+
+class GeoIndex:
+    """
+    k-nearest lookups over every geo-tagged row, partitioned by service type.
+
+    The index is rebuilt when the tables' fingerprint (row counts and newest
+    created/updated timestamps) changes; the fingerprint is checked in the background
+    at most every check_interval seconds, so queries never wait on the database
+    once the first build has finished.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[AsyncSession], Awaitable[List[Dict[str, Any]]]] = load_points,
+        fingerprint: Callable[[AsyncSession], Awaitable[Any]] = load_fingerprint,
+        session_factory=read_session,
+        check_interval: float = 60.0
+    ):
+        self.loader = loader
+        self.fingerprint = fingerprint
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self.partitions: Dict[str, Partition] = {}
+        self._fingerprint: Any = None
+        self._checked_at = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        self.built_at: Optional[str] = None
+        self.builds = 0
+        self.last_build_ms: Optional[float] = None
+
+    def build(self, points: List[Dict[str, Any]]):
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for point in points:
+            by_type.setdefault(point["type"], []).append(point)
+        partitions = {kind: Partition(items) for kind, items in by_type.items()}
+        partitions[ALL] = Partition(points)
+        # Swap in one assignment so concurrent queries see either the old or the new index
+        self.partitions = partitions
+        self.built_at = datetime.now().isoformat()
+        self.builds += 1
+
+    @property
+    def types(self) -> List[str]:
+        return sorted(kind for kind in self.partitions if kind != ALL)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        kind: Optional[str] = None,
+        k: int = 5,
+        max_km: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        partition = self.partitions.get(kind or ALL)
+        if partition is None:
+            return []
+        return partition.nearest(lat, lon, k, max_km)
+
+    async def ensure_fresh(self):
+        """Build on first use; afterwards re-check the fingerprint in the background"""
+        if not self.partitions:
+            await asyncio.shield(self._ensure_refresh())
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            self._ensure_refresh()
+
+    def invalidate(self):
+        """Force a fingerprint check on the next query"""
+        self._checked_at = float("-inf")
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._checked_at = time.monotonic()
+            task = self._task = asyncio.create_task(self._refresh())
+        return task
+
+    async def _refresh(self):
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                fingerprint = await self.fingerprint(db)
+                if fingerprint == self._fingerprint and self.partitions:
+                    return
+                points = await self.loader(db)
+        except Exception as e:
+            logger.error("Geo index refresh failed", extra={"error": str(e)})
+            if not self.partitions:
+                raise
+            return
+        self.build(points)
+        self._fingerprint = fingerprint
+        self.last_build_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info("Geo index rebuilt", extra={
+            "points": len(points),
+            "types": len(self.types),
+            "duration_ms": self.last_build_ms
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "points": len(self.partitions[ALL].items) if ALL in self.partitions else 0,
+            "types": {kind: len(self.partitions[kind].items) for kind in self.types},
+            "built_at": self.built_at,
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+            "check_interval_seconds": self.check_interval
+        }
+
+# Global index for /api/v1/tourism/nearby
+geo_index = GeoIndex(check_interval=settings.geo_index_check_interval)
@@ -0,0 +1,124 @@
+"""
+HTTP caching helpers for Deep-Shiva API
+Content-hash ETags computed once per data version, If-None-Match handling and Cache-Control policies
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from .responses import dumps
+
+# Cache-Control per kind of endpoint. Catalogue data changes rarely, so clients may
+# reuse it for an hour and revalidate cheaply with If-None-Match afterwards.
+CACHE_POLICIES: Dict[str, str] = {
+    "catalogue": "public, max-age=3600, stale-while-revalidate=86400",
+    "reference": "public, max-age=86400, stale-while-revalidate=604800",
+    "suggestions": "public, max-age=900, stale-while-revalidate=3600",
+}
+
+# Bumped whenever the underlying data changes; cached ETags from older versions are ignored
+_data_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+def get_data_version(name: str) -> int:
+    return _data_versions.get(name, 0)
+
+def bump_data_version(name: str) -> int:
+    """Invalidate every cached representation derived from the named data set"""
+    with _versions_lock:
+        _data_versions[name] = _data_versions.get(name, 0) + 1
+        return _data_versions[name]
+
+def encode_json(content: Any) -> bytes:
+    """Serialize a response payload the same way for hashing and sending"""
+    return dumps(content)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+class ConditionalResponseCache:
+    """Serialized bodies and ETags keyed by route + query, valid for one data version"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def respond(
+        self,
+        request: Request,
+        data_name: str,
+        build: Callable[[], Any],
+        policy: str = "catalogue"
+    ) -> Response:
+        """
+        Return a 304 or a cached JSON body for the request, building it at most once per version.
+
+        build is only called on a cache miss; its result is serialized and hashed once.
+        """
+        version = get_data_version(data_name)
+        key = self._key(request)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                entry = None
+
+        if entry is None:
+            body = encode_json(build())
+            etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            entry = (version, etag, body)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        _, etag, body = entry
+        headers = {"ETag": etag, "Cache-Control": CACHE_POLICIES.get(policy, policy)}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        params = sorted(request.query_params.multi_items())
+        if not params:
+            return request.url.path
+        return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified
+        }
+
+# Global cache instance shared by the catalogue routers
+response_cache = ConditionalResponseCache()
@@ -1,13 +1,24 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import os
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.routers import chat, vision, tourism, culture, database, monitoring
-from app.database import engine
+from app.routers import chat, vision, tourism, culture, database, monitoring, search
+from sqlalchemy import text
+from app.database import engine, async_engine
 from app.models import Base
 from app.logging_config import setup_logging, get_logger
 from app.middleware import LoggingMiddleware, SecurityMiddleware, HealthCheckMiddleware
+from app.compression import CompressionMiddleware, parse_route_levels
+from app.responses import FastJSONResponse
+from app.partitions import maintenance_loop
+from app.metrics_rollup import metrics_rollup, rollup_loop
+from app.reviews import review_store
+from app.schema_version import check_schema, migrate
 
 # Setup configuration and logging
 from app.config import settings, get_log_config
@@ -22,28 +33,76 @@ logger = get_logger("main")
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    startup_started = time.perf_counter()
     logger.info("Starting Deep-Shiva API", extra={"event": "startup"})
     
-    # Create database tables (suppress verbose SQLAlchemy logs during startup)
+    # Workers never create or migrate the schema by default; they only confirm its version
+    schema_started = time.perf_counter()
     try:
-        # Temporarily set SQLAlchemy logging to ERROR level during table creation
-        import logging
-        sqlalchemy_logger = logging.getLogger('sqlalchemy.engine')
-        original_level = sqlalchemy_logger.level
-        sqlalchemy_logger.setLevel(logging.ERROR)
-        
-        Base.metadata.create_all(bind=engine)
-        
-        # Restore original logging level
-        sqlalchemy_logger.setLevel(original_level)
-        
-        logger.info("Database initialized successfully", extra={"event": "database_init"})
+        if settings.db_startup_mode == "check":
+            revision = await check_schema(async_engine)
+        elif settings.db_startup_mode == "migrate":
+            revision = await asyncio.to_thread(migrate, configure_logger=False)
+        elif settings.db_startup_mode == "create":
+            await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+            revision = None
+        else:
+            revision = None
     except Exception as e:
-        logger.error("Failed to initialize database", extra={"error": str(e)}, exc_info=True)
+        logger.error("Database schema check failed", extra={
+            "error": str(e),
+            "mode": settings.db_startup_mode
+        })
         raise
+    schema_ms = round((time.perf_counter() - schema_started) * 1000, 2)
+    logger.info("Database schema ready", extra={
+        "event": "database_init",
+        "mode": settings.db_startup_mode,
+        "revision": revision,
+        "duration_ms": schema_ms
+    })
+    
+    # Keep upcoming chat_messages partitions created and archive expired months (one worker per pass)
+    maintenance_task = None
+    if settings.chat_partition_maintenance_interval > 0:
+        maintenance_task = asyncio.create_task(maintenance_loop(engine, settings))
+    
+    # Flush dashboard metrics into minute rows and keep hour/day rollups current
+    rollup_task = None
+    if settings.metrics_flush_interval > 0:
+        rollup_task = asyncio.create_task(rollup_loop(metrics_rollup, settings.metrics_flush_interval))
+    
+    # Write buffered product reviews and their rating aggregates in batches
+    review_task = None
+    if settings.review_flush_interval > 0:
+        review_task = asyncio.create_task(review_store.run(settings.review_flush_interval))
+    
+    app.state.startup = {
+        "started_at": time.time(),
+        "import_ms": round((startup_started - IMPORT_STARTED) * 1000, 2),
+        "schema_ms": schema_ms,
+        "schema_mode": settings.db_startup_mode,
+        "schema_revision": revision,
+        "boot_ms": round((time.perf_counter() - IMPORT_STARTED) * 1000, 2),
+        "pid": os.getpid()
+    }
+    logger.info("Startup complete", extra={"event": "startup_complete", **app.state.startup})
     
     yield
     
+    if maintenance_task is not None:
+        maintenance_task.cancel()
+    if rollup_task is not None:
+        rollup_task.cancel()
+        try:
+            await metrics_rollup.run_once()
+        except Exception as e:
+            logger.error("Final metric rollup failed", extra={"error": str(e)})
+    if review_task is not None:
+        # The loop writes what is buffered before returning (cancelling it could interrupt a write)
+        review_store.stop()
+        await review_task
+    
     # Shutdown
     logger.info("Shutting down Deep-Shiva API", extra={"event": "shutdown"})
 
@@ -51,7 +110,8 @@ app = FastAPI(
     title="Deep-Shiva API",
     description="Backend API for Uttarakhand Tourism Chatbot with comprehensive logging",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add middleware (order matters - last added is executed first)
@@ -59,6 +119,15 @@ app.add_middleware(LoggingMiddleware)
 app.add_middleware(SecurityMiddleware)
 app.add_middleware(HealthCheckMiddleware)
 
+# Compress outside the logging/security layers so it sees the final body
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        default_level=settings.compression_level,
+        route_levels=parse_route_levels(settings.compression_route_levels)
+    )
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -75,6 +144,7 @@ app.include_router(tourism.router, prefix="/api/v1/tourism", tags=["Tourism"])
 app.include_router(culture.router, prefix="/api/v1/culture", tags=["Culture"])
 app.include_router(database.router, prefix="/api/v1/database", tags=["Database"])
 app.include_router(monitoring.router, prefix="/api/v1/monitoring", tags=["Monitoring"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["Search"])
 
 @app.get("/")
 async def root(request: Request):
@@ -116,6 +186,31 @@ async def root(request: Request):
         }
     }
 
+# (monotonic time of last ping, status) shared by /health probes
+_db_health = {"checked_at": None, "status": "operational"}
+
+async def _database_status(request_id: str) -> str:
+    """Ping the database through the pool unless a recent result is still fresh"""
+    now = time.monotonic()
+    checked_at = _db_health["checked_at"]
+    if checked_at is not None and now - checked_at < settings.health_db_check_ttl:
+        return _db_health["status"]
+
+    _db_health["checked_at"] = now
+    try:
+        # Pooled connection on the async engine (never blocks the event loop)
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        _db_health["status"] = "operational"
+        logger.debug("Database health check passed", extra={"request_id": request_id})
+    except Exception as e:
+        _db_health["status"] = "error"
+        logger.error("Database health check failed", extra={
+            "request_id": request_id,
+            "error": str(e)
+        })
+    return _db_health["status"]
+
 @app.get("/health")
 async def health_check(request: Request):
     """Enhanced health check with logging"""
@@ -124,19 +219,8 @@ async def health_check(request: Request):
     request_id = getattr(request.state, 'request_id', 'unknown')
     timestamp = datetime.utcnow().isoformat() + "Z"
     
-    # Test database connection
-    db_status = "operational"
-    try:
-        # Simple database connectivity test (modern SQLAlchemy approach)
-        with engine.connect() as connection:
-            connection.execute("SELECT 1")
-        logger.debug("Database health check passed", extra={"request_id": request_id})
-    except Exception as e:
-        db_status = "error"
-        logger.error("Database health check failed", extra={
-            "request_id": request_id,
-            "error": str(e)
-        })
+    # Database connectivity, pinged at most once per TTL so frequent probes reuse the result
+    db_status = await _database_status(request_id)
     
     health_status = {
         "status": "healthy" if db_status == "operational" else "degraded",
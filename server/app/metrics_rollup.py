@@ -0,0 +1,421 @@
+"""
+Time-series rollups for dashboard metrics
+Aggregates request, chat and LLM metrics in memory, upserts them as per-minute rows and downsamples them to hours and days
+"""
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .logging_config import get_logger
+from .models import MetricRollup
+
+logger = get_logger("metrics_rollup")
+
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+# Each coarser level is recomputed from the level below it
+SOURCES = {"hour": "minute", "day": "hour"}
+
+# Upper bounds (ms) of the LLM latency histogram. Bucket counts are stored as
+# "<metric>:bucket" rows so percentiles survive downsampling.
+LATENCY_BUCKETS_MS: List[float] = [50, 100, 250, 500, 1000, 2000, 5000, 10000, 30000, 60000]
+BUCKET_SUFFIX = ":bucket"
+
+# Metrics served by /database/metrics/timeseries
+METRICS = {
+    "requests": "HTTP requests by status class (value: response time in ms)",
+    "chats": "Chat queries by outcome (ai, fallback, error)",
+    "messages": "Chat messages by language",
+    "llm_latency_ms": "LLM response time with p50/p95/p99",
+    "llm_fallbacks": "LLM calls answered by the fallback responder",
+    "fallback_rate": "llm_fallbacks divided by LLM calls",
+    "users_total": "Registered users (sampled)",
+    "chats_active": "Active chats (sampled)",
+    "cultural_sites": "Active cultural sites (sampled)",
+    "tourism_places": "Active tourism places (sampled)",
+    "artisans_total": "Active artisans (sampled)",
+}
+
+# Longest series a range query returns before it moves to a coarser level
+MAX_POINTS = 720
+WRITE_CHUNK = 500
+CONFLICT_COLUMNS = ["resolution", "metric_name", "bucket_start", "dimension"]
+
+# [count, sum, min, max]
+Aggregate = List[Any]
+
+def as_utc(moment: datetime) -> datetime:
+    """Aware UTC datetime (SQLite hands back naive values)"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    moment = as_utc(moment).replace(second=0, microsecond=0)
+    if resolution in ("hour", "day"):
+        moment = moment.replace(minute=0)
+    if resolution == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+def bucket_label(bounds: List[float], value: float) -> str:
+    index = bisect_left(bounds, value)
+    return f"le_{bounds[index]:g}" if index < len(bounds) else "le_inf"
+
+def histogram_percentile(histogram: Dict[str, int], percentile: float, max_value: Optional[float]) -> Optional[float]:
+    """Upper bound of the bucket containing the given percentile"""
+    buckets = sorted((float(label[3:]), count) for label, count in histogram.items())
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+    threshold = total * percentile / 100.0
+    running = 0
+    for bound, count in buckets:
+        running += count
+        if running >= threshold:
+            return bound if bound != float("inf") else max_value
+    return max_value
+
+def _merge(into: Aggregate, count, value_sum, value_min, value_max):
+    into[0] += count
+    into[1] += value_sum
+    if value_min is not None:
+        into[2] = value_min if into[2] is None else min(into[2], value_min)
+    if value_max is not None:
+        into[3] = value_max if into[3] is None else max(into[3], value_max)
+
+def _new() -> Aggregate:
+    return [0, 0.0, None, None]
+
+class MetricsCollector:
+    """Per-minute aggregates accumulated in memory until the next flush"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str, datetime], Aggregate] = {}
+
+    def _add(self, metric: str, dimension: str, now: Optional[datetime], count: int, value: Optional[float]):
+        key = (metric, dimension, bucket_start(now or datetime.now(timezone.utc), "minute"))
+        with self._lock:
+            aggregate = self._pending.get(key)
+            if aggregate is None:
+                aggregate = self._pending[key] = _new()
+            _merge(aggregate, count, value or 0.0, value, value)
+
+    def increment(self, metric: str, dimension: str = "", amount: int = 1, now: Optional[datetime] = None):
+        """Count an event"""
+        self._add(metric, dimension, now, amount, None)
+
+    def observe(
+        self,
+        metric: str,
+        value: float,
+        dimension: str = "",
+        buckets: Optional[List[float]] = None,
+        now: Optional[datetime] = None
+    ):
+        """Record a measurement (count, sum, min, max) and optionally its histogram bucket"""
+        self._add(metric, dimension, now, 1, value)
+        if buckets is not None:
+            self._add(metric + BUCKET_SUFFIX, bucket_label(buckets, value), now, 1, None)
+
+    def drain(self) -> Dict[Tuple[str, str, datetime], Aggregate]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: Dict[Tuple[str, str, datetime], Aggregate]):
+        """Put back aggregates whose flush failed"""
+        with self._lock:
+            for key, aggregate in pending.items():
+                _merge(self._pending.setdefault(key, _new()), *aggregate)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+def _rows(resolution: str, aggregates: Dict[Tuple[str, str, datetime], Aggregate]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "resolution": resolution,
+            "metric_name": metric,
+            "dimension": dimension,
+            "bucket_start": start,
+            "count": aggregate[0],
+            "value_sum": aggregate[1],
+            "value_min": aggregate[2],
+            "value_max": aggregate[3],
+        }
+        for (metric, dimension, start), aggregate in aggregates.items()
+    ]
+
+def upsert_statement(dialect_name: str, rows: List[Dict[str, Any]], additive: bool):
+    """
+    INSERT ... ON CONFLICT on the bucket key.
+
+    additive merges into the stored row (minute flushes from any number of workers);
+    otherwise the stored row is replaced (recomputed hour/day rollups).
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(MetricRollup).values(rows)
+    excluded = statement.excluded
+    if additive:
+        least, greatest = (func.least, func.greatest) if dialect_name == "postgresql" else (func.min, func.max)
+        values = {
+            "count": MetricRollup.count + excluded["count"],
+            "value_sum": MetricRollup.value_sum + excluded["value_sum"],
+            "value_min": least(
+                func.coalesce(MetricRollup.value_min, excluded["value_min"]),
+                func.coalesce(excluded["value_min"], MetricRollup.value_min)
+            ),
+            "value_max": greatest(
+                func.coalesce(MetricRollup.value_max, excluded["value_max"]),
+                func.coalesce(excluded["value_max"], MetricRollup.value_max)
+            ),
+        }
+    else:
+        values = {name: excluded[name] for name in ("count", "value_sum", "value_min", "value_max")}
+    return statement.on_conflict_do_update(index_elements=CONFLICT_COLUMNS, set_=values)
+
+class MetricsRollup:
+    """
+    Flush the collector into per-minute rows and keep hour and day rows current.
+
+    Minute rows are upserted additively, so every worker can flush into the same
+    buckets. Hour and day rows are recomputed from the level below for every bucket
+    touched since the previous run and overwritten, which makes reruns idempotent.
+    Each level is then trimmed to its retention (None keeps it forever).
+    """
+
+    def __init__(
+        self,
+        collector: MetricsCollector,
+        retention: Dict[str, Optional[timedelta]],
+        session_factory=AsyncSessionLocal
+    ):
+        self.collector = collector
+        self.retention = retention
+        self.session_factory = session_factory
+        self._rolled_until: Dict[str, Optional[datetime]] = {resolution: None for resolution in SOURCES}
+        self.runs = 0
+        self.failures = 0
+        self.last_run_ms: Optional[float] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    async def _write(self, db: AsyncSession, rows: List[Dict[str, Any]], additive: bool):
+        dialect_name = db.get_bind().dialect.name
+        for index in range(0, len(rows), WRITE_CHUNK):
+            await db.execute(upsert_statement(dialect_name, rows[index:index + WRITE_CHUNK], additive))
+
+    async def flush(self, db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """Upsert everything collected so far into minute rows; returns (rows, earliest minute)"""
+        pending = self.collector.drain()
+        if not pending:
+            return 0, None
+        try:
+            await self._write(db, _rows("minute", pending), additive=True)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            self.collector.restore(pending)
+            raise
+        return len(pending), min(start for _, _, start in pending)
+
+    async def rollup(
+        self,
+        db: AsyncSession,
+        resolution: str,
+        now: datetime,
+        flushed_since: Optional[datetime] = None
+    ) -> int:
+        """Recompute resolution buckets touched since the last run or by this run's flush"""
+        source = SOURCES[resolution]
+        current = bucket_start(now, resolution)
+        start = self._rolled_until[resolution]
+        if start is None:
+            # First run: only buckets whose source rows are all still retained
+            keep = self.retention.get(source)
+            start = bucket_start(now - keep, resolution) + RESOLUTIONS[resolution] if keep else None
+        elif flushed_since is not None:
+            # Minutes collected just before a bucket boundary land after it was last rolled up
+            start = min(start, bucket_start(flushed_since, resolution))
+        if start is not None:
+            start = min(start, current)
+
+        query = select(
+            MetricRollup.metric_name, MetricRollup.dimension, MetricRollup.bucket_start,
+            MetricRollup.count, MetricRollup.value_sum, MetricRollup.value_min, MetricRollup.value_max
+        ).where(
+            MetricRollup.resolution == source,
+            MetricRollup.bucket_start < current + RESOLUTIONS[resolution]
+        )
+        if start is not None:
+            query = query.where(MetricRollup.bucket_start >= start)
+
+        aggregates: Dict[Tuple[str, str, datetime], Aggregate] = {}
+        for metric, dimension, moment, *values in (await db.execute(query)).all():
+            key = (metric, dimension, bucket_start(moment, resolution))
+            _merge(aggregates.setdefault(key, _new()), *values)
+        if aggregates:
+            await self._write(db, _rows(resolution, aggregates), additive=False)
+        return len(aggregates)
+
+    async def expire(self, db: AsyncSession, now: datetime) -> int:
+        """Delete rows older than their level's retention"""
+        removed = 0
+        for resolution, keep in self.retention.items():
+            if not keep:
+                continue
+            result = await db.execute(delete(MetricRollup).where(
+                MetricRollup.resolution == resolution,
+                MetricRollup.bucket_start < bucket_start(now - keep, resolution)
+            ))
+            removed += result.rowcount or 0
+        return removed
+
+    async def run_once(self, db: Optional[AsyncSession] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Flush, roll up hours and days, expire; returns what was written"""
+        if db is None:
+            async with self.session_factory() as session:
+                return await self.run_once(session, now)
+
+        now = as_utc(now or datetime.now(timezone.utc))
+        start = time.perf_counter()
+        try:
+            flushed, flushed_since = await self.flush(db)
+            report: Dict[str, Any] = {"minute_rows": flushed}
+            for resolution in SOURCES:
+                report[f"{resolution}_rows"] = await self.rollup(db, resolution, now, flushed_since)
+            report["expired_rows"] = await self.expire(db, now)
+            await db.commit()
+        except Exception:
+            self.failures += 1
+            await db.rollback()
+            raise
+
+        for resolution in SOURCES:
+            self._rolled_until[resolution] = bucket_start(now, resolution)
+        self.runs += 1
+        self.last_run_ms = round((time.perf_counter() - start) * 1000, 2)
+        report["duration_ms"] = self.last_run_ms
+        self.last_report = report
+        logger.debug("Metric rollup completed", extra=report)
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending_buckets": len(self.collector),
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_ms": self.last_run_ms,
+            "last_report": self.last_report,
+            "retention_hours": {
+                resolution: keep.total_seconds() / 3600 if keep else None
+                for resolution, keep in self.retention.items()
+            }
+        }
+
+def choose_resolution(start: datetime, end: datetime, now: datetime, retention: Dict[str, Optional[timedelta]]) -> str:
+    """Finest level that still holds start and keeps the series under MAX_POINTS buckets"""
+    for resolution in ("minute", "hour"):
+        keep = retention.get(resolution)
+        fits = (end - start) / RESOLUTIONS[resolution] <= MAX_POINTS
+        if fits and (not keep or start >= now - keep):
+            return resolution
+    return "day"
+
+def _series_names(metric: str) -> List[str]:
+    if metric == "fallback_rate":
+        return ["llm_latency_ms", "llm_fallbacks"]
+    if metric == "llm_latency_ms":
+        return [metric, metric + BUCKET_SUFFIX]
+    return [metric]
+
+def _point(metric: str, moment: datetime, series: Dict[str, Dict[str, Aggregate]]) -> Dict[str, Any]:
+    if metric == "fallback_rate":
+        calls = sum(aggregate[0] for aggregate in series.get("llm_latency_ms", {}).values())
+        fallbacks = sum(aggregate[0] for aggregate in series.get("llm_fallbacks", {}).values())
+        return {
+            "bucket": moment.isoformat(),
+            "calls": calls,
+            "fallbacks": fallbacks,
+            "value": round(fallbacks / calls, 4) if calls else None
+        }
+
+    by_dimension = series.get(metric, {})
+    total = _new()
+    for aggregate in by_dimension.values():
+        _merge(total, *aggregate)
+    point: Dict[str, Any] = {"bucket": moment.isoformat(), "count": total[0]}
+    if total[2] is not None:
+        point.update({
+            "avg": round(total[1] / total[0], 3) if total[0] else None,
+            "min": total[2],
+            "max": total[3]
+        })
+    histogram = series.get(metric + BUCKET_SUFFIX)
+    if histogram:
+        counts = {label: aggregate[0] for label, aggregate in histogram.items()}
+        for percentile in (50, 95, 99):
+            point[f"p{percentile}"] = histogram_percentile(counts, percentile, total[3])
+    if any(by_dimension):
+        point["by_dimension"] = {dimension: aggregate[0] for dimension, aggregate in by_dimension.items()}
+    return point
+
+async def fetch_series(
+    db: AsyncSession,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    resolution: str
+) -> List[Dict[str, Any]]:
+    """One point per bucket of the given resolution overlapping [start, end)"""
+    rows = (await db.execute(
+        select(
+            MetricRollup.bucket_start, MetricRollup.metric_name, MetricRollup.dimension,
+            MetricRollup.count, MetricRollup.value_sum, MetricRollup.value_min, MetricRollup.value_max
+        ).where(
+            MetricRollup.resolution == resolution,
+            MetricRollup.metric_name.in_(_series_names(metric)),
+            MetricRollup.bucket_start >= bucket_start(start, resolution),
+            MetricRollup.bucket_start < end
+        ).order_by(MetricRollup.bucket_start)
+    )).all()
+
+    buckets: Dict[datetime, Dict[str, Dict[str, Aggregate]]] = {}
+    for moment, name, dimension, *values in rows:
+        series = buckets.setdefault(as_utc(moment), {})
+        series.setdefault(name, {})[dimension] = list(values)
+    return [_point(metric, moment, series) for moment, series in buckets.items()]
+
+async def rollup_loop(rollup: MetricsRollup, interval: float):
+    """Flush and roll up every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await rollup.run_once()
+        except Exception as e:
+            logger.error("Metric rollup failed", extra={"error": str(e)})
+
+def _retention(hours: float) -> Optional[timedelta]:
+    return timedelta(hours=hours) if hours > 0 else None
+
+# Global collector (fed by the logging middleware, chat router and LLM service) and its rollup job
+metrics_collector = MetricsCollector()
+metrics_rollup = MetricsRollup(metrics_collector, retention={
+    "minute": _retention(settings.metrics_minute_retention_hours),
+    "hour": _retention(settings.metrics_hour_retention_days * 24),
+    "day": _retention(settings.metrics_day_retention_days * 24),
+})
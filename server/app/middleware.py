@@ -6,14 +6,18 @@ Handles request/response logging, performance monitoring, and error tracking
 import time
 import uuid
 import json
-from typing import Callable
+from typing import Callable, List
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 import logging
 
+from .config import settings
 from .logging_config import get_access_logger, get_logger, PerformanceLogger, ErrorTracker
+from .metrics_rollup import metrics_collector
+from .rate_limiter import create_rate_limiter
+from .security_scanner import BODY_METHODS, security_scanner
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware for comprehensive request/response logging"""
@@ -90,6 +94,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 duration_ms=process_time,
                 status_code=response.status_code
             )
+            metrics_collector.observe("requests", process_time, dimension=f"{response.status_code // 100}xx")
             
             # Add response headers
             response.headers["X-Request-ID"] = request_id
@@ -116,6 +121,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 exc_info=True
             )
             
+            metrics_collector.observe("requests", process_time, dimension="5xx")
+            
             # Track error
             self.error_tracker.log_validation_error(exc, {
                 "method": method,
@@ -158,20 +165,37 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp):
         super().__init__(app)
         self.logger = get_logger("security")
-        self.request_counts = {}  # Simple in-memory rate limiting (use Redis in production)
-        self.max_requests_per_minute = 60
+        self.rate_limiter = create_rate_limiter(settings)
+        self.scanner = security_scanner
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Scan bodies as they stream to the route instead of buffering them here
+        if scope["type"] == "http" and self.scanner.scan_bodies and scope.get("method") in BODY_METHODS:
+            receive = self.scanner.wrap_receive(
+                receive,
+                lambda matched_rules: self._log_body_match(scope, matched_rules)
+            )
+        await super().__call__(scope, receive, send)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         client_ip = self._get_client_ip(request)
         
-        # Simple rate limiting check
-        if self._is_rate_limited(client_ip):
+        # Reserve capacity before dispatch so slow requests count immediately
+        decision = self.rate_limiter.reserve(client_ip, request.url.path)
+        rate_limit_headers = {
+            "X-RateLimit-Limit": str(decision.limit),
+            "X-RateLimit-Remaining": str(decision.remaining)
+        }
+        
+        if not decision.allowed:
             self.logger.warning(
                 "Rate limit exceeded",
                 extra={
                     "client_ip": client_ip,
                     "path": request.url.path,
                     "method": request.method,
+                    "cost": decision.cost,
+                    "retry_after": decision.retry_after,
                     "security_event": True
                 }
             )
@@ -181,8 +205,9 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 content={
                     "error": "Rate limit exceeded",
                     "message": "Too many requests. Please try again later.",
-                    "retry_after": 60
-                }
+                    "retry_after": decision.retry_after
+                },
+                headers={**rate_limit_headers, "Retry-After": str(decision.retry_after)}
             )
         
         # Check for suspicious patterns
@@ -190,9 +215,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         
         # Process request
         response = await call_next(request)
-        
-        # Update request count
-        self._update_request_count(client_ip)
+        response.headers.update(rate_limit_headers)
         
         return response
     
@@ -203,59 +226,36 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             return forwarded_for.split(",")[0].strip()
         return request.client.host if request.client else "unknown"
     
-    def _is_rate_limited(self, client_ip: str) -> bool:
-        """Check if client IP is rate limited"""
-        current_time = time.time()
-        minute_window = int(current_time // 60)
-        
-        key = f"{client_ip}:{minute_window}"
-        count = self.request_counts.get(key, 0)
-        
-        return count >= self.max_requests_per_minute
-    
-    def _update_request_count(self, client_ip: str):
-        """Update request count for rate limiting"""
-        current_time = time.time()
-        minute_window = int(current_time // 60)
-        
-        key = f"{client_ip}:{minute_window}"
-        self.request_counts[key] = self.request_counts.get(key, 0) + 1
-        
-        # Clean up old entries (keep only last 2 minutes)
-        keys_to_remove = [
-            k for k in self.request_counts.keys()
-            if int(k.split(":")[1]) < minute_window - 1
-        ]
-        for key in keys_to_remove:
-            del self.request_counts[key]
-    
     def _check_suspicious_activity(self, request: Request, client_ip: str):
-        """Check for suspicious request patterns"""
-        path = request.url.path.lower()
-        query = str(request.query_params).lower()
-        
-        # Check for common attack patterns
-        suspicious_patterns = [
-            "script", "alert", "onload", "onerror",  # XSS attempts
-            "union", "select", "drop", "insert",     # SQL injection attempts
-            "../", "..\\", "etc/passwd",             # Path traversal attempts
-            "eval(", "exec(", "system(",             # Code injection attempts
-        ]
-        
-        for pattern in suspicious_patterns:
-            if pattern in path or pattern in query:
-                self.logger.warning(
-                    "Suspicious request pattern detected",
-                    extra={
-                        "client_ip": client_ip,
-                        "path": request.url.path,
-                        "method": request.method,
-                        "pattern": pattern,
-                        "query_params": dict(request.query_params),
-                        "security_event": True
-                    }
-                )
-                break
+        """Check for suspicious request patterns in path and query"""
+        matched_rules = self.scanner.scan_request(request.scope)
+        if matched_rules:
+            self.logger.warning(
+                "Suspicious request pattern detected",
+                extra={
+                    "client_ip": client_ip,
+                    "path": request.url.path,
+                    "method": request.method,
+                    "rules": matched_rules,
+                    "location": "url",
+                    "query_params": dict(request.query_params),
+                    "security_event": True
+                }
+            )
+    
+    def _log_body_match(self, scope: Scope, matched_rules: List[str]):
+        """Log suspicious patterns found while the request body streamed through"""
+        self.logger.warning(
+            "Suspicious request pattern detected",
+            extra={
+                "client_ip": self._get_client_ip(Request(scope)),
+                "path": scope.get("path"),
+                "method": scope.get("method"),
+                "rules": matched_rules,
+                "location": "body",
+                "security_event": True
+            }
+        )
 
 class HealthCheckMiddleware(BaseHTTPMiddleware):
     """Middleware for health check monitoring"""
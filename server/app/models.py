@@ -1,11 +1,21 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func, text
 from app.database import Base
 
+# Predicate for partial indexes over active rows; matches how queries spell `is_active == True`
+ACTIVE_ROWS = {
+    "postgresql_where": text("is_active = true"),
+    "sqlite_where": text("is_active = 1"),
+}
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination order for the /database list endpoints
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -24,6 +34,9 @@ class User(Base):
 
 class Chat(Base):
     __tablename__ = "chats"
+    __table_args__ = (
+        Index("ix_chats_user_id", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -39,6 +52,9 @@ class Chat(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_chat_id_created_at", "chat_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     chat_id = Column(Integer, ForeignKey("chats.id"), nullable=False)
@@ -47,14 +63,23 @@ class ChatMessage(Base):
     response = Column(Text, nullable=True)
     message_type = Column(String(20), default="text")  # text, image, voice
     language = Column(String(10), default="en")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key on Postgres (monthly ranges, see migration 0003 and app/partitions.py)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     chat = relationship("Chat", back_populates="messages")
     user = relationship("User", back_populates="chat_messages")
 
+# Recent-activity feed reads newest first
+Index("ix_chat_messages_created_at_desc", ChatMessage.created_at.desc())
+
 class CulturalSite(Base):
     __tablename__ = "cultural_sites"
+    __table_args__ = (
+        # Keyset pagination order for the /database list endpoints (active rows only)
+        Index("ix_cultural_sites_active_created_at_id", "created_at", "id", **ACTIVE_ROWS),
+        Index("ix_cultural_sites_category_active", "category", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -75,6 +100,11 @@ class CulturalSite(Base):
 
 class Artisan(Base):
     __tablename__ = "artisans"
+    __table_args__ = (
+        # Keyset pagination order for the /database list endpoints (active rows only)
+        Index("ix_artisans_active_created_at_id", "created_at", "id", **ACTIVE_ROWS),
+        Index("ix_artisans_active_verified", "is_verified", **ACTIVE_ROWS),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -96,6 +126,12 @@ class Artisan(Base):
 
 class ArtisanProduct(Base):
     __tablename__ = "artisan_products"
+    __table_args__ = (
+        # Keyset pagination order for the /database list endpoints (active rows only)
+        Index("ix_artisan_products_active_created_at_id", "created_at", "id", **ACTIVE_ROWS),
+        Index("ix_artisan_products_category_active", "category", "is_active"),
+        Index("ix_artisan_products_active_artisan_id", "artisan_id", **ACTIVE_ROWS),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     artisan_id = Column(Integer, ForeignKey("artisans.id"), nullable=False)
@@ -109,6 +145,8 @@ class ArtisanProduct(Base):
     weight = Column(String(50), nullable=True)
     images = Column(JSON, nullable=True)  # Array of image URLs
     availability_status = Column(String(20), default="available")  # available, sold, custom_order
+    eco_friendly = Column(Boolean, nullable=False, default=False, server_default=false())
+    crafting_time_days = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
@@ -118,6 +156,11 @@ class ArtisanProduct(Base):
 
 class TourismPlace(Base):
     __tablename__ = "tourism_places"
+    __table_args__ = (
+        # Keyset pagination order for the /database list endpoints (active rows only)
+        Index("ix_tourism_places_active_created_at_id", "created_at", "id", **ACTIVE_ROWS),
+        Index("ix_tourism_places_category_active", "category", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -159,6 +202,9 @@ class YogaPose(Base):
 
 class EmergencyContact(Base):
     __tablename__ = "emergency_contacts"
+    __table_args__ = (
+        Index("ix_emergency_contacts_district_service_type", "district", "service_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     district = Column(String(100), nullable=False)
@@ -182,4 +228,64 @@ class DashboardMetrics(Base):
     metric_type = Column(String(50), nullable=False)  # count, percentage, rating, etc.
     category = Column(String(50), nullable=False)  # users, chats, tourism, culture, etc.
     date_recorded = Column(DateTime(timezone=True), server_default=func.now())
-    additional_data = Column(JSON, nullable=True)
\ No newline at end of file
+    additional_data = Column(JSON, nullable=True)
+
+class MetricRollup(Base):
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        # Upsert target; also serves range reads of one metric at one resolution
+        UniqueConstraint("resolution", "metric_name", "bucket_start", "dimension", name="uq_metric_rollups_bucket"),
+        # Expiry of old minute/hour rows
+        Index("ix_metric_rollups_resolution_bucket_start", "resolution", "bucket_start"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    resolution = Column(String(10), nullable=False)  # minute, hour, day
+    metric_name = Column(String(100), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)  # UTC
+    dimension = Column(String(100), nullable=False, default="")  # e.g. language, status class
+    count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0)
+    value_min = Column(Float, nullable=True)
+    value_max = Column(Float, nullable=True)
+
+class ProductReview(Base):
+    __tablename__ = "product_reviews"
+    __table_args__ = (
+        # Approved reviews of a product, newest first
+        Index("ix_product_reviews_product_status_created_at", "product_id", "status", "created_at"),
+        # Moderation queue: pending reviews, oldest first
+        Index("ix_product_reviews_status_created_at", "status", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    review_uid = Column(String(32), nullable=False, unique=True)  # returned to the client before the row is written
+    product_id = Column(Integer, nullable=False)  # catalogue product id (not a foreign key: products may come from the snapshot file)
+    artisan_name = Column(String(100), nullable=False)
+    rating = Column(Integer, nullable=False)
+    comment = Column(Text, nullable=False)
+    reviewer_name = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, approved, rejected
+    moderation_reason = Column(String(200), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    moderated_at = Column(DateTime(timezone=True), nullable=True)
+
+class RatingAggregate(Base):
+    __tablename__ = "rating_aggregates"
+    __table_args__ = (
+        # Upsert target for additive flushes
+        UniqueConstraint("scope", "subject", name="uq_rating_aggregates_subject"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(20), nullable=False)  # product, artisan
+    subject = Column(String(100), nullable=False)  # product id or artisan name
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,194 @@
+"""
+Keyset pagination helpers for Deep-Shiva API
+Stable (created_at, id) ordering (NULL created_at last), opaque cursors and planner-statistics row estimates
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import String, func, literal, select, text, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .logging_config import get_logger
+
+logger = get_logger("pagination")
+
+MAX_PAGE_SIZE = 500
+
+# Offset parameters the list endpoints took before cursors
+REMOVED_PARAMS = ("skip", "offset")
+
+def _dialect(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+def keyset_columns(dialect_name: str, model):
+    """
+    (created_at, id) as compared in SQL.
+
+    SQLite stores server-default timestamps as 'YYYY-MM-DD HH:MM:SS' text while bound
+    datetimes render with microseconds, so the raw stored text is compared there instead.
+    """
+    if dialect_name == "sqlite":
+        return type_coerce(model.created_at, String), model.id
+    return model.created_at, model.id
+
+def encode_cursor(created_at: Any, row_id: int) -> str:
+    """Opaque next-page token for the last row of a page; a NULL created_at is kept as null"""
+    value = created_at.isoformat() if isinstance(created_at, datetime) else created_at
+    payload = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(dialect_name: str, token: str) -> Tuple[Any, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if value is not None and dialect_name != "sqlite":
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def reject_offset_params(request: Request):
+    """Fail loudly for clients still paging with skip/offset (silently ignoring it would loop them on page one)"""
+    used = [name for name in REMOVED_PARAMS if name in request.query_params]
+    if used:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{', '.join(used)} is no longer supported; pass the previous page's next_cursor as cursor"
+        )
+
+def keyset_query(
+    dialect_name: str,
+    model,
+    limit: int,
+    *criteria,
+    columns: Optional[list] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    null_created: bool = False
+):
+    """
+    SELECT for one page ordered by (created_at, id), starting after the given key.
+
+    Seeks with a row-value comparison on the (created_at, id) index, so every page
+    costs the same regardless of depth. Rows whose created_at is NULL never match
+    that comparison; null_created selects them instead, ordered by id (they come
+    after every dated row). With columns, only those are selected as plain rows
+    (no ORM entities); otherwise each row holds the model instance first. One extra
+    row is fetched to tell whether another page follows.
+    """
+    created_key, id_key = keyset_columns(dialect_name, model)
+    query = select(*(columns or [model]), created_key.label("_cursor_created_at"))
+    if criteria:
+        query = query.where(*criteria)
+    if null_created:
+        query = query.where(created_key.is_(None))
+        if after is not None:
+            query = query.where(id_key > after[1])
+        return query.order_by(id_key).limit(limit + 1)
+
+    query = query.where(created_key.is_not(None))
+    if after is not None:
+        query = query.where(tuple_(created_key, id_key) > tuple_(
+            literal(after[0], created_key.type), literal(after[1], id_key.type)
+        ))
+    return query.order_by(created_key, id_key).limit(limit + 1)
+
+async def keyset_page(
+    db: AsyncSession,
+    model,
+    limit: int,
+    cursor: Optional[str] = None,
+    *criteria,
+    columns: Optional[list] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """One page of rows after the cursor, plus the next cursor"""
+    dialect_name = _dialect(db)
+    after = decode_cursor(dialect_name, cursor) if cursor else None
+
+    rows: List[Any] = []
+    if after is None or after[0] is not None:
+        rows = (await db.execute(
+            keyset_query(dialect_name, model, limit, *criteria, columns=columns, after=after)
+        )).all()
+    if len(rows) <= limit:
+        # Dated rows ran out on this page: continue with the undated ones
+        null_after = after if after is not None and after[0] is None else None
+        rows += (await db.execute(keyset_query(
+            dialect_name, model, limit - len(rows), *criteria,
+            columns=columns, after=null_after, null_created=True
+        ))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        last_id = last.id if columns else last[0].id
+        next_cursor = encode_cursor(last._cursor_created_at, last_id)
+    return rows, next_cursor
+
+async def estimate_count(db: AsyncSession, model, *criteria) -> Optional[int]:
+    """
+    Approximate row count from planner statistics instead of COUNT(*).
+
+    Postgres: the planner's row estimate for the filtered query (EXPLAIN, not executed).
+    SQLite: sqlite_stat1 when ANALYZE has run, otherwise the max id via the primary key.
+    """
+    dialect = db.get_bind().dialect
+    try:
+        if dialect.name == "postgresql":
+            query = select(model.id)
+            if criteria:
+                query = query.where(*criteria)
+            sql = str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            plan = (await db.execute(text("EXPLAIN (FORMAT JSON) " + sql))).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+        if dialect.name == "sqlite":
+            table = model.__tablename__
+            has_stats = (await db.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            ))).first()
+            if has_stats:
+                stat = (await db.execute(
+                    text("SELECT stat FROM sqlite_stat1 WHERE tbl = :tbl LIMIT 1"), {"tbl": table}
+                )).scalar()
+                if stat:
+                    return int(stat.split()[0])
+            return (await db.execute(select(func.coalesce(func.max(model.id), 0)))).scalar_one()
+    except Exception as e:
+        logger.warning("Row count estimate failed", extra={
+            "table": model.__tablename__,
+            "error": str(e)
+        })
+    return None
+
+async def paginate(
+    db: AsyncSession,
+    model,
+    key: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    *criteria,
+    columns: Optional[list] = None
+) -> Dict[str, Any]:
+    """Response body for a keyset-paginated list endpoint; projected rows become dicts"""
+    rows, next_cursor = await keyset_page(db, model, limit, cursor, *criteria, columns=columns)
+    if columns:
+        names = [column.key for column in columns]
+        items = [dict(zip(names, row)) for row in rows]
+    else:
+        items = [row[0] for row in rows]
+    body: Dict[str, Any] = {
+        key: items,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+    if cursor is None:
+        # Only the first page pays for the estimate
+        body["total_estimate"] = await estimate_count(db, model, *criteria)
+    return body
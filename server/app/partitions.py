@@ -0,0 +1,290 @@
+"""
+Monthly partition maintenance for chat_messages
+Pre-creates upcoming Postgres range partitions and archives expired months to gzip CSV
+"""
+
+import asyncio
+import csv
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-process deployments only
+    fcntl = None
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .logging_config import get_logger
+
+logger = get_logger("partitions")
+
+PARENT_TABLE = "chat_messages"
+# Catches rows for months without a partition yet (created by migration 0003)
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_PATTERN = re.compile(r"^chat_messages_p(\d{4})(\d{2})$")
+COLUMNS = ["id", "chat_id", "user_id", "message", "response", "message_type", "language", "created_at"]
+# pg_try_advisory_lock key shared by every worker ("chat" in ASCII)
+MAINTENANCE_LOCK_KEY = 0x63686174
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+def is_partitioned(conn: Connection) -> bool:
+    """True when chat_messages is a Postgres partitioned table (SQLite keeps a plain table)"""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).scalar())
+
+def list_partitions(conn: Connection) -> List[date]:
+    """Months that currently have an attached partition, oldest first"""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+def default_partition_months(conn: Connection) -> List[date]:
+    """Months that have rows in the DEFAULT partition, oldest first"""
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": DEFAULT_PARTITION}).scalar() is None:
+        return []
+    return list(conn.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at)::date AS month FROM {DEFAULT_PARTITION} ORDER BY month"
+    )).scalars())
+
+def _create_partition(conn: Connection, month: date, from_default: bool):
+    name = partition_name(month)
+    bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    if not from_default:
+        conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} {bounds}'))
+        return
+    # The DEFAULT partition holds rows of this month: move them into a new table, then
+    # attach it (indexes and keys are added on attach)
+    columns = ", ".join(COLUMNS)
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end "
+        f'RETURNING {columns}) INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+    ), {"start": month, "end": add_months(month, 1)})
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{name}" {bounds}'))
+
+def ensure_partitions(conn: Connection, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Create partitions for the current month and the next months_ahead months.
+
+    Months that only have rows in the DEFAULT partition (maintenance was off over a
+    month boundary) get their partition too, with those rows moved into it.
+    """
+    if not is_partitioned(conn):
+        return []
+    current = month_start(today or _today())
+    existing = set(list_partitions(conn))
+    in_default = set(default_partition_months(conn))
+    wanted = {add_months(current, offset) for offset in range(months_ahead + 1)} | in_default
+    created = []
+    for month in sorted(wanted - existing):
+        _create_partition(conn, month, month in in_default)
+        created.append(partition_name(month))
+    return created
+
+def _export_csv(conn: Connection, select_sql: str, params: Dict[str, Any], path: str) -> int:
+    """Write the selected rows to a gzip CSV (with header); returns the row count"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.part"
+    rows = 0
+    with gzip.open(tmp_path, "wt", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        result = conn.execution_options(stream_results=True).execute(text(select_sql), params)
+        for partition in result.partitions(1000):
+            writer.writerows(partition)
+            rows += len(partition)
+    os.replace(tmp_path, path)
+    return rows
+
+def _archive_partition(conn: Connection, month: date, archive_dir: str) -> Dict[str, Any]:
+    """Detach one expired partition, export it and drop it"""
+    name = partition_name(month)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    # Detaching first takes the month out of every query plan straight away
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+    rows = _export_csv(conn, f'SELECT {", ".join(COLUMNS)} FROM "{name}" ORDER BY id', {}, path)
+    conn.execute(text(f'DROP TABLE "{name}"'))
+    return {"month": month.isoformat(), "partition": name, "rows": rows, "path": path}
+
+def _archive_rows(conn: Connection, month: date, archive_dir: str) -> Dict[str, Any]:
+    """Plain-table fallback: export one month of rows and delete them"""
+    params = {"start": month.isoformat(), "end": add_months(month, 1).isoformat()}
+    window = "created_at >= :start AND created_at < :end"
+    path = os.path.join(archive_dir, f"{partition_name(month)}.csv.gz")
+    rows = _export_csv(
+        conn, f"SELECT {', '.join(COLUMNS)} FROM {PARENT_TABLE} WHERE {window} ORDER BY id", params, path
+    )
+    conn.execute(text(f"DELETE FROM {PARENT_TABLE} WHERE {window}"), params)
+    return {"month": month.isoformat(), "partition": None, "rows": rows, "path": path}
+
+def apply_retention(
+    engine: Engine,
+    keep_months: int,
+    archive_dir: str,
+    today: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """
+    Archive every month older than the newest keep_months months.
+
+    Each month is handled in its own transaction, so a failed export leaves that
+    month's data in place (detached, on Postgres) and the next run retries it.
+    """
+    if keep_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or _today()), -(keep_months - 1))
+    archived = []
+
+    with engine.connect() as conn:
+        partitioned = is_partitioned(conn)
+        if partitioned:
+            expired = [month for month in list_partitions(conn) if month < cutoff]
+        else:
+            oldest = conn.execute(text(
+                f"SELECT MIN(created_at) FROM {PARENT_TABLE} WHERE created_at < :cutoff"
+            ), {"cutoff": cutoff.isoformat()}).scalar()
+            expired = []
+            if oldest is not None:
+                if isinstance(oldest, str):
+                    oldest = datetime.fromisoformat(oldest)
+                month = month_start(oldest)
+                while month < cutoff:
+                    expired.append(month)
+                    month = add_months(month, 1)
+
+    for month in expired:
+        try:
+            with engine.begin() as conn:
+                if partitioned:
+                    report = _archive_partition(conn, month, archive_dir)
+                else:
+                    report = _archive_rows(conn, month, archive_dir)
+        except Exception as e:
+            logger.error("Chat message archival failed", extra={
+                "month": month.isoformat(),
+                "error": str(e)
+            })
+            continue
+        if report["rows"] or report["partition"]:
+            archived.append(report)
+            logger.info("Archived chat messages", extra=report)
+        elif os.path.exists(report["path"]):
+            os.remove(report["path"])
+    return archived
+
+def lock_path(engine: Engine) -> str:
+    """Lock file for one database in the temp directory (SQLite workers share a host)"""
+    key = hashlib.blake2b(engine.url.render_as_string(hide_password=False).encode(), digest_size=8).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"deep-shiva-maintenance-{key}.lock")
+
+@contextmanager
+def maintenance_lock(engine: Engine) -> Iterator[bool]:
+    """
+    Yield True in at most one process at a time; others get False and should skip.
+
+    Postgres: a session advisory lock held on one pooled connection for the pass.
+    SQLite: a non-blocking flock on lock_path(engine).
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}).scalar()
+            conn.commit()
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+                    conn.commit()
+        return
+
+    if fcntl is None:
+        yield True
+        return
+    fd = os.open(lock_path(engine), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+def run_maintenance(engine: Engine, settings) -> Dict[str, Any]:
+    """Premake upcoming partitions, then archive expired months (skipped while another worker runs it)"""
+    start = time.perf_counter()
+    with maintenance_lock(engine) as acquired:
+        if not acquired:
+            logger.debug("Chat partition maintenance already running elsewhere")
+            return {"skipped": True, "partitions_created": [], "archived": [], "duration_ms": 0.0}
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, settings.chat_partition_months_ahead)
+        archived = apply_retention(engine, settings.chat_retention_months, settings.chat_archive_dir)
+    report = {
+        "skipped": False,
+        "partitions_created": created,
+        "archived": archived,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+    if created or archived:
+        logger.info("Chat partition maintenance completed", extra={
+            "partitions_created": len(created),
+            "months_archived": len(archived),
+            "duration_ms": report["duration_ms"]
+        })
+    return report
+
+async def maintenance_loop(engine: Engine, settings):
+    """Run maintenance at startup and then every chat_partition_maintenance_interval seconds"""
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance, engine, settings)
+        except Exception as e:
+            logger.error("Chat partition maintenance failed", extra={"error": str(e)})
+        await asyncio.sleep(settings.chat_partition_maintenance_interval)
+
+if __name__ == "__main__":
+    from .config import settings
+    from .database import engine
+
+    result = run_maintenance(engine, settings)
+    if result["skipped"]:
+        print("⏭️  Maintenance is already running in another process")
+    print(f"📅 Partitions created: {', '.join(result['partitions_created']) or 'none'}")
+    for entry in result["archived"]:
+        print(f"📦 {entry['month']}: {entry['rows']} messages -> {entry['path']}")
+    print(f"⏱️  {result['duration_ms']} ms")
@@ -0,0 +1,287 @@
+"""
+Product search for the Deep-Shiva catalogue
+Stemmed BM25 over an incrementally maintained inverted index, with prefix expansion for search-as-you-type, trigram fuzzy matching and rating-aware ranking
+"""
+
+import bisect
+import hashlib
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .search_index import BM25Index, DocKey
+from .text_analysis import DEVANAGARI, TOKEN_PATTERN, analyze_token, iter_tokens, normalize_hindi
+
+KIND = "product"
+# Multiplier at a 5.0 rating: relevance decides, rating breaks near-ties
+RATING_BOOST = 0.3
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+MAX_PREFIX_EXPANSIONS = 20
+MAX_FUZZY_EXPANSIONS = 3
+MAX_FUZZY_CANDIDATES = 40
+FUZZY_CACHE_SIZE = 4096
+MAX_QUERY_TOKENS = 8
+
+def product_document(product) -> Dict[str, Any]:
+    """Searchable document for a catalogue Product (name, then keywords, then description)"""
+    fields = (
+        product.name,
+        " ".join([product.category, product.artisan, product.origin_village, *product.materials]),
+        product.description,
+    )
+    signature = "\x1f".join(fields + (str(product.rating), str(product.in_stock)))
+    return {
+        "key": (KIND, product.id),
+        "type": KIND,
+        "id": product.id,
+        "rating": product.rating,
+        "in_stock": product.in_stock,
+        "fields": fields,
+        "signature": hashlib.blake2b(signature.encode("utf-8"), digest_size=8).digest(),
+    }
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_edits(term: str) -> int:
+    """Typos tolerated for a term of this length"""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent swaps count once), or limit + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class ProductSearchIndex(BM25Index):
+    """
+    BM25 index over catalogue products, kept in step with each snapshot by sync().
+
+    Alongside the postings it maintains a sorted vocabulary (prefix ranges by binary
+    search) and a trigram -> terms map (typo candidates), both updated as terms
+    appear and disappear. Postings are compiled to numpy arrays on first use after
+    a write, so a query scores every matching product in a few vector operations.
+    """
+
+    def __init__(self, rating_boost: float = RATING_BOOST):
+        super().__init__()
+        self.rating_boost = rating_boost
+        self.vocabulary: List[str] = []
+        self.grams: Dict[str, Set[str]] = {}
+        self.surfaces: Dict[str, str] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._fuzzy: Dict[str, List[Tuple[str, int]]] = {}
+        self._compiled: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def upsert(self, document: Dict[str, Any]) -> bool:
+        if not super().upsert(document):
+            return False
+        new_terms = [term for term in document["terms"] if term not in self.surfaces]
+        if new_terms:
+            # First spelling of each new term as written, for completions
+            forms: Dict[str, str] = {}
+            for text in document["fields"]:
+                for term, start, end in iter_tokens(text):
+                    forms.setdefault(term, text[start:end].lower())
+            for term in new_terms:
+                self._add_term(term, forms.get(term, term))
+        for term in document["terms"]:
+            self._arrays.pop(term, None)
+        self._compiled = None
+        return True
+
+    def remove(self, key: DocKey) -> bool:
+        slot = self.slots.get(key)
+        if slot is None:
+            return False
+        terms = self.docs[slot]["terms"]
+        super().remove(key)
+        for term in terms:
+            self._arrays.pop(term, None)
+            if term not in self.postings:
+                self._drop_term(term)
+        self._compiled = None
+        return True
+
+    def _add_term(self, term: str, surface: str):
+        self.surfaces[term] = surface
+        self._fuzzy.clear()
+        bisect.insort(self.vocabulary, term)
+        for gram in trigrams(term):
+            self.grams.setdefault(gram, set()).add(term)
+
+    def _drop_term(self, term: str):
+        del self.surfaces[term]
+        self._fuzzy.clear()
+        del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+        for gram in trigrams(term):
+            terms = self.grams[gram]
+            terms.discard(term)
+            if not terms:
+                del self.grams[gram]
+
+    def sync(self, products: Iterable[Any]) -> Dict[str, int]:
+        """Make the index match products: index new or edited ones, drop the rest"""
+        seen = set()
+        updated = 0
+        for product in products:
+            document = product_document(product)
+            seen.add(document["key"])
+            updated += self.upsert(document)
+        removed = 0
+        for key in list(self.slots.keys() - seen):
+            removed += self.remove(key)
+        return {"updated": updated, "removed": removed}
+
+    def _compile(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-slot BM25 length norms, rating multipliers and stock flags"""
+        if self._compiled is None:
+            size = self._next_slot
+            norms = np.ones(size, dtype=np.float64)
+            boosts = np.zeros(size, dtype=np.float64)
+            in_stock = np.zeros(size, dtype=bool)
+            if self.docs:
+                slots = np.fromiter(self.doc_lengths.keys(), dtype=np.int64, count=len(self.doc_lengths))
+                lengths = np.fromiter(self.doc_lengths.values(), dtype=np.float64, count=len(self.doc_lengths))
+                norms[slots] = self.k1 * (1 - self.b + self.b * lengths / (self.total_length / len(self.docs)))
+                for slot, document in self.docs.items():
+                    boosts[slot] = 1 + self.rating_boost * document["rating"] / 5
+                    in_stock[slot] = document["in_stock"]
+            self._compiled = (norms, boosts, in_stock)
+        return self._compiled
+
+    def _postings_array(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.postings[term]
+            arrays = self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+        return arrays
+
+    def prefix_terms(self, prefix: str, limit: int = MAX_PREFIX_EXPANSIONS) -> List[str]:
+        """Indexed terms starting with prefix, most frequent first"""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff", start)
+        return heapq.nlargest(limit, self.vocabulary[start:end], key=lambda term: len(self.postings[term]))
+
+    def fuzzy_terms(self, term: str, limit: int = MAX_FUZZY_EXPANSIONS) -> List[Tuple[str, int]]:
+        """(indexed term, edits) within the typo budget of term, closest and most frequent first"""
+        cached = self._fuzzy.get(term)
+        if cached is not None:
+            return cached[:limit]
+        edits = max_edits(term)
+        if not edits:
+            return []
+        grams = trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        # Each edit changes at most four trigrams (an adjacent swap); verify the closest candidates only
+        needed = max(1, len(grams) - 4 * edits)
+        candidates = heapq.nlargest(
+            MAX_FUZZY_CANDIDATES,
+            (candidate for candidate, count in shared.items()
+             if count >= needed and candidate != term and abs(len(candidate) - len(term)) <= edits),
+            key=shared.__getitem__
+        )
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(term, candidate, edits)
+            if distance <= edits:
+                matches.append((distance, -len(self.postings[candidate]), candidate))
+        if len(self._fuzzy) >= FUZZY_CACHE_SIZE:
+            self._fuzzy.clear()
+        found = self._fuzzy[term] = [(candidate, distance) for distance, _, candidate in sorted(matches)[:MAX_FUZZY_EXPANSIONS]]
+        return found[:limit]
+
+    def expand(self, q: str) -> List[Tuple[str, List[Tuple[str, float]]]]:
+        """
+        Query tokens with the indexed terms each one matches and their weights.
+
+        The last token, unless followed by a space, is also read as a prefix.
+        Tokens with no exact or prefix match fall back to fuzzy matches.
+        """
+        matches = list(TOKEN_PATTERN.finditer(q))[:MAX_QUERY_TOKENS]
+        expanded = []
+        for i, match in enumerate(matches):
+            raw = match.group()
+            term = analyze_token(raw)
+            is_prefix = i == len(matches) - 1 and match.end() == len(q)
+            weights: Dict[str, float] = {}
+            if term and term in self.postings:
+                weights[term] = 1.0
+            if is_prefix and len(raw) >= 2:
+                prefix = normalize_hindi(raw) if DEVANAGARI.match(raw) else raw.lower()
+                for candidate in self.prefix_terms(prefix):
+                    weights.setdefault(candidate, PREFIX_WEIGHT)
+            if not weights and term:
+                for candidate, distance in self.fuzzy_terms(term):
+                    weights[candidate] = FUZZY_WEIGHT ** distance
+            if term or weights:
+                expanded.append((raw, list(weights.items())))
+        return expanded
+
+    def search_products(self, q: str, limit: int = 10, in_stock_only: bool = True) -> Tuple[int, List[Tuple[float, int]]]:
+        """Number of matching products and the best (score, product id) pairs"""
+        expanded = [weights for _, weights in self.expand(q) if weights]
+        if not expanded or not self.docs:
+            return 0, []
+        norms, boosts, in_stock = self._compile()
+        count = len(self.docs)
+        boost = self.k1 + 1
+        scores = np.zeros(len(norms), dtype=np.float64)
+        for weights in expanded:
+            # A product scores once per query token, by its best matching expansion
+            token_scores = np.zeros(len(norms), dtype=np.float64)
+            for term, weight in weights:
+                slots, frequencies = self._postings_array(term)
+                idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5)) * boost
+                contribution = weight * idf * frequencies / (frequencies + norms[slots])
+                token_scores[slots] = np.maximum(token_scores[slots], contribution)
+            scores += token_scores
+        scores *= boosts
+        if in_stock_only:
+            scores *= in_stock
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        # Best score first; ties in slot (insertion) order
+        matched = matched[np.lexsort((matched, -scores[matched]))]
+        return int(np.count_nonzero(scores)), [(float(scores[slot]), self.docs[int(slot)]["id"]) for slot in matched]
+
+    def completions(self, q: str, limit: int = 5) -> List[str]:
+        """Query strings completing the last token with indexed words, most common first"""
+        matches = list(TOKEN_PATTERN.finditer(q))
+        if not matches or matches[-1].end() != len(q):
+            return []
+        last = matches[-1]
+        head = q[:last.start()]
+        raw = last.group()
+        prefix = normalize_hindi(raw) if DEVANAGARI.match(raw) else raw.lower()
+        term = analyze_token(raw)
+        terms = ([term] if term in self.postings else []) + self.prefix_terms(prefix, limit)
+        if not terms:
+            terms = [candidate for candidate, _ in self.fuzzy_terms(term, limit)]
+        words = dict.fromkeys(self.surfaces.get(term, term) for term in terms)
+        return [head + word for word in words][:limit]
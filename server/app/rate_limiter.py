@@ -0,0 +1,303 @@
+"""
+Rate limiting for Deep-Shiva API
+Sliding-window counters with per-route cost weights and a shared-memory backend
+so limits hold across uvicorn workers
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - shared backend not available
+    fcntl = None
+
+from .logging_config import get_logger
+
+logger = get_logger("rate_limiter")
+
+# Relative cost of a request per route (1.0 = one request).
+# LLM-backed endpoints cost more than cheap probes.
+DEFAULT_ROUTE_COSTS: Dict[str, float] = {
+    "/api/v1/chat/query": 5.0,
+    "/api/v1/chat/test-ai": 5.0,
+    "/api/v1/chat/ollama/pull-model": 10.0,
+    "/api/v1/vision/analyze": 3.0,
+    "/api/v1/chat/translate": 2.0,
+    "/health": 0.2,
+    "/": 0.2,
+}
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit reservation"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+    cost: float
+
+def _slide_window(
+    stored_window: int,
+    prev: float,
+    curr: float,
+    now: float,
+    window: int,
+    limit: int,
+    cost: float
+) -> Tuple[int, float, float, RateLimitDecision]:
+    """
+    Apply one sliding-window-counter step.
+
+    The estimate weights the previous window by how much of it still overlaps
+    the sliding window, so memory per client is two counters regardless of rate.
+    """
+    current_window = int(now // window)
+
+    if stored_window == current_window - 1:
+        prev, curr = curr, 0.0
+    elif stored_window != current_window:
+        prev, curr = 0.0, 0.0
+
+    elapsed_fraction = (now % window) / window
+    estimated = prev * (1.0 - elapsed_fraction) + curr
+
+    if estimated + cost > limit:
+        if curr + cost > limit or prev <= 0:
+            retry_after = window - (now % window)
+        else:
+            # Wait until enough of the previous window has slid out
+            needed_fraction = 1.0 - (limit - curr - cost) / prev
+            retry_after = (needed_fraction - elapsed_fraction) * window
+        decision = RateLimitDecision(
+            allowed=False,
+            limit=limit,
+            remaining=max(0, int(limit - estimated)),
+            retry_after=max(1, math.ceil(retry_after)),
+            cost=cost
+        )
+        return current_window, prev, curr, decision
+
+    curr += cost
+    decision = RateLimitDecision(
+        allowed=True,
+        limit=limit,
+        remaining=max(0, int(limit - estimated - cost)),
+        retry_after=0,
+        cost=cost
+    )
+    return current_window, prev, curr, decision
+
+class LocalRateLimitBackend:
+    """In-process counters. Only correct with a single worker."""
+
+    name = "local"
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, cost: float, limit: int, window: int, now: float) -> RateLimitDecision:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [0, 0.0, 0.0]
+                self._entries[key] = entry
+            else:
+                self._entries.move_to_end(key)
+
+            entry[0], entry[1], entry[2], decision = _slide_window(
+                entry[0], entry[1], entry[2], now, window, limit, cost
+            )
+            self._expire(int(now // window))
+            return decision
+
+    def _expire(self, current_window: int):
+        """Drop at most two stale clients per call (amortized O(1))"""
+        for _ in range(2):
+            if not self._entries:
+                return
+            oldest_key = next(iter(self._entries))
+            if self._entries[oldest_key][0] >= current_window - 1:
+                return
+            del self._entries[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SharedMemoryRateLimitBackend:
+    """
+    Counters in a memory-mapped file shared by all workers on the host.
+
+    The file is a fixed-size open-addressing hash table of slots
+    (key hash, window index, previous count, current count) guarded by flock.
+    """
+
+    name = "shared"
+    SLOT = struct.Struct("<Qqdd")
+    MAX_PROBES = 16
+
+    def __init__(self, path: str, slots: int = 4096):
+        if fcntl is None:
+            raise RuntimeError("Shared rate limit backend requires fcntl (POSIX)")
+
+        self.path = path
+        self.slots = slots
+        size = self.SLOT.size * slots
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") | 1  # 0 marks an empty slot
+
+    def reserve(self, key: str, cost: float, limit: int, window: int, now: float) -> RateLimitDecision:
+        key_hash = self._hash(key)
+        current_window = int(now // window)
+
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offset = self._find_slot(key_hash, current_window)
+                if offset is None:
+                    # Table saturated with live clients - fail open rather than block traffic
+                    return RateLimitDecision(True, limit, limit, 0, cost)
+
+                stored_hash, stored_window, prev, curr = self.SLOT.unpack_from(self._map, offset)
+                if stored_hash != key_hash:
+                    stored_window, prev, curr = 0, 0.0, 0.0
+
+                stored_window, prev, curr, decision = _slide_window(
+                    stored_window, prev, curr, now, window, limit, cost
+                )
+                self.SLOT.pack_into(self._map, offset, key_hash, stored_window, prev, curr)
+                return decision
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find_slot(self, key_hash: int, current_window: int) -> Optional[int]:
+        """Return the slot for key_hash, or the first empty/expired slot on its probe path"""
+        reusable = None
+        start = key_hash % self.slots
+        for probe in range(self.MAX_PROBES):
+            offset = ((start + probe) % self.slots) * self.SLOT.size
+            stored_hash, stored_window, _, _ = self.SLOT.unpack_from(self._map, offset)
+            if stored_hash == key_hash:
+                return offset
+            if stored_hash == 0:
+                return reusable if reusable is not None else offset
+            if reusable is None and stored_window < current_window - 1:
+                reusable = offset
+        return reusable
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+class RateLimiter:
+    """Weighted sliding-window rate limiter keyed by client"""
+
+    def __init__(
+        self,
+        backend,
+        limit: int,
+        window: int,
+        route_costs: Optional[Dict[str, float]] = None
+    ):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+        self.route_costs = dict(DEFAULT_ROUTE_COSTS if route_costs is None else route_costs)
+        # Longest prefix wins; "/" only matches exactly
+        self._prefixes = sorted(
+            (path for path in self.route_costs if path != "/"),
+            key=len,
+            reverse=True
+        )
+        self.cost_for = lru_cache(maxsize=2048)(self._cost_for)
+
+    def _cost_for(self, path: str) -> float:
+        cost = self.route_costs.get(path)
+        if cost is not None:
+            return cost
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                return self.route_costs[prefix]
+        return 1.0
+
+    def reserve(self, client_key: str, path: str, now: Optional[float] = None) -> RateLimitDecision:
+        """Reserve capacity for a request before it is dispatched"""
+        cost = self.cost_for(path)
+        return self.backend.reserve(
+            client_key,
+            cost,
+            self.limit,
+            self.window,
+            time.time() if now is None else now
+        )
+
+def parse_route_costs(raw: Optional[str]) -> Dict[str, float]:
+    """Parse "path=cost,path=cost" overrides on top of the defaults"""
+    costs = dict(DEFAULT_ROUTE_COSTS)
+    if not raw:
+        return costs
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        path, cost = item.rsplit("=", 1)
+        try:
+            costs[path.strip()] = float(cost)
+        except ValueError:
+            logger.warning("Ignoring invalid route cost", extra={"route_cost": item})
+    return costs
+
+def create_rate_limiter(settings) -> RateLimiter:
+    """Build the rate limiter described by settings, falling back to the local backend"""
+    backend = None
+    if settings.rate_limit_backend == "shared":
+        path = settings.rate_limit_shared_path
+        if not path:
+            shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = os.path.join(shm_dir, "deep_shiva_rate_limit.bin")
+        try:
+            backend = SharedMemoryRateLimitBackend(path, settings.rate_limit_slots)
+        except (OSError, RuntimeError) as e:
+            logger.warning("Shared rate limit backend unavailable, using local counters", extra={
+                "error": str(e)
+            })
+
+    if backend is None:
+        backend = LocalRateLimitBackend()
+
+    logger.info("Rate limiter initialized", extra={
+        "backend": backend.name,
+        "limit": settings.rate_limit_requests,
+        "window": settings.rate_limit_window
+    })
+
+    return RateLimiter(
+        backend=backend,
+        limit=settings.rate_limit_requests,
+        window=settings.rate_limit_window,
+        route_costs=parse_route_costs(settings.rate_limit_route_costs)
+    )
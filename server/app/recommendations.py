@@ -0,0 +1,325 @@
+"""
+Product recommendations for Deep-Shiva API
+Item-item neighbours from shared category, village and materials plus session co-views, precomputed per catalogue snapshot and served in O(K)
+"""
+
+import asyncio
+import heapq
+import time
+from collections import OrderedDict, deque
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import settings
+from .logging_config import get_logger
+
+logger = get_logger("recommendations")
+
+# Relative weight of each kind of shared attribute (scaled by idf, so rare materials count most)
+FEATURE_WEIGHTS = {"category": 1.0, "village": 0.6, "material": 1.0}
+# Candidate pairs expanded per block, bounds build memory
+BLOCK_CELLS = 4_000_000
+# A pair viewed together c times adds co_view_weight * c / (c + CO_VIEW_DAMPING)
+CO_VIEW_DAMPING = 3
+# Each earlier view in a session counts this much less towards personalized picks
+RECENCY_DECAY = 0.8
+
+def product_features(product) -> Dict[Hashable, float]:
+    features = {
+        ("category", product.category.lower()): FEATURE_WEIGHTS["category"],
+        ("village", product.origin_village.lower()): FEATURE_WEIGHTS["village"],
+    }
+    for material in product.materials:
+        features[("material", material.lower())] = FEATURE_WEIGHTS["material"]
+    return features
+
+def content_neighbours(products: Sequence[Any], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k neighbours of every product by cosine similarity of idf-weighted features.
+
+    Returns (n, k) positions (-1 where fewer than k products share anything) and
+    float32 scores, best first. Village and material overlaps come from multiplying
+    the sparse product-feature matrix by its transpose a block of rows at a time:
+    each feature expands to its postings and the pairs are summed after one sort.
+    Category, shared by large groups, is not expanded: a product sharing only the
+    category scores higher the smaller its norm, so the k smallest-norm members of
+    each category are the only category-only candidates that can make a top k.
+    """
+    n = len(products)
+    neighbours = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if n < 2 or k < 1:
+        return neighbours, scores
+
+    columns: Dict[Hashable, int] = {}
+    categories: Dict[Hashable, int] = {}
+    category = np.empty(n, dtype=np.int64)
+    rows, cols, values = [], [], []
+    for position, product in enumerate(products):
+        for key, weight in product_features(product).items():
+            if key[0] == "category":
+                category[position] = categories.setdefault(key, len(categories))
+                continue
+            rows.append(position)
+            cols.append(columns.setdefault(key, len(columns)))
+            values.append(weight)
+    rows = np.array(rows, dtype=np.int64)
+    cols = np.array(cols, dtype=np.int64)
+    frequency = np.bincount(cols, minlength=len(columns))
+    values = np.array(values, dtype=np.float64) * np.log1p(n / frequency[cols])
+    category_size = np.bincount(category, minlength=len(categories))
+    category_value = (FEATURE_WEIGHTS["category"] * np.log1p(n / category_size))[category]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n) + category_value ** 2)
+
+    # Feature postings (column-major copy of the matrix); rows are already grouped by product
+    order = np.argsort(cols, kind="stable")
+    posting_rows, posting_values = rows[order], values[order]
+    posting_start = np.concatenate(([0], np.cumsum(frequency)))
+    row_start = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n))))
+    # Members of each category, smallest norm first
+    by_norm = np.lexsort((norms, category))
+    category_start = np.concatenate(([0], np.cumsum(category_size)))
+    fill = min(k + 1, int(category_size.max()))
+
+    # A shared feature adds its value squared; the last slot marks category-only candidates
+    shared_weight = np.zeros(len(columns) + 1)
+    shared_weight[cols] = values ** 2
+    shift = len(columns).bit_length()
+    feature_mask = (1 << shift) - 1
+
+    # Blocks of consecutive products whose expansions hold about BLOCK_CELLS pairs
+    expanded = np.concatenate(([0], np.cumsum(np.bincount(rows, weights=frequency[cols], minlength=n))))
+    bounds = np.unique(np.concatenate((
+        np.searchsorted(expanded, np.arange(0, expanded[-1], BLOCK_CELLS), side="right") - 1, [n]
+    )))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        start, stop = int(start), max(int(stop), int(start) + 1)
+        low, high = row_start[start], row_start[stop]
+        entry_cols = cols[low:high]
+        lengths = frequency[entry_cols]
+        # Index of every posting each (product, feature) entry expands to
+        offsets = np.repeat(posting_start[entry_cols] - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        pairs = ((np.repeat(rows[low:high], lengths) * n + posting_rows[offsets]) << shift) | np.repeat(entry_cols, lengths)
+
+        block_rows = np.arange(start, stop)
+        members = category_start[category[start:stop], None] + np.arange(fill)
+        valid = members < category_start[category[start:stop] + 1, None]
+        fillers = np.broadcast_to(block_rows[:, None], members.shape)[valid] * n + by_norm[members[valid]]
+        pairs = np.sort(np.concatenate((pairs, (fillers << shift) | len(columns))))
+
+        # Sum the shared features of each (product, product) pair
+        cells = pairs >> shift
+        first = np.flatnonzero(np.concatenate(([True], cells[1:] != cells[:-1])))
+        overlap = np.add.reduceat(shared_weight[pairs & feature_mask], first)
+        row, column = np.divmod(cells[first], n)
+        other = row != column
+        row, column, overlap = row[other], column[other], overlap[other]
+        similarity = overlap + (category[row] == category[column]) * category_value[column] ** 2
+        similarity /= norms[row] * norms[column]
+
+        # Rows are already grouped; order each row best first (scores quantized to 2^-31)
+        ranked = np.argsort((row << 32) | ((1 - np.clip(similarity, 0, 1)) * (1 << 31)).astype(np.int64))
+        row, column, similarity = row[ranked], column[ranked], similarity[ranked]
+        rank = np.arange(len(row)) - np.searchsorted(row, row)
+        keep = rank < k
+        neighbours[row[keep], rank[keep]] = column[keep]
+        scores[row[keep], rank[keep]] = similarity[keep]
+    return neighbours, scores
+
+class NeighbourModel:
+    """Content neighbours and same-artisan lists for one catalogue snapshot"""
+
+    def __init__(self, snapshot, k: int, previous: Optional["NeighbourModel"] = None):
+        start = time.perf_counter()
+        products = snapshot.products
+        self.snapshot = snapshot
+        self.content_key = hash(tuple(
+            (product.id, product.category, product.origin_village, tuple(product.materials)) for product in products
+        ))
+        if previous is not None and previous.content_key == self.content_key and previous.neighbours.shape[1] == k:
+            # Only prices, stock or ratings changed: the neighbour lists still hold
+            self.ids, self.positions = previous.ids, previous.positions
+            self.neighbours, self.scores = previous.neighbours, previous.scores
+        else:
+            self.ids = np.array([product.id for product in products], dtype=np.int64)
+            self.positions: Dict[int, int] = {product.id: i for i, product in enumerate(products)}
+            self.neighbours, self.scores = content_neighbours(products, k)
+        by_artisan: Dict[str, List[Any]] = {}
+        for product in products:
+            by_artisan.setdefault(product.artisan, []).append(product)
+        self.by_artisan: Dict[str, Tuple[int, ...]] = {
+            artisan: tuple(product.id for product in sorted(items, key=lambda product: product.rating, reverse=True))
+            for artisan, items in by_artisan.items()
+        }
+        self.build_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def content(self, product_id: int) -> List[Tuple[int, float]]:
+        position = self.positions.get(product_id)
+        if position is None:
+            return []
+        return [
+            (int(self.ids[other]), float(score))
+            for other, score in zip(self.neighbours[position], self.scores[position])
+            if other >= 0
+        ]
+
+class Recommender:
+    """
+    Related and personalized product lists.
+
+    Content similarity is precomputed per catalogue snapshot (off the event loop)
+    as a top-2K neighbour list per product. Product views carrying a session id
+    add co-view counts; a product's final top-K merges both and is cached until
+    its counts change, so serving reads at most a few K-length lists.
+    Sessions and co-views are in memory, per worker.
+    """
+
+    def __init__(
+        self,
+        neighbours: int = 20,
+        co_view_weight: float = 0.5,
+        recent_views: int = 10,
+        max_sessions: int = 10000
+    ):
+        self.k = neighbours
+        self.co_view_weight = co_view_weight
+        self.recent_views = recent_views
+        self.max_sessions = max_sessions
+        self.model: Optional[NeighbourModel] = None
+        self.sessions: "OrderedDict[str, Deque[int]]" = OrderedDict()
+        self.co_views: Dict[int, Dict[int, int]] = {}
+        self._lists: Dict[int, List[Tuple[int, float]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.views = 0
+
+    async def ensure_fresh(self, snapshot) -> NeighbourModel:
+        """Model for snapshot; the first build is awaited, later ones run in the background"""
+        model = self.model
+        if model is None:
+            await asyncio.shield(self._ensure_build(snapshot))
+        elif model.snapshot is not snapshot:
+            self._ensure_build(snapshot)
+        return self.model
+
+    def _ensure_build(self, snapshot) -> asyncio.Task:
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._task = asyncio.create_task(self._build(snapshot))
+        return task
+
+    async def _build(self, snapshot):
+        try:
+            model = await asyncio.to_thread(NeighbourModel, snapshot, 2 * self.k, self.model)
+        except Exception as e:
+            logger.error("Recommendation build failed", extra={"error": str(e)})
+            if self.model is None:
+                raise
+            return
+        self.model = model
+        self._lists.clear()
+        logger.info("Recommendation neighbours built", extra={
+            "products": len(model.ids),
+            "duration_ms": model.build_ms
+        })
+
+    def record_view(self, session_id: str, product_id: int):
+        """Count product_id as viewed together with the session's recent views"""
+        recent = self.sessions.get(session_id)
+        if recent is None:
+            recent = self.sessions[session_id] = deque(maxlen=self.recent_views)
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+            if product_id in recent:
+                recent.remove(product_id)
+        for other in recent:
+            for a, b in ((product_id, other), (other, product_id)):
+                counts = self.co_views.setdefault(a, {})
+                counts[b] = counts.get(b, 0) + 1
+                if len(counts) > 4 * self.k:
+                    # Keep the strongest co-views so merging stays O(K)
+                    self.co_views[a] = dict(heapq.nlargest(2 * self.k, counts.items(), key=itemgetter(1)))
+            self._lists.pop(other, None)
+        self._lists.pop(product_id, None)
+        recent.append(product_id)
+        self.views += 1
+
+    def neighbours(self, product_id: int) -> List[Tuple[int, float]]:
+        """Top-K (product id, score) by content similarity plus co-views, best first"""
+        cached = self._lists.get(product_id)
+        if cached is not None:
+            return cached
+        model = self.model
+        if model is None:
+            return []
+        scores = dict(model.content(product_id))
+        for other, count in self.co_views.get(product_id, {}).items():
+            if other in model.positions and other != product_id:
+                scores[other] = scores.get(other, 0.0) + self.co_view_weight * count / (count + CO_VIEW_DAMPING)
+        ranked = self._lists[product_id] = heapq.nlargest(self.k, scores.items(), key=itemgetter(1))
+        return ranked
+
+    def related(self, product_id: int, limit: int = 6) -> Dict[str, List[Any]]:
+        """In-stock products like product_id, and more from the same artisan"""
+        model = self.model
+        snapshot = model.snapshot
+        product = snapshot.get(product_id)
+        if product is None:
+            return {"related": [], "same_artisan": []}
+        related = [snapshot.get(other) for other, _ in self.neighbours(product_id)]
+        same_artisan = [snapshot.get(other) for other in model.by_artisan.get(product.artisan, ())[:limit + 1]]
+        return {
+            "related": [item for item in related if item is not None and item.in_stock][:limit],
+            "same_artisan": [item for item in same_artisan if item.id != product_id and item.in_stock][:limit],
+        }
+
+    def featured(self, session_id: Optional[str], limit: int = 5) -> List[Any]:
+        """Products near the session's recent views, topped up with the top-rated ones"""
+        snapshot = self.model.snapshot
+        recent = list(self.sessions.get(session_id, ())) if session_id else []
+        scores: Dict[int, float] = {}
+        for age, viewed in enumerate(reversed(recent)):
+            decay = RECENCY_DECAY ** age
+            for other, score in self.neighbours(viewed):
+                scores[other] = scores.get(other, 0.0) + decay * score
+        picks = []
+        seen = set(recent)
+        for other, _ in sorted(scores.items(), key=itemgetter(1), reverse=True):
+            product = snapshot.get(other)
+            if product is not None and product.in_stock and other not in seen:
+                picks.append(product)
+                seen.add(other)
+                if len(picks) == limit:
+                    return picks
+        # Top up with featured, then other in-stock products by rating
+        for product in chain(snapshot.featured, snapshot.orderings["rating"]):
+            if len(picks) == limit:
+                break
+            if product.in_stock and product.id not in seen:
+                picks.append(product)
+                seen.add(product.id)
+        return picks
+
+    def get_stats(self) -> Dict[str, Any]:
+        model = self.model
+        return {
+            "products": len(model.ids) if model else 0,
+            "build_ms": model.build_ms if model else None,
+            "neighbours": self.k,
+            "sessions": len(self.sessions),
+            "views": self.views,
+            "co_viewed_products": len(self.co_views),
+            "cached_lists": len(self._lists)
+        }
+
+# Global recommender for the culture router
+recommender = Recommender(
+    neighbours=settings.recommend_neighbours,
+    co_view_weight=settings.recommend_co_view_weight,
+    recent_views=settings.recommend_recent_views,
+    max_sessions=settings.recommend_max_sessions
+)
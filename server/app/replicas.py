@@ -0,0 +1,214 @@
+"""
+Read-replica routing for Deep-Shiva API
+Sends read-only sessions to replicas whose replication lag is within bounds, falling back to the primary
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .config import settings
+from .database import AsyncSessionLocal, async_engine, pool_metrics, to_async_url
+from .db_pool import PoolMetrics, attach_pool_metrics, pool_options
+from .logging_config import get_logger
+
+logger = get_logger("replicas")
+
+# Errors that mean the replica itself is unusable (connection lost, server gone)
+REPLICA_ERRORS = (exc.OperationalError, exc.InterfaceError)
+
+# Seconds behind the primary. While the WAL receiver is streaming and everything received
+# has been replayed the replica is current (0: an idle primary would otherwise look like
+# growing lag). With the receiver down, equal LSNs prove nothing, so lag is the age of the
+# last replayed transaction (or the uptime when none has been replayed yet).
+POSTGRES_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN COALESCE((SELECT status = 'streaming' FROM pg_stat_wal_receiver), false)
+            AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - COALESCE(pg_last_xact_replay_timestamp(), pg_postmaster_start_time()))
+    END
+""")
+
+async def replication_lag(engine: AsyncEngine) -> float:
+    """Replica lag in seconds (other dialects only prove the replica answers)"""
+    async with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            return float((await connection.execute(POSTGRES_LAG_SQL)).scalar_one())
+        await connection.execute(text("SELECT 1"))
+        return 0.0
+
+class ReplicaState:
+    """Last known health of one replica"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.sessions = async_sessionmaker(
+            bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        self.healthy = False  # unknown until the first lag check
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.reads = 0
+
+class ReplicaRouter:
+    """
+    Pick an engine for read-only work.
+
+    Replicas are used round-robin while their measured lag is at most max_lag seconds.
+    Lag is re-checked in the background every check_interval seconds, so routing never
+    waits on a probe; until a replica has passed a check, reads go to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Dict[str, AsyncEngine],
+        max_lag: float = 5.0,
+        check_interval: float = 10.0,
+        check_timeout: float = 2.0,
+        lag_probe: Callable[[AsyncEngine], Awaitable[float]] = replication_lag,
+        primary_sessions=AsyncSessionLocal
+    ):
+        self.primary = primary
+        self.primary_sessions = primary_sessions
+        self.replicas = [ReplicaState(name, engine) for name, engine in replicas.items()]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.lag_probe = lag_probe
+        self.primary_reads = 0
+        self._next = 0
+        self._last_check = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[ReplicaState]:
+        """A healthy replica, or None for the primary"""
+        self._maybe_refresh()
+        healthy = [state for state in self.replicas if state.healthy]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        state = healthy[self._next % len(healthy)]
+        self._next += 1
+        state.reads += 1
+        return state
+
+    def session(self) -> Tuple[Optional[ReplicaState], AsyncSession]:
+        state = self.choose()
+        db = state.sessions() if state else self.primary_sessions()
+        if state is not None:
+            # Lets report_read_error find the replica behind a failed session
+            db.info["replica"] = (self, state)
+        return state, db
+
+    def _maybe_refresh(self):
+        if not self.replicas or time.monotonic() - self._last_check < self.check_interval:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._last_check = time.monotonic()
+        self._task = loop.create_task(self.check_replicas())
+
+    async def check_replicas(self):
+        """Probe every replica's lag and update routing"""
+        for state in self.replicas:
+            try:
+                lag = await asyncio.wait_for(self.lag_probe(state.engine), self.check_timeout)
+            except Exception as e:
+                self.mark_failed(state, e)
+                continue
+            was_healthy = state.healthy
+            state.lag = lag
+            state.error = None
+            state.healthy = lag <= self.max_lag
+            state.checked_at = time.time()
+            if was_healthy and not state.healthy:
+                logger.warning("Replica lagging, reads moved to primary", extra={
+                    "replica": state.name,
+                    "lag_seconds": lag,
+                    "max_lag_seconds": self.max_lag
+                })
+        self._last_check = time.monotonic()
+
+    def mark_failed(self, state: ReplicaState, error: Exception):
+        """Take a replica out of rotation until its next successful check"""
+        if state.healthy:
+            logger.warning("Replica unavailable, reads moved to primary", extra={
+                "replica": state.name,
+                "error": str(error)
+            })
+        state.healthy = False
+        state.lag = None
+        state.error = str(error)
+        state.checked_at = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "primary_reads": self.primary_reads,
+            "replicas": {
+                state.name: {
+                    "healthy": state.healthy,
+                    "lag_seconds": state.lag,
+                    "reads": state.reads,
+                    "error": state.error,
+                    "checked_at": state.checked_at
+                } for state in self.replicas
+            }
+        }
+
+def _create_replica_engines(urls: List[str]) -> Dict[str, AsyncEngine]:
+    engines = {}
+    for index, url in enumerate(urls, start=1):
+        name = f"replica_{index}"
+        pool_metrics[name] = PoolMetrics(name)
+        engine = create_async_engine(
+            to_async_url(url), **pool_options(url, settings, pool_metrics[name], is_async=True)
+        )
+        attach_pool_metrics(engine.sync_engine, pool_metrics[name])
+        engines[name] = engine
+    return engines
+
+# Global router; with no DATABASE_REPLICA_URLS every read goes to the primary
+replica_router = ReplicaRouter(
+    async_engine,
+    _create_replica_engines(settings.database_replica_urls),
+    max_lag=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_check_interval
+)
+
+def read_session() -> AsyncSession:
+    """Session for read-only work outside a request (e.g. background refreshes)"""
+    return replica_router.session()[1]
+
+def report_read_error(db: AsyncSession, error: Exception):
+    """
+    Take the session's replica out of rotation if a read failed on it.
+
+    Call before turning a database error into an HTTP error: the next read then goes
+    to the primary (or another replica) instead of waiting for the next lag check.
+    """
+    replica = db.info.get("replica")
+    if replica is not None and isinstance(error, REPLICA_ERRORS):
+        router, state = replica
+        router.mark_failed(state, error)
+
+async def get_read_db():
+    """Dependency for read-only endpoints: a replica session when one is healthy"""
+    _, db = replica_router.session()
+    async with db:
+        try:
+            yield db
+        except Exception as e:
+            report_read_error(db, e)
+            raise
@@ -0,0 +1,67 @@
+"""
+Fast JSON responses for Deep-Shiva API
+orjson-backed serialization used app-wide, with a stdlib fallback when orjson is missing
+"""
+
+import json
+import math
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively"""
+    if isinstance(obj, BaseModel):
+        # Already validated - dump without re-validating; JSON mode and aliases as jsonable_encoder
+        return obj.model_dump(mode="json", by_alias=True)
+    return jsonable_encoder(obj)
+
+def _finite(value: Any) -> Any:
+    """jsonable_encoder output with NaN/Infinity replaced by None, as orjson and pydantic-core write them"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to compact UTF-8 JSON bytes.
+
+    Decodes to the same value as json.dumps(jsonable_encoder(content)) on every
+    path, except that NaN and infinities become null instead of invalid JSON.
+    """
+    if isinstance(content, BaseModel) or (isinstance(content, (list, tuple)) and content and isinstance(content[0], BaseModel)):
+        # Validated models (or lists of them): pydantic-core's serializer, no Python call per object
+        return to_json(content, by_alias=True)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        _finite(jsonable_encoder(content)),
+        ensure_ascii=False,
+        separators=(",", ":"),
+        allow_nan=False
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Routes that already hold validated models or plain dicts can return this
+    directly to skip FastAPI's response_model re-validation and jsonable_encoder.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,491 @@
+"""
+Product reviews for Deep-Shiva API
+Write-behind review buffer with background moderation, batched inserts and additive rating aggregates per product and artisan
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .logging_config import get_logger
+from .models import ProductReview, RatingAggregate
+from .replicas import read_session
+
+logger = get_logger("reviews")
+
+STATUSES = ("pending", "approved", "rejected")
+STAR_COLUMNS = ("stars_1", "stars_2", "stars_3", "stars_4", "stars_5")
+WRITE_CHUNK = 500
+# Failed single-review writes after which a review is taken out of the buffer
+MAX_WRITE_ATTEMPTS = 3
+# Reviewer/product/comment hashes remembered for duplicate detection
+DUPLICATE_WINDOW = 10000
+
+LINK_PATTERN = re.compile(r"https?://|www\.|\b[\w.-]+\.(?:com|in|net|org|xyz)\b", re.IGNORECASE)
+CONTACT_PATTERN = re.compile(r"\b\d{10}\b|\+\d[\d -]{8,}\d|[\w.+-]+@[\w-]+\.[\w.]+")
+REPEATED_PATTERN = re.compile(r"(.)\1{5,}")
+REASON_LENGTH = ProductReview.__table__.c.moderation_reason.type.length
+
+# [review_count, rating_sum, stars_1..stars_5]
+Aggregate = List[int]
+
+def _new() -> Aggregate:
+    return [0] * (2 + len(STAR_COLUMNS))
+
+def _add(aggregate: Aggregate, rating: int, sign: int = 1):
+    aggregate[0] += sign
+    aggregate[1] += sign * rating
+    aggregate[1 + rating] += sign
+
+def summarize(aggregate: Optional[Aggregate]) -> Dict[str, Any]:
+    aggregate = aggregate or _new()
+    count = aggregate[0]
+    return {
+        "reviews_count": count,
+        "average_rating": round(aggregate[1] / count, 2) if count else None,
+        "histogram": {str(stars): aggregate[1 + stars] for stars in range(1, 6)}
+    }
+
+def _review_deltas(review: Dict[str, Any]) -> Dict[Tuple[str, str], Aggregate]:
+    """What a buffered review adds to the aggregates when written"""
+    deltas: Dict[Tuple[str, str], Aggregate] = {}
+    if review["status"] == "approved":
+        for key in (("product", str(review["product_id"])), ("artisan", review["artisan_name"])):
+            _add(deltas.setdefault(key, _new()), review["rating"])
+    return deltas
+
+def _merge(target: Dict[Tuple[str, str], Aggregate], deltas: Dict[Tuple[str, str], Aggregate], sign: int = 1):
+    for key, delta in deltas.items():
+        merged = target.setdefault(key, _new())
+        for i, value in enumerate(delta):
+            merged[i] += sign * value
+
+def _as_dict(row: ProductReview) -> Dict[str, Any]:
+    return {column.name: getattr(row, column.name) for column in ProductReview.__table__.columns if column.name != "id"}
+
+def _reason(text: Optional[str]) -> Optional[str]:
+    """Fit a moderation reason into its column (long blocked-term lists are cut)"""
+    if text is None or len(text) <= REASON_LENGTH:
+        return text
+    return text[:REASON_LENGTH - 1] + "…"
+
+def moderation_issues(comment: str, reviewer_name: str, blocked_terms: Iterable[str] = ()) -> List[str]:
+    """Reasons a review needs a human look (empty when it can be published)"""
+    issues = []
+    text = f"{reviewer_name} {comment}"
+    if LINK_PATTERN.search(text):
+        issues.append("contains a link")
+    if CONTACT_PATTERN.search(text):
+        issues.append("contains contact details")
+    lowered = text.lower()
+    blocked = [term for term in blocked_terms if term and re.search(rf"\b{re.escape(term)}\b", lowered)]
+    if blocked:
+        issues.append("blocked terms: " + ", ".join(blocked))
+    letters = [char for char in comment if char.isalpha()]
+    if len(letters) >= 20 and sum(char.isupper() for char in letters) > 0.7 * len(letters):
+        issues.append("mostly capitals")
+    if REPEATED_PATTERN.search(comment):
+        issues.append("repeated characters")
+    return issues
+
+def upsert_statement(dialect_name: str, rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT adding the deltas to the stored aggregate (safe from any number of workers)"""
+    insert_ = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert_(RatingAggregate).values(rows)
+    excluded = statement.excluded
+    values = {
+        name: getattr(RatingAggregate, name) + excluded[name]
+        for name in ("review_count", "rating_sum") + STAR_COLUMNS
+    }
+    values["updated_at"] = excluded["updated_at"]
+    return statement.on_conflict_do_update(index_elements=["scope", "subject"], set_=values)
+
+def _aggregate_rows(deltas: Dict[Tuple[str, str], Aggregate], now: datetime) -> List[Dict[str, Any]]:
+    return [
+        {
+            "scope": scope,
+            "subject": subject,
+            "review_count": delta[0],
+            "rating_sum": delta[1],
+            **{name: delta[2 + i] for i, name in enumerate(STAR_COLUMNS)},
+            "updated_at": now,
+        }
+        for (scope, subject), delta in deltas.items()
+    ]
+
+async def load_rating_aggregates(db: AsyncSession, scope: str, subjects: Optional[Iterable[str]] = None) -> Dict[str, Aggregate]:
+    """Stored aggregates of one scope (optionally only some subjects)"""
+    query = select(
+        RatingAggregate.subject, RatingAggregate.review_count, RatingAggregate.rating_sum,
+        *[getattr(RatingAggregate, name) for name in STAR_COLUMNS]
+    ).where(RatingAggregate.scope == scope)
+    if subjects is not None:
+        query = query.where(RatingAggregate.subject.in_(list(subjects)))
+    return {subject: list(values) for subject, *values in (await db.execute(query)).all()}
+
+class ReviewStore:
+    """
+    Reviews accepted on the request path and written behind.
+
+    submit() only validates, assigns the review id and appends to a buffer. A
+    background tick then runs the automatic checks over everything new (clean
+    reviews are approved, suspicious ones stay pending for a moderator, duplicates
+    are rejected) and writes the batch: one multi-row insert plus additive upserts
+    of the per-product and per-artisan aggregates, in one transaction. Approving or
+    rejecting by hand later adjusts the aggregates by the same deltas.
+
+    Reviews from a batch that failed to write are retried one at a time, so a row
+    the database keeps refusing cannot hold back the others; after max_attempts
+    failed writes of its own it is moved to failed (kept in memory and logged).
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        read_session_factory=read_session,
+        batch_size: int = 200,
+        auto_approve: bool = True,
+        blocked_terms: Iterable[str] = (),
+        on_ratings_changed=None,
+        max_attempts: int = MAX_WRITE_ATTEMPTS
+    ):
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.batch_size = batch_size
+        self.auto_approve = auto_approve
+        self.blocked_terms = [term.strip().lower() for term in blocked_terms if term.strip()]
+        self.on_ratings_changed = on_ratings_changed
+        self.max_attempts = max_attempts
+        self._unmoderated: List[Dict[str, Any]] = []
+        self._buffer: Dict[str, Dict[str, Any]] = OrderedDict()
+        self._deltas: Dict[Tuple[str, str], Aggregate] = {}
+        self._recent_hashes: "OrderedDict[bytes, None]" = OrderedDict()
+        # review_uid -> failed single-review writes, for reviews whose batch failed
+        self._attempts: Dict[str, int] = {}
+        self.failed: Dict[str, Dict[str, Any]] = OrderedDict()
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self.stats = {
+            "submitted": 0, "approved": 0, "flagged": 0, "rejected": 0, "written": 0,
+            "flushes": 0, "failures": 0, "given_up": 0
+        }
+        self.last_flush_ms: Optional[float] = None
+
+    def _flush_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _event(self) -> asyncio.Event:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    def submit(self, product, rating: int, comment: str, reviewer_name: str) -> Dict[str, Any]:
+        """Accept a review for product; nothing is written until the next flush"""
+        review = {
+            "review_uid": uuid.uuid4().hex,
+            "product_id": product.id,
+            "artisan_name": product.artisan,
+            "rating": rating,
+            "comment": comment,
+            "reviewer_name": reviewer_name,
+            "status": "pending",
+            "moderation_reason": None,
+            "created_at": datetime.now(timezone.utc),
+            "moderated_at": None,
+        }
+        self._unmoderated.append(review)
+        self._buffer[review["review_uid"]] = review
+        self.stats["submitted"] += 1
+        if len(self._buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+        return review
+
+    def _set_status(self, review: Dict[str, Any], status: str, reason: Optional[str], deltas=None):
+        """Change a review's status, moving its rating in or out of the aggregates"""
+        deltas = self._deltas if deltas is None else deltas
+        sign = (status == "approved") - (review["status"] == "approved")
+        if sign:
+            for key in (("product", str(review["product_id"])), ("artisan", review["artisan_name"])):
+                _add(deltas.setdefault(key, _new()), review["rating"], sign)
+        review["status"] = status
+        review["moderation_reason"] = _reason(reason)
+        review["moderated_at"] = datetime.now(timezone.utc)
+
+    def moderate_new(self) -> int:
+        """Automatic checks for every review submitted since the last run"""
+        reviews, self._unmoderated = self._unmoderated, []
+        for review in reviews:
+            fingerprint = hashlib.blake2b(
+                "\x1f".join((str(review["product_id"]), review["reviewer_name"].lower(), " ".join(review["comment"].lower().split()))).encode("utf-8"),
+                digest_size=16
+            ).digest()
+            if fingerprint in self._recent_hashes:
+                self._set_status(review, "rejected", "duplicate review")
+                self.stats["rejected"] += 1
+                continue
+            self._recent_hashes[fingerprint] = None
+            if len(self._recent_hashes) > DUPLICATE_WINDOW:
+                self._recent_hashes.popitem(last=False)
+
+            issues = moderation_issues(review["comment"], review["reviewer_name"], self.blocked_terms)
+            if issues:
+                review["moderation_reason"] = _reason("; ".join(issues))
+                self.stats["flagged"] += 1
+            elif self.auto_approve:
+                self._set_status(review, "approved", None)
+                self.stats["approved"] += 1
+        return len(reviews)
+
+    async def flush(self) -> Dict[str, int]:
+        """
+        Moderate and write everything buffered.
+
+        Reviews that are not written (a failed write, or the flush being cancelled)
+        go back into the buffer with their aggregate deltas; the first write error
+        is raised once every batch has been tried.
+        """
+        async with self._flush_lock():
+            self.moderate_new()
+            reviews, self._buffer = list(self._buffer.values()), OrderedDict()
+            deltas, self._deltas = self._deltas, {}
+            if not reviews and not deltas:
+                return {"reviews": 0, "aggregates": 0}
+            start = time.perf_counter()
+            batches = self._batches(reviews, deltas)
+            written, aggregates, error = 0, 0, None
+            try:
+                while batches:
+                    batch, batch_deltas = batches[0]
+                    try:
+                        async with self.session_factory() as db:
+                            await self._write(db, batch, batch_deltas)
+                            batches.pop(0)
+                    except Exception as e:
+                        if batches and batches[0][0] is batch:
+                            batches.pop(0)
+                            self._write_failed(batch, batch_deltas, e)
+                            error = error or e
+                            continue
+                        # Committed; only closing the session failed
+                    written += len(batch)
+                    aggregates += len(batch_deltas)
+                    for review in batch:
+                        self._attempts.pop(review["review_uid"], None)
+            finally:
+                # Left over only when cancelled: put them back for the next flush
+                for batch, batch_deltas in batches:
+                    self._restore(batch, batch_deltas)
+            self.stats["written"] += written
+            if written or aggregates:
+                self.stats["flushes"] += 1
+                self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+        if aggregates and self.on_ratings_changed is not None:
+            self.on_ratings_changed()
+        if error is not None:
+            raise error
+        logger.debug("Reviews flushed", extra={
+            "reviews": written,
+            "aggregates": aggregates,
+            "duration_ms": self.last_flush_ms
+        })
+        return {"reviews": written, "aggregates": aggregates}
+
+    def _batches(self, reviews: List[Dict[str, Any]], deltas: Dict[Tuple[str, str], Aggregate]):
+        """One batch of new reviews, then each review from an earlier failed batch on its own"""
+        retries = [review for review in reviews if review["review_uid"] in self._attempts]
+        batches = []
+        for review in retries:
+            own = _review_deltas(review)
+            _merge(deltas, own, -1)
+            batches.append(([review], own))
+        fresh = [review for review in reviews if review["review_uid"] not in self._attempts]
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if fresh or deltas:
+            batches.insert(0, (fresh, deltas))
+        return batches
+
+    def _restore(self, reviews: List[Dict[str, Any]], deltas: Dict[Tuple[str, str], Aggregate]):
+        for review in reviews:
+            self._buffer.setdefault(review["review_uid"], review)
+        _merge(self._deltas, deltas)
+
+    def _write_failed(self, reviews: List[Dict[str, Any]], deltas: Dict[Tuple[str, str], Aggregate], error: Exception):
+        """Keep a failed batch for retry, giving up on a review that failed alone max_attempts times"""
+        self.stats["failures"] += 1
+        if len(reviews) != 1:
+            for review in reviews:
+                self._attempts.setdefault(review["review_uid"], 0)
+            self._restore(reviews, deltas)
+            return
+        review = reviews[0]
+        attempts = self._attempts.get(review["review_uid"], 0) + 1
+        if attempts < self.max_attempts:
+            self._attempts[review["review_uid"]] = attempts
+            self._restore(reviews, deltas)
+            return
+        self._attempts.pop(review["review_uid"], None)
+        self.failed[review["review_uid"]] = review
+        self.stats["given_up"] += 1
+        logger.error("Review dropped from the write buffer", extra={
+            "review_uid": review["review_uid"],
+            "product_id": review["product_id"],
+            "attempts": attempts,
+            "error": str(error)
+        })
+
+    async def _write(self, db: AsyncSession, reviews: List[Dict[str, Any]], deltas: Dict[Tuple[str, str], Aggregate]):
+        try:
+            if reviews:
+                await db.execute(insert(ProductReview), reviews)
+            rows = [row for row in _aggregate_rows(deltas, datetime.now(timezone.utc)) if any(row[name] for name in STAR_COLUMNS)]
+            dialect_name = db.get_bind().dialect.name
+            for index in range(0, len(rows), WRITE_CHUNK):
+                await db.execute(upsert_statement(dialect_name, rows[index:index + WRITE_CHUNK]))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+    async def moderate(self, review_uid: str, action: str, reason: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Approve or reject a review by hand; None when it does not exist.
+
+        A buffered review is changed in place. A written one is updated only if its
+        status is still the one read, with the aggregate deltas in the same transaction.
+        """
+        status = {"approve": "approved", "reject": "rejected"}[action]
+        async with self._flush_lock():
+            self.moderate_new()
+            review = self._buffer.get(review_uid)
+            if review is not None:
+                self._set_status(review, status, reason)
+                return dict(review)
+            review, deltas = await self._moderate_written(review_uid, status, reason)
+        if deltas and self.on_ratings_changed is not None:
+            self.on_ratings_changed()
+        return review
+
+    async def _moderate_written(self, review_uid: str, status: str, reason: Optional[str]):
+        async with self.session_factory() as db:
+            row = (await db.execute(select(ProductReview).where(ProductReview.review_uid == review_uid))).scalar_one_or_none()
+            if row is None:
+                return None, {}
+            review = _as_dict(row)
+            previous = review["status"]
+            if previous == status:
+                return review, {}
+            deltas: Dict[Tuple[str, str], Aggregate] = {}
+            self._set_status(review, status, reason, deltas)
+            result = await db.execute(
+                update(ProductReview)
+                .where(ProductReview.review_uid == review_uid, ProductReview.status == previous)
+                .values(status=status, moderation_reason=review["moderation_reason"], moderated_at=review["moderated_at"])
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                raise ValueError("Review was moderated concurrently")
+            await self._write(db, [], deltas)
+        return review, deltas
+
+    async def pending(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Reviews waiting for a moderator, oldest first (buffered ones included)"""
+        self.moderate_new()
+        buffered = [dict(review) for review in self._buffer.values() if review["status"] == "pending"]
+        async with self.read_session_factory() as db:
+            rows = (await db.execute(
+                select(ProductReview)
+                .where(ProductReview.status == "pending")
+                .order_by(ProductReview.created_at, ProductReview.id)
+                .limit(limit)
+            )).scalars().all()
+        return ([_as_dict(row) for row in rows] + buffered)[:limit]
+
+    async def product_reviews(self, product_id: int, limit: int = 20) -> Dict[str, Any]:
+        """Newest approved reviews of a product with its rating summary (read from the aggregate row)"""
+        async with self.read_session_factory() as db:
+            rows = (await db.execute(
+                select(
+                    ProductReview.review_uid, ProductReview.rating, ProductReview.comment,
+                    ProductReview.reviewer_name, ProductReview.created_at
+                )
+                .where(ProductReview.product_id == product_id, ProductReview.status == "approved")
+                .order_by(ProductReview.created_at.desc(), ProductReview.id.desc())
+                .limit(limit)
+            )).all()
+            aggregate = (await load_rating_aggregates(db, "product", [str(product_id)])).get(str(product_id))
+        return {
+            **summarize(aggregate),
+            "reviews": [
+                {"review_id": uid, "rating": rating, "comment": comment, "reviewer_name": name, "created_at": created_at}
+                for uid, rating, comment, name, created_at in rows
+            ]
+        }
+
+    async def artisan_summary(self, artisan_name: str) -> Dict[str, Any]:
+        async with self.read_session_factory() as db:
+            aggregate = (await load_rating_aggregates(db, "artisan", [artisan_name])).get(artisan_name)
+        return summarize(aggregate)
+
+    async def run(self, interval: float):
+        """
+        Flush every interval seconds, or as soon as batch_size reviews are buffered.
+
+        Returns after a final flush once stop() is called; await it on shutdown
+        instead of cancelling it.
+        """
+        wake = self._event()
+        self._stopping = False
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Review flush failed", extra={"error": str(e), "buffered": len(self._buffer)})
+            if self._stopping:
+                return
+
+    def stop(self):
+        """Make run() flush once more and return"""
+        self._stopping = True
+        self._event().set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "awaiting_checks": len(self._unmoderated),
+            "pending_aggregate_updates": len(self._deltas),
+            "retrying": len(self._attempts),
+            "last_flush_ms": self.last_flush_ms,
+            **self.stats
+        }
+
+def _ratings_changed():
+    # Imported here: the catalogue reads the aggregates this module writes
+    from .catalogue import catalogue
+    catalogue.invalidate()
+
+# Global review store (flushed by the loop started in main)
+review_store = ReviewStore(
+    batch_size=settings.review_batch_size,
+    auto_approve=settings.review_auto_approve,
+    blocked_terms=settings.review_blocked_terms.split(","),
+    on_ratings_changed=_ratings_changed
+)
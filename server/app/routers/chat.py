@@ -9,6 +9,9 @@ from pathlib import Path
 
 from ..logging_config import get_logger, ErrorTracker, PerformanceLogger, get_ai_response_logger, AIResponseLogger
 from ..services.ollama_service import ollama_service
+from ..metrics_rollup import metrics_collector
+from ..http_cache import response_cache
+from ..responses import FastJSONResponse
 
 router = APIRouter()
 logger = get_logger("chat")
@@ -166,6 +169,8 @@ async def chat_query(request: ChatRequest, http_request: Request):
         
         # Calculate total processing time
         total_processing_time = (time.time() - start_time) * 1000
+        metrics_collector.increment("chats", dimension="ai" if ai_result["success"] else "fallback")
+        metrics_collector.increment("messages", dimension=request.language or "unknown")
         
         # Log successful response
         logger.info("AI chat query processed successfully", extra={
@@ -213,6 +218,7 @@ async def chat_query(request: ChatRequest, http_request: Request):
         
     except Exception as e:
         processing_time = (time.time() - start_time) * 1000
+        metrics_collector.increment("chats", dimension="error")
         
         error_tracker.log_validation_error(e, {
             "request_id": request_id,
@@ -331,13 +337,17 @@ async def submit_chat_feedback(request: ChatFeedbackRequest):
     }
 
 @router.get("/suggestions")
-async def get_chat_suggestions():
+async def get_chat_suggestions(request: Request):
     """
     Get suggested questions/topics for users to ask about.
     
     TODO: Personalize suggestions based on user history and preferences.
     TODO: Add trending topics and seasonal suggestions.
     """
+    return response_cache.respond(request, "chat_suggestions", _build_suggestions, policy="suggestions")
+
+def _build_suggestions() -> Dict[str, Any]:
+    """Suggested questions grouped by category"""
     
     suggestions = {
         "popular_questions": [
@@ -668,7 +678,8 @@ async def get_ai_response_logs(
             "logs_returned": len(logs)
         })
         
-        return {
+        # Plain dicts of JSON types - serialize directly, no jsonable_encoder pass
+        return FastJSONResponse({
             "logs": logs,
             "total_returned": len(logs),
             "filters_applied": {
@@ -677,7 +688,7 @@ async def get_ai_response_logs(
                 "limit": limit
             },
             "timestamp": datetime.now().isoformat()
-        }
+        })
         
     except Exception as e:
         error_tracker.log_external_api_error(e, "FileSystem", "ai_logs")
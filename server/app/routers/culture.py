@@ -1,25 +1,24 @@
-from fastapi import APIRouter, HTTPException, Query
+import hmac
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from typing import List, Optional
-import random
+from typing import Dict, List, Literal, Optional
+
+from ..catalogue import Product, catalogue
+from ..config import settings
+from ..http_cache import response_cache
+from ..recommendations import recommender
+from ..reviews import review_store
+from ..responses import FastJSONResponse
 
 router = APIRouter()
 
-class Product(BaseModel):
-    id: int
-    name: str
-    description: str
-    price: int
-    artisan: str
-    image: str
-    category: str
-    rating: float
-    reviews_count: int
-    in_stock: bool
-    materials: List[str]
-    origin_village: str
-    crafting_time_days: int
-    eco_friendly: bool
+def require_review_admin(admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Moderation endpoints need the REVIEW_ADMIN_TOKEN (403 while none is configured)"""
+    if not settings.review_admin_token:
+        raise HTTPException(status_code=403, detail="Review moderation is disabled: REVIEW_ADMIN_TOKEN is not set")
+    if admin_token is None or not hmac.compare_digest(admin_token.encode(), settings.review_admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Admin-Token")
 
 class ProductFilter(BaseModel):
     category: Optional[str] = None
@@ -28,6 +27,43 @@ class ProductFilter(BaseModel):
     eco_friendly: Optional[bool] = None
     in_stock: Optional[bool] = None
 
+class FacetValue(BaseModel):
+    value: str
+    count: int
+    selected: bool
+
+class PriceRange(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class ProductBrowseResponse(BaseModel):
+    total: int
+    results: List[Product]
+    facets: Dict[str, List[FacetValue]]
+    price_range: PriceRange
+
+class RelatedProductsResponse(BaseModel):
+    related: List[Product]
+    same_artisan: List[Product]
+
+class ProductReviewEntry(BaseModel):
+    review_id: str
+    rating: int
+    comment: str
+    reviewer_name: str
+    created_at: datetime
+
+class ProductReviewsResponse(BaseModel):
+    product_id: int
+    reviews_count: int
+    average_rating: Optional[float] = None
+    histogram: Dict[str, int]
+    reviews: List[ProductReviewEntry]
+
+class ReviewModerationRequest(BaseModel):
+    action: Literal["approve", "reject"]
+    reason: Optional[str] = Field(None, max_length=200, description="Shown to other moderators")
+
 class ArtisanProfile(BaseModel):
     name: str
     village: str
@@ -40,6 +76,7 @@ class ArtisanProfile(BaseModel):
 
 @router.get("/products", response_model=List[Product])
 async def get_products(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     min_price: Optional[int] = Query(None, ge=0, description="Minimum price filter"),
     max_price: Optional[int] = Query(None, ge=0, description="Maximum price filter"),
@@ -51,183 +88,92 @@ async def get_products(
     """
     Returns filtered and sorted list of local artisan products.
     
-    TODO: Connect to actual product database.
-    TODO: Add full-text search functionality.
-    TODO: Add user favorites and recommendations.
+    Served from the in-memory catalogue snapshot; responses carry an ETag per
+    catalogue version and If-None-Match returns 304. Keyword search is /search;
+    recommendations are /products/{id}/related and /featured-products.
     """
+    snapshot = await catalogue.ensure_fresh()
+    return response_cache.respond(
+        request,
+        "catalogue",
+        lambda: snapshot.query(category, min_price, max_price, eco_friendly, in_stock, sort_by, limit)
+    )
+
+@router.get("/products/browse", response_model=ProductBrowseResponse)
+async def browse_products(
+    request: Request,
+    category: Optional[List[str]] = Query(None, description="Categories (any of)"),
+    village: Optional[List[str]] = Query(None, description="Origin villages (any of)"),
+    material: Optional[List[str]] = Query(None, description="Materials (any of)"),
+    eco_friendly: Optional[bool] = Query(None, description="Filter eco-friendly products"),
+    in_stock: Optional[bool] = Query(True, description="Show only in-stock products"),
+    min_price: Optional[int] = Query(None, ge=0, description="Minimum price filter"),
+    max_price: Optional[int] = Query(None, ge=0, description="Maximum price filter"),
+    sort_by: Optional[str] = Query("name", description="Sort by: name, price, rating"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100, description="Number of products to return")
+):
+    """
+    Filter sidebar and results for the Culture page in one call.
     
-    # Enhanced mock product data
-    mock_products = [
-        {
-            "id": 1,
-            "name": "Aipan Art Canvas",
-            "description": "Traditional Kumaoni floor art on canvas, handmade by local artists using natural pigments",
-            "price": 1500,
-            "artisan": "Meera Devi",
-            "image": "/images/products/aipan-art.jpg",
-            "category": "Art & Paintings",
-            "rating": 4.8,
-            "reviews_count": 23,
-            "in_stock": True,
-            "materials": ["Canvas", "Natural Pigments", "Traditional Brushes"],
-            "origin_village": "Almora",
-            "crafting_time_days": 3,
-            "eco_friendly": True
-        },
-        {
-            "id": 2,
-            "name": "Woolen Shawl",
-            "description": "Pure wool shawl with traditional Garhwali patterns, hand-woven on traditional looms",
-            "price": 2500,
-            "artisan": "Ram Singh",
-            "image": "/images/products/woolen-shawl.jpg",
-            "category": "Textiles",
-            "rating": 4.6,
-            "reviews_count": 18,
-            "in_stock": True,
-            "materials": ["Pure Wool", "Natural Dyes"],
-            "origin_village": "Chamoli",
-            "crafting_time_days": 7,
-            "eco_friendly": True
-        },
-        {
-            "id": 3,
-            "name": "Ringal Basket",
-            "description": "Eco-friendly basket made from Himalayan bamboo, perfect for storage and decoration",
-            "price": 800,
-            "artisan": "Kamla Bisht",
-            "image": "/images/products/ringal-basket.png",
-            "category": "Home & Decor",
-            "rating": 4.7,
-            "reviews_count": 31,
-            "in_stock": True,
-            "materials": ["Ringal Bamboo", "Natural Fiber"],
-            "origin_village": "Pithoragarh",
-            "crafting_time_days": 2,
-            "eco_friendly": True
-        },
-        {
-            "id": 4,
-            "name": "Copper Water Bottle",
-            "description": "Handcrafted copper bottle with traditional engravings, known for health benefits",
-            "price": 1200,
-            "artisan": "Mohan Lal",
-            "image": "/images/products/copper-bottle.png",
-            "category": "Utensils",
-            "rating": 4.5,
-            "reviews_count": 42,
-            "in_stock": True,
-            "materials": ["Pure Copper", "Traditional Tools"],
-            "origin_village": "Bageshwar",
-            "crafting_time_days": 1,
-            "eco_friendly": True
-        },
-        {
-            "id": 5,
-            "name": "Himalayan Honey",
-            "description": "Pure organic honey from high-altitude flowers, collected by traditional beekeepers",
-            "price": 600,
-            "artisan": "Uttarakhand Bee Cooperative",
-            "image": "/images/products/himalayan-honey.png",
-            "category": "Food & Beverages",
-            "rating": 4.9,
-            "reviews_count": 67,
-            "in_stock": True,
-            "materials": ["Wild Flower Nectar", "Traditional Hives"],
-            "origin_village": "Munsiyari",
-            "crafting_time_days": 30,
-            "eco_friendly": True
-        },
-        {
-            "id": 6,
-            "name": "Wooden Prayer Beads",
-            "description": "Handcrafted prayer beads from sacred Rudraksha seeds",
-            "price": 450,
-            "artisan": "Pandit Govind",
-            "image": "/images/products/prayer-beads.jpg",
-            "category": "Spiritual Items",
-            "rating": 4.8,
-            "reviews_count": 29,
-            "in_stock": False,
-            "materials": ["Rudraksha Seeds", "Cotton Thread"],
-            "origin_village": "Kedarnath Valley",
-            "crafting_time_days": 1,
-            "eco_friendly": True
-        },
-        {
-            "id": 7,
-            "name": "Pashmina Scarf",
-            "description": "Luxurious pashmina scarf made from finest Himalayan goat wool",
-            "price": 3500,
-            "artisan": "Sunita Rawat",
-            "image": "/images/products/pashmina-scarf.jpg",
-            "category": "Textiles",
-            "rating": 4.9,
-            "reviews_count": 15,
-            "in_stock": True,
-            "materials": ["Pashmina Wool", "Silk Thread"],
-            "origin_village": "Nanda Devi Region",
-            "crafting_time_days": 10,
-            "eco_friendly": True
-        }
-    ]
-    
-    # Apply filters
-    filtered_products = mock_products
-    
-    if category:
-        filtered_products = [p for p in filtered_products if p["category"].lower() == category.lower()]
-    
-    if min_price is not None:
-        filtered_products = [p for p in filtered_products if p["price"] >= min_price]
-    
-    if max_price is not None:
-        filtered_products = [p for p in filtered_products if p["price"] <= max_price]
-    
-    if eco_friendly is not None:
-        filtered_products = [p for p in filtered_products if p["eco_friendly"] == eco_friendly]
-    
-    if in_stock is not None:
-        filtered_products = [p for p in filtered_products if p["in_stock"] == in_stock]
-    
-    # Apply sorting
-    if sort_by == "price":
-        filtered_products.sort(key=lambda x: x["price"])
-    elif sort_by == "rating":
-        filtered_products.sort(key=lambda x: x["rating"], reverse=True)
-    elif sort_by == "name":
-        filtered_products.sort(key=lambda x: x["name"])
-    
-    # Apply limit
-    filtered_products = filtered_products[:limit]
-    
-    return [Product(**item) for item in filtered_products]
+    Each facet (category, village, material, eco_friendly, in_stock) lists its values
+    with the number of products that match the other selected filters; values within
+    a facet are alternatives, facets are combined. price_range bounds the matches
+    before the price filter.
+    """
+    snapshot = await catalogue.ensure_fresh()
+    return response_cache.respond(
+        request,
+        "catalogue",
+        lambda: snapshot.browse(
+            category or (), village or (), material or (), eco_friendly, in_stock,
+            min_price, max_price, sort_by, offset, limit
+        )
+    )
 
 @router.get("/products/{product_id}", response_model=Product)
-async def get_product_details(product_id: int):
+async def get_product_details(
+    product_id: int,
+    session_id: Optional[str] = Header(None, alias="X-Session-ID", max_length=64, description="Visitor session, for recommendations")
+):
     """
     Get detailed information about a specific product.
-    
-    TODO: Connect to actual product database.
     """
+    product = (await catalogue.ensure_fresh()).get(product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    if session_id:
+        recommender.record_view(session_id, product_id)
     
-    # This would normally query the database
-    # For now, we'll simulate it by calling get_products and filtering
-    products = await get_products()
-    
-    for product in products:
-        if product.id == product_id:
-            return product
-    
-    raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    # Already validated when the snapshot was built
+    return FastJSONResponse(product)
+
+@router.get("/products/{product_id}/related", response_model=RelatedProductsResponse)
+async def get_related_products(
+    product_id: int,
+    limit: int = Query(6, ge=1, le=20, description="Products per list")
+):
+    """
+    Products similar to this one (shared category, village, materials and
+    co-views) and more from the same artisan.
+    """
+    snapshot = await catalogue.ensure_fresh()
+    if snapshot.get(product_id) is None:
+        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    await recommender.ensure_fresh(snapshot)
+    return FastJSONResponse(recommender.related(product_id, limit))
 
 @router.get("/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """
     Get all available product categories.
     
     TODO: Connect to actual database for dynamic categories.
     """
+    return response_cache.respond(request, "catalogue", _build_categories)
+
+def _build_categories():
+    """Static category list with counts"""
     
     categories = [
         {"name": "Art & Paintings", "count": 15, "description": "Traditional Kumaoni and Garhwali art"},
@@ -299,24 +245,29 @@ async def get_artisan_profile(artisan_name: str):
     if artisan_key not in artisan_profiles:
         raise HTTPException(status_code=404, detail=f"Artisan '{artisan_name}' not found")
     
-    return ArtisanProfile(**artisan_profiles[artisan_key])
+    profile = artisan_profiles[artisan_key]
+    # Rating from stored reviews (running aggregate) once the artisan has any
+    summary = await review_store.artisan_summary(profile["name"])
+    if summary["reviews_count"]:
+        profile = {**profile, "rating": round(summary["average_rating"], 1)}
+    
+    return ArtisanProfile(**profile)
 
 @router.get("/featured-products", response_model=List[Product])
-async def get_featured_products():
+async def get_featured_products(
+    session_id: Optional[str] = Header(None, alias="X-Session-ID", max_length=64, description="Visitor session, for recommendations")
+):
     """
     Get featured/recommended products.
     
-    TODO: Implement recommendation algorithm based on user preferences.
+    With a session that has viewed products, picks the neighbours of its recent
+    views; otherwise (and to fill up) the top-rated in-stock products.
     TODO: Add seasonal and trending product features.
     """
     
-    # Get all products and return top-rated ones
-    all_products = await get_products(limit=100)
-    
-    # Sort by rating and return top 5
-    featured = sorted(all_products, key=lambda x: x.rating, reverse=True)[:5]
-    
-    return featured
+    snapshot = await catalogue.ensure_fresh()
+    await recommender.ensure_fresh(snapshot)
+    return FastJSONResponse(recommender.featured(session_id))
 
 class ProductReviewRequest(BaseModel):
     rating: int = Field(..., ge=1, le=5, description="Rating from 1 to 5")
@@ -328,60 +279,83 @@ async def add_product_review(product_id: int, request: ProductReviewRequest):
     """
     Add a review for a product.
     
+    The review is buffered and written with others in the next batch; automatic
+    checks approve it or hold it for a moderator, and approved ratings update the
+    product's and artisan's running aggregates.
     TODO: Implement user authentication.
-    TODO: Store reviews in database.
-    TODO: Add review moderation system.
     """
     
     # Verify product exists
-    try:
-        await get_product_details(product_id)
-    except HTTPException:
+    product = (await catalogue.ensure_fresh()).get(product_id)
+    if product is None:
         raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
     
-    # In a real system, this would save to database
-    review_data = {
-        "product_id": product_id,
-        "rating": request.rating,
-        "comment": request.comment,
-        "reviewer_name": request.reviewer_name,
-        "review_date": "2024-12-10",  # Would use datetime.now()
-        "verified_purchase": False,  # Would check against orders
-        "helpful_votes": 0
-    }
+    review = review_store.submit(product, request.rating, request.comment, request.reviewer_name)
     
     return {
         "message": "Review added successfully",
-        "review_id": random.randint(1000, 9999),
+        "review_id": review["review_uid"],
         "status": "pending_moderation"
     }
 
+@router.get("/products/{product_id}/reviews", response_model=ProductReviewsResponse)
+async def get_product_reviews(
+    product_id: int,
+    limit: int = Query(20, ge=1, le=100, description="Number of reviews")
+):
+    """
+    Newest approved reviews of a product with its rating count, average and histogram.
+    """
+    if (await catalogue.ensure_fresh()).get(product_id) is None:
+        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    return {"product_id": product_id, **await review_store.product_reviews(product_id, limit)}
+
+@router.get("/reviews/moderation", dependencies=[Depends(require_review_admin)])
+async def get_moderation_queue(limit: int = Query(50, ge=1, le=200, description="Number of reviews")):
+    """
+    Reviews held by the automatic checks, oldest first (X-Admin-Token required).
+    """
+    pending = await review_store.pending(limit)
+    return {"total": len(pending), "reviews": pending}
+
+@router.post("/reviews/{review_id}/moderation", dependencies=[Depends(require_review_admin)])
+async def moderate_review(review_id: str, request: ReviewModerationRequest):
+    """
+    Approve or reject a review; its rating enters or leaves the aggregates (X-Admin-Token required).
+    """
+    try:
+        review = await review_store.moderate(review_id, request.action, request.reason)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if review is None:
+        raise HTTPException(status_code=404, detail=f"Review '{review_id}' not found")
+    return {"review_id": review_id, "status": review["status"]}
+
 @router.get("/search")
 async def search_products(
     q: str = Query(..., min_length=2, description="Search query"),
     limit: int = Query(10, ge=1, le=50, description="Number of results")
 ):
     """
-    Search products by name, description, or artisan.
+    Search products by name, description, artisan, category, village or material.
     
-    TODO: Implement full-text search with Elasticsearch or similar.
-    TODO: Add search analytics and suggestions.
+    Ranked by BM25 and rating; plurals, typos and a partly typed last word still match.
+    TODO: Add search analytics.
     """
     
-    all_products = await get_products(limit=100)
-    query_lower = q.lower()
-    
-    # Simple text search in name, description, and artisan
-    matching_products = []
-    for product in all_products:
-        if (query_lower in product.name.lower() or 
-            query_lower in product.description.lower() or 
-            query_lower in product.artisan.lower() or
-            query_lower in product.category.lower()):
-            matching_products.append(product)
+    total, matching_products = (await catalogue.ensure_fresh()).search(q, limit)
     
     return {
         "query": q,
-        "total_results": len(matching_products),
-        "results": matching_products[:limit]
-    }
\ No newline at end of file
+        "total_results": total,
+        "results": matching_products
+    }
+
+@router.get("/search/suggest")
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(5, ge=1, le=10, description="Number of suggestions")
+):
+    """Autocomplete for the product search box"""
+    snapshot = await catalogue.ensure_fresh()
+    return {"query": q, **snapshot.suggest(q, limit)}
\ No newline at end of file
@@ -1,96 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from app.database import get_async_db
+from app.db_stats import overview_cache
+from app.metrics_rollup import (
+    MAX_POINTS, METRICS, RESOLUTIONS, as_utc, choose_resolution, fetch_series, metrics_rollup
+)
+from app.replicas import get_read_db, report_read_error
+from app.pagination import MAX_PAGE_SIZE, paginate, reject_offset_params
+from app.schemas import (
+    ArtisanPage, ArtisanProductPage, ArtisanProductRead, ArtisanRead, ChatRead,
+    CulturalSitePage, CulturalSiteRead, TourismPlacePage, TourismPlaceRead,
+    UserPage, UserRead, projection
+)
 from app.models import *
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter()
 
+async def _count(db: AsyncSession, model, *criteria) -> int:
+    """COUNT(*) over model rows matching criteria"""
+    query = select(func.count()).select_from(model)
+    if criteria:
+        query = query.where(*criteria)
+    return (await db.execute(query)).scalar_one()
+
 @router.get("/stats/overview")
-async def get_database_overview(db: Session = Depends(get_db)):
-    """Get comprehensive database statistics for dashboard."""
+async def get_database_overview(response: Response):
+    """Get comprehensive database statistics for dashboard (cached snapshot)."""
     try:
-        # User statistics
-        total_users = db.query(User).count()
-        active_users = db.query(User).filter(User.is_active == True).count()
-        
-        # Chat statistics
-        total_chats = db.query(Chat).count()
-        active_chats = db.query(Chat).filter(Chat.is_active == True).count()
-        total_messages = db.query(ChatMessage).count()
-        
-        # Chat types distribution
-        chat_types = db.query(Chat.chat_type, func.count(Chat.id)).group_by(Chat.chat_type).all()
-        chat_types_dict = dict(chat_types) if chat_types else {}
-        
-        # Cultural statistics
-        cultural_sites = db.query(CulturalSite).filter(CulturalSite.is_active == True).count()
-        total_artisans = db.query(Artisan).filter(Artisan.is_active == True).count()
-        verified_artisans = db.query(Artisan).filter(
-            Artisan.is_active == True, 
-            Artisan.is_verified == True
-        ).count()
-        artisan_products = db.query(ArtisanProduct).filter(ArtisanProduct.is_active == True).count()
-        
-        # Tourism statistics
-        tourism_places = db.query(TourismPlace).filter(TourismPlace.is_active == True).count()
-        tourism_categories = db.query(
-            TourismPlace.category, 
-            func.count(TourismPlace.id)
-        ).filter(TourismPlace.is_active == True).group_by(TourismPlace.category).all()
-        tourism_categories_dict = dict(tourism_categories) if tourism_categories else {}
-        
-        # Yoga poses
-        yoga_poses = db.query(YogaPose).filter(YogaPose.is_active == True).count()
-        
-        # Emergency contacts
-        emergency_contacts = db.query(EmergencyContact).filter(EmergencyContact.is_active == True).count()
-        
-        return {
-            "users": {
-                "total": total_users,
-                "active": active_users,
-                "inactive": total_users - active_users
-            },
-            "chats": {
-                "total": total_chats,
-                "active": active_chats,
-                "messages": total_messages,
-                "types": chat_types_dict
-            },
-            "culture": {
-                "sites": cultural_sites,
-                "artisans": {
-                    "total": total_artisans,
-                    "verified": verified_artisans,
-                    "pending": total_artisans - verified_artisans
-                },
-                "products": artisan_products
-            },
-            "tourism": {
-                "places": tourism_places,
-                "categories": tourism_categories_dict
-            },
-            "yoga": {
-                "poses": yoga_poses
-            },
-            "emergency": {
-                "contacts": emergency_contacts
-            }
-        }
+        overview, age = await overview_cache.get()
+        response.headers["Age"] = str(int(age))
+        return overview
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+def recent_activity_query(limit: int, since: Optional[datetime] = None):
+    """
+    Newest messages first; only the listed columns, never the (long) AI response text.
+
+    With since, Postgres prunes every chat_messages partition older than that month.
+    """
+    query = select(
+        ChatMessage.id, ChatMessage.user_id, ChatMessage.chat_id, ChatMessage.message,
+        ChatMessage.message_type, ChatMessage.language, ChatMessage.created_at
+    )
+    if since is not None:
+        query = query.where(ChatMessage.created_at >= since)
+    return query.order_by(ChatMessage.created_at.desc()).limit(limit)
+
 @router.get("/stats/recent-activity")
-async def get_recent_activity(limit: int = 10, db: Session = Depends(get_db)):
+async def get_recent_activity(limit: int = 10, db: AsyncSession = Depends(get_read_db)):
     """Get recent chat activity for dashboard."""
     try:
-        recent_messages = db.query(ChatMessage).order_by(
-            ChatMessage.created_at.desc()
-        ).limit(limit).all()
-        
+        # Read only the newest month (partition); older ones only early in the month
+        month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        recent_messages = (await db.execute(recent_activity_query(limit, month_start))).all()
+        if len(recent_messages) < limit:
+            recent_messages = (await db.execute(recent_activity_query(limit))).all()
+
         activity = []
         for msg in recent_messages:
             activity.append({
@@ -102,62 +72,205 @@ async def get_recent_activity(limit: int = 10, db: Session = Depends(get_db)):
                 "language": msg.language,
                 "created_at": msg.created_at.isoformat()
             })
-        
+
         return {"recent_activity": activity}
     except Exception as e:
+        report_read_error(db, e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@router.get("/metrics/timeseries")
+async def get_metrics_timeseries(
+    metric: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[str] = Query(None, pattern="^(minute|hour|day)$"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Dashboard metric over [start, end) (default: the last 24 hours).
+
+    Reads a single rollup level: the finest one that still holds start and stays
+    within MAX_POINTS buckets, unless resolution is given.
+    """
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric. Available: {', '.join(METRICS)}")
+    now = datetime.now(timezone.utc)
+    end = as_utc(end) if end else now
+    start = as_utc(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if resolution is None:
+        resolution = choose_resolution(start, end, now, metrics_rollup.retention)
+    elif (end - start) / RESOLUTIONS[resolution] > MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range too wide for {resolution} resolution")
+
+    try:
+        points = await fetch_series(db, metric, start, end, resolution)
+    except Exception as e:
+        report_read_error(db, e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {
+        "metric": metric,
+        "description": METRICS[metric],
+        "resolution": resolution,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "points": points
+    }
+
+# Embeddable relations per list endpoint: name -> (child model, foreign key, schema, criteria)
+RELATIONS = {
+    User: {"chats": (Chat, Chat.user_id, ChatRead, ())},
+    Artisan: {"products": (ArtisanProduct, ArtisanProduct.artisan_id, ArtisanProductRead, (ArtisanProduct.is_active == True,))},
+}
+
+def _parse_include(model, include: Optional[str]) -> List[str]:
+    requested = [name.strip() for name in include.split(",") if name.strip()] if include else []
+    unknown = [name for name in requested if name not in RELATIONS.get(model, {})]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot include: {', '.join(unknown)}")
+    return requested
+
+def relation_query(model, name: str, parent_ids: List[int]):
+    """Projected child rows of a whole page of parents"""
+    child, foreign_key, schema, criteria = RELATIONS[model][name]
+    return (
+        select(*projection(child, schema))
+        .where(foreign_key.in_(parent_ids), *criteria)
+        .order_by(foreign_key, child.id)
+    )
+
+async def _load_relation(db: AsyncSession, parents: List[Dict[str, Any]], model, name: str):
+    """Eager-load one relation for a whole page with a single IN query (never per row)"""
+    child, foreign_key, schema, _ = RELATIONS[model][name]
+    for parent in parents:
+        parent[name] = []
+    if not parents:
+        return
+    by_id = {parent["id"]: parent for parent in parents}
+    names = [column.key for column in projection(child, schema)]
+    rows = (await db.execute(relation_query(model, name, list(by_id)))).all()
+    for row in rows:
+        item = dict(zip(names, row))
+        by_id[item[foreign_key.key]][name].append(item)
+
+async def _list_page(
+    db: AsyncSession,
+    model,
+    schema,
+    key: str,
+    limit: int,
+    cursor: Optional[str],
+    include: Optional[str],
+    *criteria
+) -> Dict[str, Any]:
+    """Keyset page of projected columns plus any requested relations"""
+    relations = _parse_include(model, include)
+    page = await paginate(db, model, key, limit, cursor, *criteria, columns=projection(model, schema))
+    for name in relations:
+        await _load_relation(db, page[key], model, name)
+    return page
 
-@router.get("/users")
-async def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of users."""
+@router.get("/users", response_model=UserPage, response_model_exclude_unset=True,
+             dependencies=[Depends(reject_offset_params)])
+async def get_users(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    include: Optional[str] = Query(None, description="Relations to embed: chats"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get list of users, oldest first, paginated by cursor."""
     try:
-        users = db.query(User).offset(skip).limit(limit).all()
-        return {"users": users}
+        return await _list_page(db, User, UserRead, "users", limit, cursor, include)
+    except HTTPException:
+        raise
     except Exception as e:
+        report_read_error(db, e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@router.get("/cultural-sites")
-async def get_cultural_sites(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of cultural sites."""
+@router.get("/cultural-sites", response_model=CulturalSitePage, response_model_exclude_unset=True,
+             dependencies=[Depends(reject_offset_params)])
+async def get_cultural_sites(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get list of cultural sites, oldest first, paginated by cursor."""
     try:
-        sites = db.query(CulturalSite).filter(CulturalSite.is_active == True).offset(skip).limit(limit).all()
-        return {"cultural_sites": sites}
+        return await _list_page(
+            db, CulturalSite, CulturalSiteRead, "cultural_sites", limit, cursor, None,
+            CulturalSite.is_active == True
+        )
+    except HTTPException:
+        raise
     except Exception as e:
+        report_read_error(db, e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@router.get("/artisans")
-async def get_artisans(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of artisans."""
+@router.get("/artisans", response_model=ArtisanPage, response_model_exclude_unset=True,
+             dependencies=[Depends(reject_offset_params)])
+async def get_artisans(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    include: Optional[str] = Query(None, description="Relations to embed: products"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get list of artisans, oldest first, paginated by cursor."""
     try:
-        artisans = db.query(Artisan).filter(Artisan.is_active == True).offset(skip).limit(limit).all()
-        return {"artisans": artisans}
+        return await _list_page(
+            db, Artisan, ArtisanRead, "artisans", limit, cursor, include,
+            Artisan.is_active == True
+        )
+    except HTTPException:
+        raise
     except Exception as e:
+        report_read_error(db, e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@router.get("/artisan-products")
-async def get_artisan_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of artisan products."""
+@router.get("/artisan-products", response_model=ArtisanProductPage, response_model_exclude_unset=True,
+             dependencies=[Depends(reject_offset_params)])
+async def get_artisan_products(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get list of artisan products, oldest first, paginated by cursor."""
     try:
-        products = db.query(ArtisanProduct).filter(ArtisanProduct.is_active == True).offset(skip).limit(limit).all()
-        return {"products": products}
+        return await _list_page(
+            db, ArtisanProduct, ArtisanProductRead, "products", limit, cursor, None,
+            ArtisanProduct.is_active == True
+        )
+    except HTTPException:
+        raise
     except Exception as e:
+        report_read_error(db, e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@router.get("/tourism-places")
-async def get_tourism_places(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of tourism places."""
+@router.get("/tourism-places", response_model=TourismPlacePage, response_model_exclude_unset=True,
+             dependencies=[Depends(reject_offset_params)])
+async def get_tourism_places(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get list of tourism places, oldest first, paginated by cursor."""
     try:
-        places = db.query(TourismPlace).filter(TourismPlace.is_active == True).offset(skip).limit(limit).all()
-        return {"tourism_places": places}
+        return await _list_page(
+            db, TourismPlace, TourismPlaceRead, "tourism_places", limit, cursor, None,
+            TourismPlace.is_active == True
+        )
+    except HTTPException:
+        raise
     except Exception as e:
+        report_read_error(db, e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @router.get("/health")
-async def database_health_check(db: Session = Depends(get_db)):
+async def database_health_check(db: AsyncSession = Depends(get_async_db)):
     """Check database connectivity and basic stats."""
     try:
         # Simple query to test connection
-        user_count = db.query(User).count()
+        user_count = await _count(db, User)
         return {
             "status": "healthy",
             "connection": "active",
@@ -165,4 +278,4 @@ async def database_health_check(db: Session = Depends(get_db)):
             "message": "Database is accessible and responding"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database health check failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database health check failed: {str(e)}")
@@ -8,10 +8,16 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 import os
 import json
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from ..logging_config import get_logger
+from ..security_scanner import security_scanner
+from ..compression import compression_stats
+from ..responses import FastJSONResponse
+from ..database import pool_metrics
+from ..replicas import replica_router
 
 router = APIRouter()
 logger = get_logger("monitoring")
@@ -41,6 +47,9 @@ class SystemHealth(BaseModel):
     log_files_size_mb: float
     recent_errors: List[LogEntry]
     performance_alerts: List[str]
+    database_pools: Dict[str, Any] = {}
+    database_replicas: Dict[str, Any] = {}
+    startup: Dict[str, Any] = {}
 
 @router.get("/logs", response_model=List[LogEntry])
 async def get_recent_logs(
@@ -112,7 +121,8 @@ async def get_recent_logs(
         "logs_returned": len(logs)
     })
     
-    return logs
+    # LogEntry instances are validated on construction; skip response_model re-validation
+    return FastJSONResponse(logs)
 
 @router.get("/stats", response_model=LogStats)
 async def get_log_statistics(
@@ -210,16 +220,32 @@ async def get_system_health(request: Request):
         performance_alerts.append("Log files size exceeds 100MB - consider rotation")
     if len(recent_errors) > 5:
         performance_alerts.append("High error rate detected in recent logs")
+
+    # Connection pool saturation and checkout latency
+    database_pools = {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    for name, pool in database_pools.items():
+        capacity = pool.get("size", 0) + pool.get("max_overflow", 0)
+        if capacity and pool["checked_out"] >= capacity * 0.8:
+            performance_alerts.append(f"Database pool '{name}' is above 80% of its capacity")
+        p95 = pool["wait_time_ms"]["p95"]
+        if p95 is not None and p95 >= 100:
+            performance_alerts.append(f"Database pool '{name}' checkout wait p95 is {p95}ms")
+        if pool["connect_failures"] or pool["checkout_timeouts"]:
+            performance_alerts.append(f"Database pool '{name}' has connection failures or timeouts")
     
-    # Mock uptime calculation
-    uptime_hours = 24.5  # In production, calculate from startup time
+    # Uptime and boot timings recorded by the lifespan
+    startup = getattr(request.app.state, "startup", {})
+    uptime_hours = (time.time() - startup["started_at"]) / 3600 if startup else 0.0
     
     health = SystemHealth(
         status="healthy" if len(performance_alerts) == 0 else "warning",
-        uptime_hours=uptime_hours,
+        uptime_hours=round(uptime_hours, 3),
         log_files_size_mb=round(log_files_size_mb, 2),
         recent_errors=recent_errors[:5],  # Limit to 5 most recent
-        performance_alerts=performance_alerts
+        performance_alerts=performance_alerts,
+        database_pools=database_pools,
+        database_replicas=replica_router.get_stats(),
+        startup=startup
     )
     
     logger.info("System health check completed", extra={
@@ -330,4 +356,40 @@ async def get_performance_metrics(
             if endpoint in ep["endpoint"]
         ]
     
-    return metrics
\ No newline at end of file
+    return metrics
+
+@router.get("/security-scan")
+async def get_security_scan_stats(request: Request):
+    """
+    Get suspicious request scanner statistics (matches counted by rule)
+    
+    Counts are per worker process.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    
+    logger.info("Security scan stats request", extra={
+        "request_id": request_id
+    })
+    
+    return {
+        **security_scanner.get_stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+@router.get("/compression")
+async def get_compression_stats(request: Request):
+    """
+    Get response compression statistics (bytes saved, responses per encoding)
+    
+    Counts are per worker process.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    
+    logger.info("Compression stats request", extra={
+        "request_id": request_id
+    })
+    
+    return {
+        **compression_stats.snapshot(),
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
\ No newline at end of file
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import time
+
+from ..logging_config import get_logger
+from ..search_index import SOURCES, search_service
+
+router = APIRouter()
+logger = get_logger("search")
+
+class SearchResult(BaseModel):
+    type: str
+    id: int
+    title: str
+    snippet: str
+    score: float
+    district: Optional[str] = None
+    category: Optional[str] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    type: Optional[str] = None
+    backend: str
+    took_ms: float
+    results: List[SearchResult]
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    http_request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, description="cultural_site, tourism_place or artisan"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Full-text search over cultural sites, tourism places and artisans (English and Hindi).
+
+    Results are ranked best first; snippets wrap matching words in <mark>.
+    """
+    if type is not None and type not in SOURCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown type '{type}'. Available: {', '.join(SOURCES)}"
+        )
+
+    start = time.perf_counter()
+    results = await search_service.search(q, type, limit)
+    took_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    logger.info("Search", extra={
+        "request_id": getattr(http_request.state, 'request_id', 'unknown'),
+        "type": type,
+        "results": len(results),
+        "took_ms": took_ms
+    })
+    return SearchResponse(
+        query=q,
+        type=type,
+        backend=search_service.backend,
+        took_ms=took_ms,
+        results=results
+    )
+
+@router.get("/stats")
+async def search_stats() -> Dict[str, Any]:
+    """Index size and recent query latency percentiles"""
+    return search_service.get_stats()
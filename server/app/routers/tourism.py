@@ -1,11 +1,12 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import random
 import time
 from datetime import datetime, timedelta
 
 from ..logging_config import get_logger, ErrorTracker, PerformanceLogger
+from ..geo_index import SUPPORTED_TYPES, geo_index
 
 router = APIRouter()
 logger = get_logger("tourism")
@@ -45,6 +46,27 @@ class WeatherInfo(BaseModel):
     visibility: str
     best_visit_time: str
 
+class NearbyPlace(BaseModel):
+    type: str
+    source: str
+    id: int
+    name: str
+    district: str
+    latitude: float
+    longitude: float
+    distance_km: float
+    category: Optional[str] = None
+    phone_number: Optional[str] = None
+    is_24x7: Optional[bool] = None
+
+class NearbyResponse(BaseModel):
+    latitude: float
+    longitude: float
+    type: Optional[str]
+    results: List[NearbyPlace]
+    query_time_us: float
+    index: Dict[str, Any]
+
 @router.get("/crowd-status", response_model=List[CrowdStatus])
 async def get_crowd_status(http_request: Request):
     """
@@ -386,4 +408,46 @@ async def get_route_info(from_shrine: str, to_shrine: str):
         ],
         "fuel_stops": ["Rishikesh", "Rudraprayag", "Guptkashi"] if base_distance > 200 else ["Rishikesh"],
         "estimated_fuel_cost": round(base_distance * 6.5, 0)  # ₹6.5 per km average
-    }
\ No newline at end of file
+    }
+
+@router.get("/nearby", response_model=NearbyResponse, response_model_exclude_none=True)
+async def get_nearby(
+    http_request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    type: Optional[str] = Query(None, description=", ".join(SUPPORTED_TYPES)),
+    k: int = Query(5, ge=1, le=50),
+    max_km: Optional[float] = Query(None, gt=0)
+):
+    """
+    k nearest emergency services, tourism places or cultural sites to a point.
+
+    Served from the in-memory geo index; nearest first, with great-circle distance.
+    A supported type with no located rows gives an empty result list.
+    """
+    if type is not None and type not in SUPPORTED_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown type '{type}'. Available: {', '.join(SUPPORTED_TYPES)}"
+        )
+    await geo_index.ensure_fresh()
+
+    start = time.perf_counter()
+    results = geo_index.nearest(lat, lon, type, k, max_km)
+    query_time_us = round((time.perf_counter() - start) * 1_000_000, 1)
+
+    logger.info("Nearby lookup", extra={
+        "request_id": getattr(http_request.state, 'request_id', 'unknown'),
+        "type": type,
+        "k": k,
+        "results": len(results),
+        "query_time_us": query_time_us
+    })
+    return NearbyResponse(
+        latitude=lat,
+        longitude=lon,
+        type=type,
+        results=results,
+        query_time_us=query_time_us,
+        index=geo_index.get_stats()
+    )
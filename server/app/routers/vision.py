@@ -7,6 +7,7 @@ import time
 from typing import List, Optional
 
 from ..logging_config import get_logger, ErrorTracker, PerformanceLogger
+from ..http_cache import response_cache
 
 router = APIRouter()
 logger = get_logger("vision")
@@ -242,13 +243,17 @@ async def analyze_pose(request: VisionRequest, http_request: Request):
         recommendations=recommendations[:4]
     )
 @router.get("/poses", response_model=List[PoseGuide])
-async def get_yoga_poses():
+async def get_yoga_poses(request: Request):
     """
     Get list of supported yoga poses with detailed guides.
     
     TODO: Connect to yoga pose database.
     TODO: Add difficulty filtering and progression paths.
     """
+    return response_cache.respond(request, "yoga_poses", _build_pose_guides, policy="reference")
+
+def _build_pose_guides() -> List[PoseGuide]:
+    """Supported poses with their guides"""
     
     yoga_poses = [
         {
@@ -381,15 +386,23 @@ async def get_yoga_poses():
     return [PoseGuide(**pose) for pose in yoga_poses]
 
 @router.get("/poses/{pose_name}", response_model=PoseGuide)
-async def get_pose_guide(pose_name: str):
+async def get_pose_guide(pose_name: str, request: Request):
     """
     Get detailed guide for a specific yoga pose.
     
     TODO: Add pose variations and modifications.
     TODO: Include video demonstrations.
     """
-    
-    poses = await get_yoga_poses()
+    return response_cache.respond(
+        request,
+        "yoga_poses",
+        lambda: _find_pose_guide(pose_name),
+        policy="reference"
+    )
+
+def _find_pose_guide(pose_name: str) -> PoseGuide:
+    """Match a URL pose name (e.g. tree-pose) against the pose guides"""
+    poses = _build_pose_guides()
     
     for pose in poses:
         if pose_name.lower().replace("-", " ") in pose.pose_name.lower():
@@ -415,7 +428,7 @@ async def start_yoga_session(request: YogaSessionRequest):
         raise HTTPException(status_code=400, detail="Invalid difficulty level")
     
     # Generate pose sequence based on parameters
-    all_poses = await get_yoga_poses()
+    all_poses = _build_pose_guides()
     
     # Filter poses by difficulty
     suitable_poses = [pose for pose in all_poses if pose.difficulty_level == request.difficulty or pose.difficulty_level == "Beginner"]
@@ -0,0 +1,93 @@
+"""
+Schema version management for Deep-Shiva API
+Workers only compare the database's Alembic revision with the migration head; creating or upgrading the schema is an explicit migrate step
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .logging_config import get_logger
+
+logger = get_logger("schema_version")
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(SERVER_DIR, "alembic.ini")
+VERSION_TABLE = "alembic_version"
+# Schema that Base.metadata.create_all built before migrations existed
+BASELINE_REVISION = "0001"
+
+class SchemaVersionError(RuntimeError):
+    """The database is not at the revision this code expects"""
+
+def alembic_config(url: Optional[str] = None, configure_logger: bool = True):
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(SERVER_DIR, "migrations"))
+    if url:
+        config.set_main_option("sqlalchemy.url", url)
+    # Inside the app, keep its logging setup instead of alembic.ini's
+    config.attributes["configure_logger"] = configure_logger
+    return config
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    """Newest revision in migrations/versions (read from disk, no database access)"""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+async def current_revision(engine: AsyncEngine) -> Optional[str]:
+    """The database's Alembic revision, or None when it has never been migrated"""
+    async with engine.connect() as connection:
+        try:
+            return (await connection.execute(text(f"SELECT version_num FROM {VERSION_TABLE}"))).scalar()
+        except (exc.ProgrammingError, exc.OperationalError):
+            # Postgres reports a missing table as ProgrammingError, SQLite as OperationalError
+            return None
+
+async def check_schema(engine: AsyncEngine) -> str:
+    """One query against alembic_version; raises SchemaVersionError unless it matches head"""
+    expected = head_revision()
+    current = await current_revision(engine)
+    if current is None:
+        raise SchemaVersionError(
+            f"Database has no {VERSION_TABLE} revision, expected head {expected}. "
+            f"Run `python init_db.py migrate` before starting the API "
+            f"(a database created by create_all is adopted at {BASELINE_REVISION} first)."
+        )
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current}, expected head {expected}. "
+            f"Run `python init_db.py migrate` before starting the API."
+        )
+    return current
+
+def migrate(url: Optional[str] = None, revision: str = "head", configure_logger: bool = True) -> Optional[str]:
+    """
+    Upgrade the database at url (default DATABASE_URL) and return its new revision.
+
+    A database with the baseline tables but no alembic_version (created by
+    create_all before migrations existed) is stamped at BASELINE_REVISION first.
+    """
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import create_engine, inspect, pool
+
+    config = alembic_config(url, configure_logger)
+    engine = create_engine(url or os.environ["DATABASE_URL"], poolclass=pool.NullPool)
+    try:
+        with engine.connect() as connection:
+            tables = set(inspect(connection).get_table_names())
+        if VERSION_TABLE not in tables and "users" in tables:
+            logger.info("Adopting database created by create_all", extra={"revision": BASELINE_REVISION})
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+        with engine.connect() as connection:
+            return MigrationContext.configure(connection).get_current_revision()
+    finally:
+        engine.dispose()
@@ -0,0 +1,116 @@
+"""
+Read schemas for the database endpoints
+Each schema's fields double as the column projection its list query selects
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+class UserRead(BaseModel):
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str] = None
+    preferred_language: Optional[str] = None
+    location: Optional[str] = None
+    interests: Optional[List[Any]] = None
+    created_at: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+class ChatRead(BaseModel):
+    id: int
+    user_id: int
+    title: Optional[str] = None
+    chat_type: Optional[str] = None
+    created_at: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+class UserWithChats(UserRead):
+    chats: Optional[List[ChatRead]] = None  # only with include=chats
+
+class CulturalSiteRead(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    location: str
+    district: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    category: str
+    visiting_hours: Optional[str] = None
+    entry_fee: Optional[str] = None
+    best_time_to_visit: Optional[str] = None
+    images: Optional[List[Any]] = None
+    created_at: Optional[datetime] = None
+
+class ArtisanProductRead(BaseModel):
+    id: int
+    artisan_id: int
+    name: str
+    category: str
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    materials_used: Optional[str] = None
+    images: Optional[List[Any]] = None
+    availability_status: Optional[str] = None
+    eco_friendly: Optional[bool] = None
+    crafting_time_days: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class ArtisanRead(BaseModel):
+    id: int
+    name: str
+    location: str
+    district: str
+    specialization: str
+    experience_years: Optional[int] = None
+    description: Optional[str] = None
+    profile_image: Optional[str] = None
+    is_verified: Optional[bool] = None
+    created_at: Optional[datetime] = None
+
+class ArtisanWithProducts(ArtisanRead):
+    products: Optional[List[ArtisanProductRead]] = None  # only with include=products
+
+class TourismPlaceRead(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    location: str
+    district: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    category: str
+    altitude: Optional[int] = None
+    best_time_to_visit: Optional[str] = None
+    activities: Optional[List[Any]] = None
+    entry_fee: Optional[str] = None
+    crowd_level: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class Page(BaseModel):
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_estimate: Optional[int] = None
+
+class UserPage(Page):
+    users: List[UserWithChats]
+
+class CulturalSitePage(Page):
+    cultural_sites: List[CulturalSiteRead]
+
+class ArtisanPage(Page):
+    artisans: List[ArtisanWithProducts]
+
+class ArtisanProductPage(Page):
+    products: List[ArtisanProductRead]
+
+class TourismPlacePage(Page):
+    tourism_places: List[TourismPlaceRead]
+
+def projection(model, schema) -> list:
+    """Model columns named by the schema's fields (relationship fields are skipped)"""
+    columns = model.__table__.columns
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
@@ -0,0 +1,400 @@
+"""
+Full-text search for Deep-Shiva API
+Postgres tsvector/GIN queries where available, an in-memory BM25 inverted index otherwise, kept current incrementally
+"""
+
+import asyncio
+import hashlib
+import heapq
+import math
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Float, String, event, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .logging_config import get_logger
+from .models import Artisan, CulturalSite, TourismPlace
+from .replicas import read_session
+from .text_analysis import highlight, join_text, tokenize
+
+logger = get_logger("search_index")
+
+# Searchable type -> (model, title fields, keyword fields, body fields)
+SOURCES = {
+    "cultural_site": (
+        CulturalSite, ("name",), ("category", "district", "location"), ("description", "historical_significance")
+    ),
+    "tourism_place": (
+        TourismPlace, ("name",), ("category", "district", "location"), ("description", "activities")
+    ),
+    "artisan": (
+        Artisan, ("name",), ("specialization", "district", "location"), ("description",)
+    ),
+}
+MODEL_TYPES = {model: kind for kind, (model, _, _, _) in SOURCES.items()}
+# Term frequency multipliers per field group (a light BM25F)
+FIELD_WEIGHTS = (3, 2, 1)
+BM25_K1 = 1.2
+BM25_B = 0.75
+LATENCY_WINDOW = 1000
+
+DocKey = Tuple[str, int]
+
+def _columns(kind: str):
+    model, title, keywords, body = SOURCES[kind]
+    return [getattr(model, name) for name in ("id",) + title + keywords + body]
+
+def make_document(kind: str, row) -> Dict[str, Any]:
+    """Searchable document for one row"""
+    _, title, keywords, body = SOURCES[kind]
+    mapping = row._mapping
+    fields = (
+        join_text(mapping[name] for name in title),
+        join_text(mapping[name] for name in keywords),
+        join_text(mapping[name] for name in body),
+    )
+    return {
+        "key": (kind, mapping["id"]),
+        "type": kind,
+        "id": mapping["id"],
+        "title": fields[0],
+        "district": mapping.get("district"),
+        "category": mapping.get("category") or mapping.get("specialization"),
+        "fields": fields,
+        "signature": hashlib.blake2b("\x1f".join(fields).encode("utf-8"), digest_size=8).digest(),
+    }
+
+async def load_documents(db: AsyncSession, kind: str, ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """Active rows of one type (optionally only ids) as documents"""
+    model = SOURCES[kind][0]
+    query = select(*_columns(kind)).where(model.is_active == True)
+    if ids is not None:
+        query = query.where(model.id.in_(list(ids)))
+    return [make_document(kind, row) for row in (await db.execute(query)).all()]
+
+def fingerprint_query():
+    """Row count and newest change per searchable table, in one round trip"""
+    return union_all(*[
+        select(
+            literal(kind, String), func.count(),
+            func.max(func.coalesce(model.updated_at, model.created_at)).cast(String)
+        ).select_from(model)
+        for kind, (model, _, _, _) in SOURCES.items()
+    ])
+
+class BM25Index:
+    """Inverted index (term -> {doc: weighted tf}) with incremental add/remove"""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self.slots: Dict[DocKey, int] = {}
+        self.total_length = 0
+        self._next_slot = 0
+        self._norms: Optional[Dict[int, float]] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def upsert(self, document: Dict[str, Any]) -> bool:
+        """Index a document, replacing any previous version; False when unchanged"""
+        slot = self.slots.get(document["key"])
+        if slot is not None:
+            if self.docs[slot]["signature"] == document["signature"]:
+                return False
+            self.remove(document["key"])
+        slot = self._next_slot
+        self._next_slot += 1
+
+        frequencies: Dict[str, int] = {}
+        for weight, text in zip(FIELD_WEIGHTS, document["fields"]):
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0) + weight
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[slot] = frequency
+        length = sum(frequencies.values())
+        document["terms"] = tuple(frequencies)
+        self.docs[slot] = document
+        self.slots[document["key"]] = slot
+        self.doc_lengths[slot] = length
+        self.total_length += length
+        self._norms = None
+        return True
+
+    def remove(self, key: DocKey) -> bool:
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return False
+        document = self.docs.pop(slot)
+        for term in document["terms"]:
+            postings = self.postings[term]
+            del postings[slot]
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(slot)
+        self._norms = None
+        return True
+
+    def keys(self, kind: str) -> Set[DocKey]:
+        return {key for key in self.slots if key[0] == kind}
+
+    def search(self, terms: List[str], kind: Optional[str] = None, limit: int = 10) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top documents by BM25 over the query terms, best first"""
+        count = len(self.docs)
+        if not count:
+            return []
+        norms = self._norms
+        if norms is None:
+            # Length normalization only changes with the corpus; recompute after writes
+            k1, b, average_length = self.k1, self.b, self.total_length / count
+            norms = self._norms = {
+                slot: k1 * (1 - b + b * length / average_length) for slot, length in self.doc_lengths.items()
+            }
+        boost = self.k1 + 1
+        scores: Dict[int, float] = {}
+        get = scores.get
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) * boost
+            for slot, frequency in postings.items():
+                scores[slot] = get(slot, 0.0) + idf * frequency / (frequency + norms[slot])
+        if kind is not None:
+            scores = {slot: score for slot, score in scores.items() if self.docs[slot]["type"] == kind}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, self.docs[slot]) for slot, score in best]
+
+def _result(kind: str, doc_id: int, title: str, district, category, score: float, snippet: str) -> Dict[str, Any]:
+    return {
+        "type": kind,
+        "id": doc_id,
+        "title": title,
+        "district": district,
+        "category": category,
+        "score": round(score, 4),
+        "snippet": snippet,
+    }
+
+def _snippet(fields: Tuple[str, ...], terms: Set[str]) -> str:
+    """Highlight the body when it matches, otherwise the keywords or title"""
+    for text in reversed(fields):
+        if text and terms.intersection(tokenize(text)):
+            return highlight(text, terms)
+    return highlight(fields[-1] or fields[0], terms)
+
+# Postgres: search_vector is a generated tsvector column with a GIN index (migration 0005)
+SEARCH_VECTOR = literal_column("search_vector")
+
+def postgres_search_query(q: str, kind: Optional[str], limit: int):
+    """Ranked ids from every table's search_vector; snippets are built from the returned text"""
+    tsquery = func.websearch_to_tsquery(literal_column("'english'"), q).op("||")(
+        func.websearch_to_tsquery(literal_column("'simple'"), q)
+    )
+    selects = []
+    for source_kind, (model, title, keywords, body) in SOURCES.items():
+        if kind is not None and source_kind != kind:
+            continue
+        text_columns = [func.coalesce(getattr(model, name).cast(String), "") for name in title + keywords + body]
+        selects.append(
+            select(
+                literal(source_kind, String).label("type"),
+                model.id.label("id"),
+                func.concat_ws(literal("\x1f"), *text_columns).label("text"),
+                func.ts_rank_cd(SEARCH_VECTOR, tsquery, 32).cast(Float).label("score"),
+            ).select_from(model).where(model.is_active == True, SEARCH_VECTOR.op("@@")(tsquery))
+        )
+    ranked = union_all(*selects).subquery()
+    return select(ranked).order_by(ranked.c.score.desc()).limit(limit)
+
+class SearchService:
+    """
+    /api/v1/search backend.
+
+    memory: BM25 over an in-memory inverted index. Rows written through the ORM are
+    reindexed right after their transaction commits; a one-query fingerprint (row
+    count, newest created/updated per table) catches writes from elsewhere, and only
+    documents whose content changed are re-tokenized.
+    postgres: tsvector @@ websearch_to_tsquery over GIN-indexed generated columns.
+    """
+
+    def __init__(self, backend: str = "memory", session_factory=read_session, check_interval: float = 30.0):
+        self.backend = backend
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self.index = BM25Index()
+        self.built = False
+        self._fingerprint: Dict[str, Tuple] = {}
+        self._dirty: Dict[str, Set[int]] = {}
+        self._checked_at = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        self.latencies_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self.documents_reindexed = 0
+
+    # --- write tracking -------------------------------------------------
+
+    def mark_dirty(self, kind: str, ids: Iterable[int]):
+        self._dirty.setdefault(kind, set()).update(ids)
+
+    # --- freshness ------------------------------------------------------
+
+    async def ensure_fresh(self):
+        if self.backend != "memory":
+            return
+        if not self.built:
+            await asyncio.shield(self._ensure_refresh())
+        elif self._dirty or time.monotonic() - self._checked_at >= self.check_interval:
+            self._ensure_refresh()
+
+    def invalidate(self):
+        self._checked_at = float("-inf")
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._task = asyncio.create_task(self.refresh())
+        return task
+
+    async def refresh(self) -> int:
+        """Apply committed ORM writes, then resync tables whose fingerprint changed"""
+        dirty, self._dirty = self._dirty, {}
+        check = not self.built or time.monotonic() - self._checked_at >= self.check_interval
+        changed = 0
+        try:
+            async with self.session_factory() as db:
+                for kind, ids in dirty.items():
+                    documents = await load_documents(db, kind, ids)
+                    found = {document["id"] for document in documents}
+                    changed += sum(self.index.upsert(document) for document in documents)
+                    changed += sum(self.index.remove((kind, doc_id)) for doc_id in ids - found)
+                if check:
+                    self._checked_at = time.monotonic()
+                    fingerprint = {row[0]: tuple(row[1:]) for row in (await db.execute(fingerprint_query())).all()}
+                    for kind in SOURCES:
+                        if self.built and fingerprint.get(kind) == self._fingerprint.get(kind):
+                            continue
+                        changed += await self._resync(db, kind)
+                    self._fingerprint = fingerprint
+        except Exception as e:
+            for kind, ids in dirty.items():
+                self.mark_dirty(kind, ids)
+            logger.error("Search index refresh failed", extra={"error": str(e)})
+            if not self.built:
+                raise
+            return 0
+        if not self.built:
+            self.built = True
+            logger.info("Search index built", extra={
+                "documents": len(self.index),
+                "terms": len(self.index.postings)
+            })
+        self.documents_reindexed += changed
+        return changed
+
+    async def _resync(self, db: AsyncSession, kind: str) -> int:
+        documents = await load_documents(db, kind)
+        changed = sum(self.index.upsert(document) for document in documents)
+        current = {document["key"] for document in documents}
+        for key in self.index.keys(kind) - current:
+            changed += self.index.remove(key)
+        return changed
+
+    # --- queries --------------------------------------------------------
+
+    async def search(
+        self,
+        q: str,
+        kind: Optional[str] = None,
+        limit: int = 10,
+        db: Optional[AsyncSession] = None
+    ) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        terms = tokenize(q)
+        if not terms:
+            return []
+        if self.backend == "postgres":
+            results = await self._search_postgres(db, q, set(terms), kind, limit)
+        else:
+            await self.ensure_fresh()
+            term_set = set(terms)
+            results = [
+                _result(
+                    document["type"], document["id"], document["title"], document["district"],
+                    document["category"], score, _snippet(document["fields"], term_set)
+                )
+                for score, document in self.index.search(terms, kind, limit)
+            ]
+        self.latencies_ms.append((time.perf_counter() - start) * 1000)
+        return results
+
+    async def _search_postgres(self, db, q: str, terms: Set[str], kind: Optional[str], limit: int):
+        async def run(session):
+            return (await session.execute(postgres_search_query(q, kind, limit))).all()
+
+        if db is None:
+            async with self.session_factory() as session:
+                rows = await run(session)
+        else:
+            rows = await run(db)
+        results = []
+        for row in rows:
+            fields = row.text.split("\x1f")
+            _, title, keywords, _ = SOURCES[row.type]
+            title_text = " ".join(fields[:len(title)])
+            keyword_text = fields[len(title):len(title) + len(keywords)]
+            body_text = " ".join(fields[len(title) + len(keywords):])
+            results.append(_result(
+                row.type, row.id, title_text, keyword_text[1] if len(keyword_text) > 1 else None,
+                keyword_text[0] if keyword_text else None, float(row.score),
+                _snippet((title_text, " ".join(keyword_text), body_text), terms)
+            ))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))], 3)
+
+        return {
+            "backend": self.backend,
+            "documents": len(self.index),
+            "terms": len(self.index.postings),
+            "documents_reindexed": self.documents_reindexed,
+            "queries": len(latencies),
+            "latency_ms": {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99)},
+        }
+
+def _backend() -> str:
+    if settings.search_backend != "auto":
+        return settings.search_backend
+    return "postgres" if (settings.database_url or "").startswith("postgres") else "memory"
+
+# Global search service
+search_service = SearchService(backend=_backend(), check_interval=settings.search_check_interval)
+
+# Reindex rows written through the ORM once their transaction commits
+@event.listens_for(Session, "after_flush")
+def _collect_search_writes(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        kind = MODEL_TYPES.get(type(instance))
+        if kind is not None and instance.id is not None:
+            session.info.setdefault("search_dirty", {}).setdefault(kind, set()).add(instance.id)
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_writes(session):
+    for kind, ids in session.info.pop("search_dirty", {}).items():
+        search_service.mark_dirty(kind, ids)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_writes(session):
+    session.info.pop("search_dirty", None)
@@ -0,0 +1,158 @@
+"""
+Suspicious request scanner for Deep-Shiva API
+Matches all attack patterns in a single pass over path, query and (bounded) body chunks
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import unquote_to_bytes
+
+from starlette.types import Message, Receive, Scope
+
+from .config import settings
+from .logging_config import get_logger
+
+logger = get_logger("security_scanner")
+
+# Rule name -> literal patterns (matched case-insensitively)
+DEFAULT_RULES: Dict[str, List[str]] = {
+    "xss": ["script", "alert", "onload", "onerror"],
+    "sql_injection": ["union", "select", "drop", "insert"],
+    "path_traversal": ["../", "..\\", "etc/passwd"],
+    "code_injection": ["eval(", "exec(", "system("],
+}
+
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+class SuspiciousRequestScanner:
+    """Compiles every rule into one alternation so each input is scanned once"""
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, Iterable[str]]] = None,
+        scan_bodies: bool = True,
+        max_body_bytes: int = 65536
+    ):
+        self.rules = {name: list(patterns) for name, patterns in (rules or DEFAULT_RULES).items() if patterns}
+        self.scan_bodies = scan_bodies
+        self.max_body_bytes = max_body_bytes
+        self.match_counts: Counter = Counter()
+        self.scanned_requests = 0
+
+        # Named group per rule; group names must be identifiers
+        self._group_to_rule = {}
+        alternatives = []
+        for index, (name, patterns) in enumerate(self.rules.items()):
+            group = f"r{index}"
+            self._group_to_rule[group] = name
+            # Longest first so the automaton prefers the most specific literal
+            literals = sorted(patterns, key=len, reverse=True)
+            alternatives.append(f"(?P<{group}>" + "|".join(re.escape(p) for p in literals) + ")")
+        self._pattern = re.compile("|".join(alternatives).encode("utf-8"), re.IGNORECASE) if alternatives else None
+
+        # Matches can straddle two body chunks by at most the longest pattern minus one byte
+        self._overlap = max(
+            (len(p.encode("utf-8")) for patterns in self.rules.values() for p in patterns),
+            default=1
+        ) - 1
+
+    def _scan(self, data, found: Set[str]):
+        """Add rule names matched in data (bytes or memoryview) to found"""
+        if self._pattern is None:
+            return
+        for match in self._pattern.finditer(data):
+            found.add(self._group_to_rule[match.lastgroup])
+
+    def scan_request(self, scope: Scope) -> List[str]:
+        """Scan URL path and decoded query string; returns matched rule names"""
+        found: Set[str] = set()
+        target = scope.get("path", "").encode("utf-8")
+        query = scope.get("query_string", b"")
+        if query:
+            target += b"?" + unquote_to_bytes(query)
+        self._scan(target, found)
+        self.scanned_requests += 1
+        self._record(found)
+        return sorted(found)
+
+    def wrap_receive(self, receive: Receive, on_match: Callable[[List[str]], None]) -> Receive:
+        """
+        Wrap an ASGI receive callable so body chunks are scanned as they stream past.
+
+        Only the first max_body_bytes are inspected and chunks are never copied or
+        buffered. The last _overlap bytes seen are kept as a rolling tail (which may
+        span several small chunks) and joined with the start of the next chunk.
+        """
+        state = {"scanned": 0, "tail": b"", "done": False}
+        found: Set[str] = set()
+
+        async def scanning_receive() -> Message:
+            message = await receive()
+            if state["done"] or message["type"] != "http.request":
+                return message
+
+            chunk = message.get("body", b"")
+            budget = self.max_body_bytes - state["scanned"]
+            if chunk and budget > 0:
+                view = memoryview(chunk)[:budget]
+                if state["tail"]:
+                    self._scan(state["tail"] + bytes(view[:self._overlap]), found)
+                self._scan(view, found)
+                state["scanned"] += len(view)
+                if not self._overlap:
+                    state["tail"] = b""
+                elif len(view) >= self._overlap:
+                    state["tail"] = bytes(view[-self._overlap:])
+                else:
+                    state["tail"] = (state["tail"] + bytes(view))[-self._overlap:]
+
+            if not message.get("more_body", False) or state["scanned"] >= self.max_body_bytes:
+                state["done"] = True
+                if found:
+                    self._record(found)
+                    on_match(sorted(found))
+            return message
+
+        return scanning_receive
+
+    def _record(self, found: Set[str]):
+        for rule in found:
+            self.match_counts[rule] += 1
+
+    def get_stats(self) -> Dict[str, object]:
+        """Match counts by rule for monitoring"""
+        return {
+            "scanned_requests": self.scanned_requests,
+            "matches_by_rule": {rule: self.match_counts.get(rule, 0) for rule in self.rules},
+            "rules": {name: len(patterns) for name, patterns in self.rules.items()},
+            "body_scanning": self.scan_bodies,
+            "max_body_bytes": self.max_body_bytes
+        }
+
+def load_rules(path: Optional[str]) -> Dict[str, List[str]]:
+    """Load rules from a JSON file ({"rule": ["pattern", ...]}), falling back to defaults"""
+    if not path:
+        return DEFAULT_RULES
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        # A single pattern may be given as a plain string
+        return {
+            str(name): [patterns] if isinstance(patterns, str) else [str(p) for p in patterns]
+            for name, patterns in rules.items()
+        }
+    except (OSError, ValueError, AttributeError) as e:
+        logger.error("Failed to load security scan rules, using defaults", extra={
+            "path": path,
+            "error": str(e)
+        })
+        return DEFAULT_RULES
+
+# Global scanner instance
+security_scanner = SuspiciousRequestScanner(
+    rules=load_rules(settings.security_scan_rules_file),
+    scan_bodies=settings.security_scan_bodies,
+    max_body_bytes=settings.security_scan_max_body_bytes
+)
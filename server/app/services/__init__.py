@@ -4,5 +4,6 @@ Contains business logic and external service integrations
 """
 
 from .ollama_service import ollama_service
+from .embedding_service import embedding_service
 
-__all__ = ["ollama_service"]
\ No newline at end of file
+__all__ = ["ollama_service", "embedding_service"]
\ No newline at end of file
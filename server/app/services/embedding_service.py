@@ -0,0 +1,312 @@
+"""
+Embedding service for Deep-Shiva API
+Content-addressed, memory-mapped embedding store with micro-batched Ollama embedding calls
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import ollama
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development, no cross-worker append lock
+    fcntl = None
+
+from ..config import settings
+from ..logging_config import get_logger, ErrorTracker
+
+logger = get_logger("embedding_service")
+error_tracker = ErrorTracker(logger)
+
+KEY_BYTES = 16
+META_FILE = "meta.json"
+KEYS_FILE = "keys.bin"
+LOCK_FILE = ".append.lock"
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with collapsed whitespace, so trivially different inputs share a vector"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def content_key(model: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model}\0{normalize_text(text)}".encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+class EmbeddingStore:
+    """
+    Append-only vectors for one model: vectors.bin holds rows of dim values in dtype,
+    keys.bin the matching 16-byte content hashes.
+
+    Keys are appended after their vectors, so a row exists only once both are on disk;
+    other workers see new rows the next time they miss a key. Appends hold a file lock.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float16"):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self.rows: Dict[bytes, int] = {}
+        self._keys_size = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._load_meta()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @property
+    def vectors_file(self) -> str:
+        return self._path("vectors.bin")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _load_meta(self):
+        try:
+            with open(self._path(META_FILE), "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except FileNotFoundError:
+            return
+        self.dim = meta["dim"]
+        self.dtype = np.dtype(meta["dtype"])
+
+    def sync(self) -> int:
+        """Read keys appended since the last sync (by any process); returns rows added"""
+        if self.dim is None:
+            self._load_meta()
+            if self.dim is None:
+                return 0
+        try:
+            size = os.stat(self._path(KEYS_FILE)).st_size
+        except FileNotFoundError:
+            return 0
+        size -= size % KEY_BYTES
+        if size <= self._keys_size:
+            return 0
+        with open(self._path(KEYS_FILE), "rb") as handle:
+            handle.seek(self._keys_size)
+            data = handle.read(size - self._keys_size)
+        start = self._keys_size // KEY_BYTES
+        for i in range(len(data) // KEY_BYTES):
+            self.rows.setdefault(data[i * KEY_BYTES:(i + 1) * KEY_BYTES], start + i)
+        self._keys_size = size
+        self._vectors = np.memmap(self.vectors_file, dtype=self.dtype, mode="r", shape=(size // KEY_BYTES, self.dim))
+        return len(data) // KEY_BYTES
+
+    def get(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """float32 vectors for the stored keys among keys"""
+        if any(key not in self.rows for key in keys):
+            self.sync()
+        found = [(key, self.rows[key]) for key in keys if key in self.rows]
+        if not found:
+            return {}
+        matrix = np.asarray(self._vectors[[row for _, row in found]], dtype=np.float32)
+        return {key: matrix[i] for i, (key, _) in enumerate(found)}
+
+    def put(self, keys: Sequence[bytes], vectors: np.ndarray) -> int:
+        """Append vectors for keys not stored yet; returns rows written"""
+        vectors = np.asarray(vectors)
+        if not len(keys):
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(LOCK_FILE), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.sync()
+                if self.dim is None:
+                    self.dim = int(vectors.shape[1])
+                    with open(self._path(META_FILE), "w", encoding="utf-8") as handle:
+                        json.dump({"dim": self.dim, "dtype": self.dtype.name}, handle)
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+
+                new = {}
+                for key, vector in zip(keys, vectors):
+                    if key not in self.rows and key not in new:
+                        new[key] = vector
+                if not new:
+                    return 0
+                count = len(self.rows)
+                with open(self.vectors_file, "ab") as handle:
+                    # Drop a partial tail left by an interrupted append
+                    handle.truncate(count * self.dim * self.dtype.itemsize)
+                    handle.write(np.asarray(list(new.values()), dtype=self.dtype).tobytes())
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                with open(self._path(KEYS_FILE), "ab") as handle:
+                    handle.truncate(count * KEY_BYTES)
+                    handle.write(b"".join(new))
+                self.sync()
+                return len(new)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def size_bytes(self) -> int:
+        try:
+            return os.stat(self.vectors_file).st_size
+        except FileNotFoundError:
+            return 0
+
+class EmbeddingService:
+    """
+    Embeddings for catalogue text and user queries.
+
+    Inputs are keyed by a hash of (model, normalized text); stored keys are served
+    from the memory-mapped store and never recomputed. Missing texts from concurrent
+    callers are collected for batch_window_ms (or until max_batch) and sent to
+    Ollama in one embed call; a text already in flight is awaited, not re-sent.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        directory: str,
+        host: Optional[str] = None,
+        dtype: str = "float16",
+        batch_window_ms: float = 10.0,
+        max_batch: int = 64,
+        embed_fn: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None
+    ):
+        self.model = model
+        self.directory = directory
+        self.host = host
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.embed_fn = embed_fn or self._ollama_embed
+        self.store = EmbeddingStore(os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", model)), dtype)
+        self._client: Optional[ollama.Client] = None
+        self._pending: Dict[bytes, str] = {}
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flushing = False
+        self.stats = {
+            "requested": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "computed": 0,
+            "upstream_calls": 0,
+            "upstream_ms": 0.0,
+            "failures": 0
+        }
+
+    def _ollama_embed(self, texts: List[str]) -> Sequence[Sequence[float]]:
+        if self._client is None:
+            self._client = ollama.Client(host=self.host)
+        return self._client.embed(model=self.model, input=texts)["embeddings"]
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32 matrix, in input order"""
+        if not texts:
+            return np.empty((0, self.store.dim or 0), dtype=np.float32)
+        keys = [content_key(self.model, text) for text in texts]
+        self.stats["requested"] += len(keys)
+        vectors = await asyncio.to_thread(self.store.get, list(dict.fromkeys(keys)))
+        self.stats["cache_hits"] += sum(key in vectors for key in keys)
+
+        loop = asyncio.get_running_loop()
+        waiting = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in waiting:
+                continue
+            future = self._inflight.get(key)
+            if future is not None and future.get_loop() is loop:
+                self.stats["deduplicated"] += 1
+            else:
+                future = self._inflight[key] = loop.create_future()
+                self._pending[key] = text
+            waiting[key] = future
+        if waiting:
+            self._schedule_flush(loop)
+            # Shielded: the futures are shared, so a cancelled caller must not cancel them for the others
+            results = await asyncio.gather(*(asyncio.shield(future) for future in waiting.values()))
+            vectors.update(zip(waiting, results))
+        return np.stack([vectors[key] for key in keys])
+
+    async def embed_one(self, text: str) -> np.ndarray:
+        return (await self.embed([text]))[0]
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop):
+        if self._flushing:
+            return
+        if len(self._pending) >= self.max_batch:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flushing = True
+        asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self):
+        try:
+            while self._pending:
+                batch = dict(list(self._pending.items())[:self.max_batch])
+                for key in batch:
+                    del self._pending[key]
+                await self._compute(batch)
+        finally:
+            self._flushing = False
+
+    async def _compute(self, batch: Dict[bytes, str]):
+        keys, texts = list(batch), list(batch.values())
+        start = time.perf_counter()
+        try:
+            result = np.asarray(await asyncio.to_thread(self.embed_fn, texts), dtype=np.float32)
+            if result.shape[0] != len(keys):
+                raise ValueError(f"Expected {len(keys)} embeddings, got {result.shape[0]}")
+            await asyncio.to_thread(self.store.put, keys, result)
+        except Exception as e:
+            self.stats["failures"] += 1
+            error_tracker.log_external_api_error(e, "Ollama", "embed")
+            for key in keys:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stats["upstream_calls"] += 1
+        self.stats["upstream_ms"] += elapsed
+        self.stats["computed"] += len(keys)
+        logger.debug("Embedding batch computed", extra={
+            "model": self.model,
+            "batch_size": len(keys),
+            "duration_ms": round(elapsed, 2)
+        })
+        # Hand out the stored precision so a vector is identical whether or not it was cached
+        result = result.astype(self.store.dtype).astype(np.float32)
+        for key, vector in zip(keys, result):
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.stats["upstream_calls"]
+        return {
+            "model": self.model,
+            "stored": len(self.store),
+            "dim": self.store.dim,
+            "dtype": self.store.dtype.name,
+            "store_bytes": self.store.size_bytes(),
+            **{key: round(value, 2) if isinstance(value, float) else value for key, value in self.stats.items()},
+            "avg_batch_size": round(self.stats["computed"] / calls, 2) if calls else None
+        }
+
+# Global embedding service
+embedding_service = EmbeddingService(
+    settings.embedding_model,
+    settings.embedding_store_dir,
+    host=settings.ollama_host,
+    dtype=settings.embedding_dtype,
+    batch_window_ms=settings.embedding_batch_window_ms,
+    max_batch=settings.embedding_max_batch
+)
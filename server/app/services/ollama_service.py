@@ -5,12 +5,15 @@ Handles communication with Ollama for AI-powered chat responses
 
 import ollama
 import asyncio
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import json
 
 from ..config import settings
 from ..logging_config import get_logger, ErrorTracker, get_ai_response_logger, AIResponseLogger
+from ..metrics_rollup import LATENCY_BUCKETS_MS, metrics_collector
+from .retrieval import retrieval_index
 
 logger = get_logger("ollama_service")
 error_tracker = ErrorTracker(logger)
@@ -70,7 +73,20 @@ class OllamaService:
             error_tracker.log_external_api_error(e, "Ollama", "list_models")
             return False
     
-    def _build_system_prompt(self, context: Optional[str] = None) -> str:
+    async def _retrieve_facts(self, message: str) -> Dict[str, Any]:
+        """Database records relevant to the message, formatted for the system prompt"""
+        if not settings.rag_enabled:
+            return {"facts": [], "retrieval_ms": None}
+        try:
+            await retrieval_index.ensure_fresh()
+            start = time.perf_counter()
+            facts = retrieval_index.retrieve(message)
+            return {"facts": facts, "retrieval_ms": round((time.perf_counter() - start) * 1000, 3)}
+        except Exception as e:
+            logger.error("Fact retrieval failed", extra={"error": str(e)})
+            return {"facts": [], "retrieval_ms": None}
+    
+    def _build_system_prompt(self, context: Optional[str] = None, facts: Optional[str] = None) -> str:
         """Build system prompt for Deep-Shiva tourism chatbot"""
         base_prompt = """You are Deep-Shiva, an AI assistant specialized in Uttarakhand tourism and spiritual guidance. You help visitors with:
 
@@ -93,6 +109,13 @@ Guidelines:
 
 Current context: You are helping with Uttarakhand tourism and pilgrimage planning."""
 
+        if facts:
+            base_prompt += (
+                "\n\nFacts from the Deep-Shiva database (use these exact timings, fees, altitudes and "
+                "phone numbers; if a detail is not listed here, say you are not certain rather than guessing):\n"
+                f"{facts}"
+            )
+        
         if context:
             base_prompt += f"\n\nAdditional context: {context}"
         
@@ -141,8 +164,11 @@ Current context: You are helping with Uttarakhand tourism and pilgrimage plannin
             print(f"{'='*80}")
             print(f"⏳ Processing with {self.model}...")
             
+            # Ground the prompt in stored records
+            retrieval = await self._retrieve_facts(message)
+            
             # Build the prompt
-            system_prompt = self._build_system_prompt(context)
+            system_prompt = self._build_system_prompt(context, retrieval_index.format_facts(retrieval["facts"]))
             
             # Prepare conversation messages
             messages = [{"role": "system", "content": system_prompt}]
@@ -183,6 +209,7 @@ Current context: You are helping with Uttarakhand tourism and pilgrimage plannin
             
             # Calculate processing time
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
+            metrics_collector.observe("llm_latency_ms", processing_time, buckets=LATENCY_BUCKETS_MS)
             
             # Log successful response
             logger.info("AI response generated successfully", extra={
@@ -221,13 +248,18 @@ Current context: You are helping with Uttarakhand tourism and pilgrimage plannin
                 "metadata": {
                     "temperature": self.temperature,
                     "max_tokens": self.max_tokens,
-                    "message_count": len(messages)
+                    "message_count": len(messages),
+                    "retrieved_records": [fact["key"] for fact in retrieval["facts"]],
+                    "retrieval_ms": retrieval["retrieval_ms"]
                 }
             }
             
         except Exception as e:
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
             
+            metrics_collector.observe("llm_latency_ms", processing_time, buckets=LATENCY_BUCKETS_MS)
+            metrics_collector.increment("llm_fallbacks")
+            
             error_tracker.log_external_api_error(e, "Ollama", "chat_completion")
             
             logger.error("AI response generation failed", extra={
@@ -0,0 +1,398 @@
+"""
+Retrieval stage for Deep-Shiva chat
+Embeds tourism places, cultural sites and emergency contacts into a memory-mapped vector index and picks prompt facts within a token budget
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development, no cross-worker build lock
+    fcntl = None
+
+from ..config import settings
+from ..geo_index import load_fingerprint
+from ..logging_config import get_logger
+from ..models import CulturalSite, EmergencyContact, TourismPlace
+from ..replicas import read_session
+from ..text_analysis import join_text, tokenize
+
+logger = get_logger("retrieval")
+
+EMBEDDING_DIM = 512
+MANIFEST = "manifest.json"
+LOCK_FILE = ".build.lock"
+CHARS_PER_TOKEN = 4
+DESCRIPTION_CHARS = 160
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of analyzed terms plus character trigrams (weighted lower).
+
+    Runs in-process in microseconds, so embedding the user's message never needs an
+    upstream call; trigrams let inflections and small misspellings still overlap.
+    """
+
+    trigram_weight = 0.3
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = vectors[row]
+            for term in tokenize(text):
+                index, sign = _bucket(term, self.dim)
+                vector[index] += sign
+                padded = f"#{term}#"
+                for i in range(len(padded) - 2):
+                    index, sign = _bucket(padded[i:i + 3], self.dim)
+                    vector[index] += sign * self.trigram_weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+def _clip(text: Optional[str], limit: int = DESCRIPTION_CHARS) -> Optional[str]:
+    if not text:
+        return None
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+def _fact(head: str, details: Iterable[Tuple[str, Any]]) -> str:
+    """'Head: label value; label value' skipping empty values"""
+    parts = [f"{label} {value}" if label else str(value) for label, value in details if value not in (None, "", [])]
+    return f"{head}: {'; '.join(parts)}" if parts else head
+
+def place_record(row) -> Dict[str, str]:
+    activities = row.activities
+    if isinstance(activities, list):
+        activities = ", ".join(str(activity).replace("_", " ") for activity in activities[:6])
+    fact = _fact(f"{row.name} ({row.category.replace('_', ' ')}, {row.district})", [
+        ("altitude", f"{row.altitude} m" if row.altitude else None),
+        ("best time", row.best_time_to_visit),
+        ("entry fee", row.entry_fee),
+        ("activities", activities),
+        ("getting there", _clip(row.transportation, 100)),
+        ("", _clip(row.description)),
+    ])
+    return {"key": f"tourism_place:{row.id}", "fact": fact, "text": join_text([fact, row.location, row.description])}
+
+def site_record(row) -> Dict[str, str]:
+    fact = _fact(f"{row.name} ({row.category.replace('_', ' ')}, {row.location}, {row.district})", [
+        ("hours", row.visiting_hours),
+        ("entry fee", row.entry_fee),
+        ("best time", row.best_time_to_visit),
+        ("", _clip(row.historical_significance or row.description)),
+    ])
+    return {
+        "key": f"cultural_site:{row.id}",
+        "fact": fact,
+        "text": join_text([fact, row.description, row.historical_significance])
+    }
+
+def contact_record(row) -> Dict[str, str]:
+    fact = _fact(f"{row.name} ({row.service_type.replace('_', ' ')}, {row.district})", [
+        ("phone", row.phone_number),
+        ("", "24x7" if row.is_24x7 else "not 24x7"),
+        ("address", _clip(row.address, 100)),
+    ])
+    return {"key": f"emergency_contact:{row.id}", "fact": fact, "text": join_text([fact, "emergency helpline contact"])}
+
+async def load_records(db: AsyncSession) -> List[Dict[str, str]]:
+    """Prompt facts (and the text to embed for each) for every active row"""
+    records = []
+    for model, to_record in ((TourismPlace, place_record), (CulturalSite, site_record), (EmergencyContact, contact_record)):
+        rows = await db.execute(select(model).where(model.is_active == True).order_by(model.id))
+        records.extend(to_record(row) for row in rows.scalars())
+    for record in records:
+        record["signature"] = hashlib.blake2b(record["text"].encode("utf-8"), digest_size=8).hexdigest()
+        record["tokens"] = max(1, len(record["fact"]) // CHARS_PER_TOKEN)
+    return records
+
+class IndexSnapshot:
+    """One on-disk version: memory-mapped vectors plus the facts they belong to"""
+
+    def __init__(self, version: str, vectors: np.ndarray, records: List[Dict[str, Any]], manifest: Dict[str, Any]):
+        self.version = version
+        self.vectors = vectors
+        self.records = records
+        self.manifest = manifest
+
+EMPTY = IndexSnapshot("", np.empty((0, EMBEDDING_DIM), dtype=np.float32), [], {})
+
+class RetrievalIndex:
+    """
+    Top-k prompt facts for a chat message.
+
+    The index lives in directory as versioned files (vectors-<v>.f32, records-<v>.json)
+    named by manifest.json, which is replaced atomically. Every worker memory-maps the
+    version the manifest names and re-reads the manifest when its mtime changes, so a
+    rebuild (by any worker or `python init_db.py rag-index`) is picked up without a
+    restart. Rebuilds are triggered by the tables' change fingerprint, hold a file lock
+    so one worker does the work, and only embed records whose text changed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        embedder: Optional[HashingEmbedder] = None,
+        session_factory=read_session,
+        check_interval: float = 60.0,
+        top_k: int = 5,
+        token_budget: int = 400,
+        min_score: float = 0.15
+    ):
+        self.directory = directory
+        self.embedder = embedder or HashingEmbedder()
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.min_score = min_score
+        self.snapshot = EMPTY
+        self._manifest_mtime: Optional[Tuple[int, int]] = None
+        self._checked_at = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.last_build: Optional[Dict[str, Any]] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    # --- loading --------------------------------------------------------
+
+    def load(self) -> bool:
+        """Map the version named by the manifest if it changed; True when a new version was loaded"""
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return False
+        # os.replace gives every new manifest a new inode, even within one mtime tick
+        mtime = (stat.st_mtime_ns, stat.st_ino)
+        if mtime == self._manifest_mtime:
+            return False
+        with open(self.manifest_path, "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("embedder") != self.embedder.name:
+            logger.warning("Retrieval index built with another embedder, ignoring", extra={
+                "index_embedder": manifest.get("embedder"),
+                "embedder": self.embedder.name
+            })
+            self._manifest_mtime = mtime
+            return False
+        version = manifest["version"]
+        with open(os.path.join(self.directory, manifest["records"]), "r", encoding="utf-8") as handle:
+            records = json.load(handle)
+        if records:
+            vectors = np.memmap(
+                os.path.join(self.directory, manifest["vectors"]), dtype=np.float32, mode="r",
+                shape=(len(records), manifest["dim"])
+            )
+        else:
+            vectors = np.empty((0, manifest["dim"]), dtype=np.float32)
+        # Swap in one assignment so concurrent queries see either the old or the new version
+        self.snapshot = IndexSnapshot(version, vectors, records, manifest)
+        self._manifest_mtime = mtime
+        logger.info("Retrieval index loaded", extra={"version": version, "records": len(records)})
+        return True
+
+    # --- queries --------------------------------------------------------
+
+    def retrieve(self, query: str, k: Optional[int] = None, token_budget: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Best-matching facts, most relevant first, whose token estimates fit the budget"""
+        snapshot = self.snapshot
+        if not snapshot.records or not query.strip():
+            return []
+        k = k or self.top_k
+        budget = self.token_budget if token_budget is None else token_budget
+        scores = snapshot.vectors @ self.embedder.embed([query])[0]
+        candidates = min(len(scores), k * 3)
+        top = np.argpartition(scores, len(scores) - candidates)[-candidates:]
+        top = top[np.argsort(scores[top])[::-1]]
+
+        selected, used = [], 0
+        for i in top:
+            score = float(scores[i])
+            if score < self.min_score or len(selected) == k:
+                break
+            record = snapshot.records[i]
+            if used + record["tokens"] > budget:
+                continue
+            used += record["tokens"]
+            selected.append({"key": record["key"], "fact": record["fact"], "score": round(score, 4)})
+        return selected
+
+    @staticmethod
+    def format_facts(facts: List[Dict[str, Any]]) -> str:
+        return "\n".join(f"- {fact['fact']}" for fact in facts)
+
+    # --- freshness ------------------------------------------------------
+
+    async def ensure_fresh(self):
+        """Load or build on first use; afterwards check for changes in the background"""
+        if not self.snapshot.manifest:
+            self.load()
+        if not self.snapshot.manifest:
+            await asyncio.shield(self._ensure_refresh())
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            self._ensure_refresh()
+
+    def invalidate(self):
+        self._checked_at = float("-inf")
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._checked_at = time.monotonic()
+            task = self._task = asyncio.create_task(self.refresh())
+        return task
+
+    async def refresh(self) -> bool:
+        """Pick up another worker's build, then rebuild if the tables changed since the loaded version"""
+        try:
+            self.load()
+            async with self.session_factory() as db:
+                fingerprint = json.loads(json.dumps(await load_fingerprint(db), default=str))
+                if self.snapshot.manifest.get("fingerprint") == fingerprint:
+                    return False
+                records = await load_records(db)
+            return await asyncio.to_thread(self._build_locked, records, fingerprint)
+        except Exception as e:
+            logger.error("Retrieval index refresh failed", extra={"error": str(e)})
+            return False
+
+    # --- building -------------------------------------------------------
+
+    def _build_locked(self, records: List[Dict[str, Any]], fingerprint: Any) -> bool:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Another worker is building; its manifest is loaded on the next check
+                    return False
+            try:
+                # It may have finished a build while we were loading rows
+                self.load()
+                if self.snapshot.manifest.get("fingerprint") == fingerprint:
+                    return False
+                self.build(records, fingerprint)
+                return True
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def build(self, records: List[Dict[str, Any]], fingerprint: Any = None) -> Dict[str, Any]:
+        """Write a new version, reusing vectors of records whose text is unchanged"""
+        start = time.perf_counter()
+        previous = self.snapshot
+        reusable = {record["signature"]: i for i, record in enumerate(previous.records)}
+        dim = self.embedder.dim
+        vectors = np.zeros((len(records), dim), dtype=np.float32)
+        pending = []
+        for i, record in enumerate(records):
+            j = reusable.get(record["signature"])
+            if j is not None and previous.vectors.shape[1] == dim:
+                vectors[i] = previous.vectors[j]
+            else:
+                pending.append(i)
+        if pending:
+            vectors[pending] = self.embedder.embed([records[i]["text"] for i in pending])
+
+        version = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        vectors_name, records_name = f"vectors-{version}.f32", f"records-{version}.json"
+        vectors.tofile(os.path.join(self.directory, vectors_name))
+        stored = [{key: record[key] for key in ("key", "fact", "signature", "tokens")} for record in records]
+        with open(os.path.join(self.directory, records_name), "w", encoding="utf-8") as handle:
+            json.dump(stored, handle, ensure_ascii=False)
+        manifest = {
+            "version": version,
+            "embedder": self.embedder.name,
+            "dim": dim,
+            "count": len(records),
+            "vectors": vectors_name,
+            "records": records_name,
+            "fingerprint": fingerprint,
+            "built_at": datetime.now().isoformat()
+        }
+        temporary = self.manifest_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+        os.replace(temporary, self.manifest_path)
+        self.load()
+        self._remove_old_versions(keep={version, previous.version})
+
+        self.builds += 1
+        self.last_build = {
+            "version": version,
+            "records": len(records),
+            "embedded": len(pending),
+            "reused": len(records) - len(pending),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        logger.info("Retrieval index built", extra=self.last_build)
+        return self.last_build
+
+    def _remove_old_versions(self, keep: set):
+        for name in os.listdir(self.directory):
+            if name.startswith(("vectors-", "records-")) and name.split("-", 1)[1].split(".")[0] not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        manifest = self.snapshot.manifest
+        return {
+            "version": self.snapshot.version or None,
+            "records": len(self.snapshot.records),
+            "embedder": self.embedder.name,
+            "built_at": manifest.get("built_at"),
+            "builds": self.builds,
+            "last_build": self.last_build,
+            "top_k": self.top_k,
+            "token_budget": self.token_budget
+        }
+
+async def rebuild(directory: Optional[str] = None) -> Dict[str, Any]:
+    """Full rebuild from the primary database (init_db.py rag-index)"""
+    from ..database import AsyncSessionLocal
+
+    index = RetrievalIndex(directory or settings.rag_index_dir, session_factory=AsyncSessionLocal)
+    index.load()
+    async with AsyncSessionLocal() as db:
+        fingerprint = json.loads(json.dumps(await load_fingerprint(db), default=str))
+        records = await load_records(db)
+    os.makedirs(index.directory, exist_ok=True)
+    return index.build(records, fingerprint)
+
+# Global index used by OllamaService
+retrieval_index = RetrievalIndex(
+    settings.rag_index_dir,
+    check_interval=settings.rag_check_interval,
+    top_k=settings.rag_top_k,
+    token_budget=settings.rag_token_budget,
+    min_score=settings.rag_min_score
+)
@@ -0,0 +1,134 @@
+"""
+Text analysis for Deep-Shiva search
+Tokenizes, normalizes and stems English and Hindi (Devanagari) text and highlights matches in snippets
+"""
+
+import html
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Set, Tuple
+
+# Latin letters/digits and Devanagari letters, vowel signs and digits (danda ।॥ separate words)
+TOKEN_PATTERN = re.compile(r"[0-9a-zÀ-ɏ]+|[ऀ-ॣ०-ॿ]+", re.IGNORECASE)
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+
+ENGLISH_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+HINDI_STOPWORDS = frozenset("""
+का की के है हैं में और से को पर यह वह एक था थे थी भी तो ही ने कि जो इस उस लिए तक या
+""".split())
+
+# Light Hindi stemmer suffixes (Ramanathan & Rao), longest first
+HINDI_SUFFIXES = sorted("""
+ाएंगी ाएंगे ाऊंगी ाऊंगा ाइयां ाइयों
+ाएगी ाएगा ाओगी ाओगे एंगी ेंगी एंगे ेंगे ूंगी ूंगा ातीं नाओं नाएं ताओं ताएं ियां ियों
+ाकर ाइए ाईं ाया ेगी ेगा ोगी ोगे ाने ाना ाते ाती ाता तीं ाओं ाएं ुओं ुएं ुआं
+कर ाओ िए ाई ाए ने नी ना ते ीं ती ता ां ों ें
+ो े ू ु ी ि ा
+""".split(), key=len, reverse=True)
+
+def normalize_hindi(token: str) -> str:
+    """Drop nukta and fold chandrabindu into anusvara so spelling variants match"""
+    return token.replace("़", "").replace("ँ", "ं")
+
+def stem_hindi(token: str) -> str:
+    for suffix in HINDI_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+def stem_english(token: str) -> str:
+    """Plural and -ing/-ed stripping; deliberately conservative"""
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith("'s"):
+        token = token[:-2]
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            stem = token[:-len(suffix)]
+            # trekking -> trekk -> trek
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "lsz":
+                stem = stem[:-1]
+            return stem
+    return token
+
+@lru_cache(maxsize=65536)
+def analyze_token(raw: str) -> str:
+    """Search term for one raw token ('' for stopwords); cached, as vocabularies repeat heavily"""
+    if DEVANAGARI.match(raw):
+        token = normalize_hindi(raw)
+        return "" if token in HINDI_STOPWORDS else stem_hindi(token)
+    token = raw.lower()
+    return "" if token in ENGLISH_STOPWORDS else stem_english(token)
+
+def iter_tokens(text: str) -> Iterator[Tuple[str, int, int]]:
+    """(term, start, end) for every non-stopword token in text"""
+    for match in TOKEN_PATTERN.finditer(text or ""):
+        term = analyze_token(match.group())
+        if term:
+            yield term, match.start(), match.end()
+
+def tokenize(text: str) -> List[str]:
+    return [term for term, _, _ in iter_tokens(text)]
+
+def highlight(text: str, terms: Set[str], width: int = 160, mark: Tuple[str, str] = ("<mark>", "</mark>")) -> str:
+    """
+    HTML-escaped window of text around the densest run of matching terms, matches wrapped in mark.
+
+    Falls back to the start of the text when nothing matches.
+    """
+    if not text:
+        return ""
+    hits = [(start, end) for term, start, end in iter_tokens(text) if term in terms]
+    if not hits:
+        return html.escape(text[:width]) + ("…" if len(text) > width else "")
+
+    # Window start that covers the most hits
+    best_start, best_count = hits[0][0], 0
+    right = 0
+    for left in range(len(hits)):
+        while right < len(hits) and hits[right][1] - hits[left][0] <= width:
+            right += 1
+        if right - left > best_count:
+            best_start, best_count = hits[left][0], right - left
+    start = max(0, best_start - width // 4)
+    # Do not cut a word in half
+    while start > 0 and text[start - 1].isalnum():
+        start -= 1
+    end = min(len(text), start + width)
+    while end < len(text) and text[end].isalnum():
+        end += 1
+
+    parts = ["…"] if start > 0 else []
+    cursor = start
+    for hit_start, hit_end in hits:
+        if hit_start < start or hit_end > end:
+            continue
+        parts.append(html.escape(text[cursor:hit_start]))
+        parts.append(mark[0] + html.escape(text[hit_start:hit_end]) + mark[1])
+        cursor = hit_end
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+def join_text(values: Iterable) -> str:
+    """Flatten strings and JSON lists/dicts into one text blob"""
+    parts = []
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            parts.append(join_text(value.values()))
+        elif isinstance(value, (list, tuple)):
+            parts.append(join_text(value))
+        else:
+            parts.append(str(value))
+    return " ".join(part for part in parts if part)
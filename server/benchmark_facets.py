@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark faceted product browsing
+Snapshot build time and browse() latency (results plus every facet count) by catalogue size (target: p95 under 20 ms at 50k products)
+"""
+
+import os
+import random
+import statistics
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./deep_shiva.db")
+
+from app.catalogue import CatalogueSnapshot, Product
+
+CATEGORIES = ["Textiles", "Art & Paintings", "Home & Decor", "Utensils", "Jewelry"]
+VILLAGES = ["Almora", "Chamoli", "Munsiyari", "Bageshwar", "Pithoragarh", "Mana"]
+MATERIALS = ["Pure Wool", "Copper", "Ringal Bamboo", "Silver", "Natural Dyes", "Brass"]
+QUERIES = [
+    ((), (), (), None, True, None, None, "name"),
+    (["Textiles"], ["Almora", "Chamoli"], (), True, True, 500, 5000, "price"),
+    ((), (), ["Copper"], None, None, None, 3000, "rating"),
+]
+
+def build_products(count: int, seed: int = 3) -> List[Product]:
+    rng = random.Random(seed)
+    return [
+        Product(
+            id=i + 1, name=f"Item {rng.randrange(10 ** 6):06d}", description="", price=rng.randrange(100, 10000),
+            artisan="Artisan", image="", category=rng.choice(CATEGORIES), rating=round(rng.uniform(3, 5), 1),
+            reviews_count=0, in_stock=rng.random() < 0.8, materials=rng.sample(MATERIALS, rng.randint(1, 3)),
+            origin_village=rng.choice(VILLAGES), crafting_time_days=1, eco_friendly=rng.random() < 0.5
+        )
+        for i in range(count)
+    ]
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    return (
+        f"p50 {statistics.median(ordered):.3f} ms, p95 {ordered[int(len(ordered) * 0.95)]:.3f} ms, "
+        f"p99 {ordered[int(len(ordered) * 0.99)]:.3f} ms"
+    )
+
+def main(rounds: int = 50):
+    print("📊 Faceted browse benchmark")
+    print("=" * 82)
+    for count in (5000, 50000, 100000):
+        products = build_products(count)
+        start = time.perf_counter()
+        snapshot = CatalogueSnapshot(products, "benchmark")
+        build_seconds = time.perf_counter() - start
+        timings = []
+        for args in QUERIES * rounds:
+            start = time.perf_counter()
+            snapshot.browse(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{count:>7} products  build {build_seconds:6.2f} s  {percentiles(timings)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark product search and autocomplete
+Index build time and search/suggest latency for typed, misspelled and partial queries by catalogue size (target: p99 under 5 ms at 50k products)
+"""
+
+import os
+import random
+import statistics
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./deep_shiva.db")
+
+from app.catalogue import CatalogueSnapshot, Product
+
+WORDS = [
+    "woolen", "shawl", "pashmina", "scarf", "copper", "bottle", "ringal", "basket", "aipan", "canvas",
+    "honey", "prayer", "beads", "brass", "lamp", "tapestry", "blanket", "cushion", "mask", "carving",
+    "pottery", "vase", "kettle", "jewelry", "necklace", "bangle", "painting", "mural", "rug", "runner",
+]
+MATERIALS = ["Pure Wool", "Copper", "Ringal Bamboo", "Silver", "Natural Dyes", "Brass", "Walnut Wood", "Clay"]
+QUERIES = ["w", "wo", "woo", "wool", "woolen", "woolen s", "woolen sha", "woolen shawl", "pashmna scraf",
+           "copper bottle", "brass lamp", "tapestyr", "cush", "ringal basket", "walnut carving"]
+
+def build_products(count: int, seed: int = 5) -> List[Product]:
+    rng = random.Random(seed)
+    vocabulary = WORDS + [f"{rng.choice(WORDS)[:4]}{i}" for i in range(5000)]
+    return [
+        Product(
+            id=i + 1, name=" ".join(rng.sample(WORDS, 2) + [rng.choice(vocabulary)]).title(),
+            description=" ".join(rng.choice(vocabulary) for _ in range(20)), price=rng.randrange(100, 10000),
+            artisan=f"Artisan {rng.randrange(500)}", image="", category=rng.choice(["Textiles", "Utensils", "Art"]),
+            rating=round(rng.uniform(3, 5), 1), reviews_count=0, in_stock=rng.random() < 0.9,
+            materials=rng.sample(MATERIALS, 2), origin_village=rng.choice(["Almora", "Chamoli", "Munsiyari"]),
+            crafting_time_days=1, eco_friendly=False
+        )
+        for i in range(count)
+    ]
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    return (
+        f"p50 {statistics.median(ordered):.3f} ms, p95 {ordered[int(len(ordered) * 0.95)]:.3f} ms, "
+        f"p99 {ordered[int(len(ordered) * 0.99)]:.3f} ms"
+    )
+
+def main(rounds: int = 20):
+    print("📊 Product search benchmark")
+    print("=" * 96)
+    for count in (5000, 50000):
+        products = build_products(count)
+        start = time.perf_counter()
+        snapshot = CatalogueSnapshot(products, "benchmark")
+        snapshot.search("warm")  # the index is built on first use
+        build_seconds = time.perf_counter() - start
+        for q in QUERIES:
+            snapshot.search(q)
+        print(f"{count:>7} products  index {build_seconds:5.1f} s, {len(snapshot.search_index.postings)} terms")
+        for name, call in (("search", snapshot.search), ("suggest", snapshot.suggest)):
+            timings = []
+            for _ in range(rounds):
+                for q in QUERIES:
+                    start = time.perf_counter()
+                    call(q)
+                    timings.append((time.perf_counter() - start) * 1000)
+            print(f"{'':>17}{name:<9}{percentiles(timings)}")
+
+if __name__ == "__main__":
+    main()
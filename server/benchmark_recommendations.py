@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the product recommendation engine
+Neighbour build time by catalogue size, and related / personalized featured serve latency with live co-views
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./deep_shiva.db")
+
+from app.catalogue import CatalogueSnapshot, Product
+from app.recommendations import NeighbourModel, Recommender
+
+CATEGORIES = ["Textiles", "Art & Paintings", "Home & Decor", "Utensils", "Jewelry", "Spiritual Items", "Food & Beverages"]
+
+def build_products(count: int, seed: int = 7) -> List[Product]:
+    rng = random.Random(seed)
+    villages = [f"Village {i}" for i in range(120)]
+    materials = [f"Material {i}" for i in range(300)]
+    return [
+        Product(
+            id=i + 1, name=f"Product {i}", description="", price=rng.randrange(100, 10000),
+            artisan=f"Artisan {rng.randrange(count // 8 + 1)}", image="", category=rng.choice(CATEGORIES),
+            rating=round(rng.uniform(3, 5), 1), reviews_count=0, in_stock=rng.random() < 0.9,
+            materials=rng.sample(materials, rng.randint(1, 4)), origin_village=rng.choice(villages),
+            crafting_time_days=1, eco_friendly=False
+        )
+        for i in range(count)
+    ]
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    return f"p50 {statistics.median(ordered):.3f} ms, p99 {ordered[int(len(ordered) * 0.99)]:.3f} ms"
+
+async def serve(snapshot: CatalogueSnapshot, sessions: int = 2000, views: int = 20000):
+    recommender = Recommender()
+    await recommender.ensure_fresh(snapshot)
+    rng = random.Random(3)
+    ids = [product.id for product in snapshot.products]
+
+    record, related, featured = [], [], []
+    for _ in range(views):
+        session = f"session-{rng.randrange(sessions)}"
+        product_id = rng.choice(ids)
+        start = time.perf_counter()
+        recommender.record_view(session, product_id)
+        record.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        recommender.related(product_id)
+        related.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        recommender.featured(session)
+        featured.append((time.perf_counter() - start) * 1000)
+    print(f"{'record view':<28}{percentiles(record)}")
+    print(f"{'related products':<28}{percentiles(related)}")
+    print(f"{'personalized featured':<28}{percentiles(featured)}")
+    stats = recommender.get_stats()
+    print(f"co-viewed products: {stats['co_viewed_products']}, cached neighbour lists: {stats['cached_lists']}")
+
+def main():
+    print("📊 Recommendation benchmark")
+    print("=" * 72)
+    print(f"{'products':>10}{'build (s)':>12}")
+    print("-" * 72)
+    snapshot = None
+    for count in (1000, 10000, 50000):
+        snapshot = CatalogueSnapshot(build_products(count), "benchmark")
+        start = time.perf_counter()
+        NeighbourModel(snapshot, 40)
+        print(f"{count:>10}{time.perf_counter() - start:>12.2f}")
+    print("-" * 72)
+    print(f"Serving over {len(snapshot)} products (20k views across 2k sessions)")
+    asyncio.run(serve(snapshot))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark chat retrieval
+Index build time and retrieve() latency by record count (target: p95 under 5 ms at 20k records)
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./deep_shiva.db")
+
+from app.services.retrieval import RetrievalIndex
+
+QUERIES = ["temple timing and entry fee", "nearest hospital", "trek to the lake w17 w99"]
+
+def build_records(count: int, seed: int = 5) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(4000)] + ["temple", "trek", "hospital", "lake", "fee", "timing"]
+    records = []
+    for i in range(count):
+        fact = f"Place {i}: " + " ".join(rng.choice(words) for _ in range(25))
+        records.append({"key": f"tourism_place:{i}", "fact": fact, "text": fact, "signature": str(i), "tokens": 40})
+    return records
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    return (
+        f"p50 {statistics.median(ordered):.3f} ms, p95 {ordered[int(len(ordered) * 0.95)]:.3f} ms, "
+        f"p99 {ordered[int(len(ordered) * 0.99)]:.3f} ms"
+    )
+
+def main(rounds: int = 100):
+    scratch = tempfile.mkdtemp()
+    print("📊 Chat retrieval benchmark")
+    print("=" * 80)
+    for count in (2000, 20000, 100000):
+        records = build_records(count)
+        index = RetrievalIndex(os.path.join(scratch, f"index_{count}"))
+        os.makedirs(index.directory)
+        start = time.perf_counter()
+        index.build(records)
+        build_seconds = time.perf_counter() - start
+        timings = []
+        for query in QUERIES * rounds:
+            start = time.perf_counter()
+            index.retrieve(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{count:>7} records  build {build_seconds:6.2f} s  {percentiles(timings)}")
+
+if __name__ == "__main__":
+    main()
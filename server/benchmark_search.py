@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-text search
+BM25 query latency by index size for English, Hindi and multi-term queries (target: p95 under 10 ms at 10k documents)
+"""
+
+import hashlib
+import os
+import random
+import statistics
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./deep_shiva.db")
+
+from app.search_index import BM25Index
+from app.text_analysis import tokenize
+
+QUERIES = ["temple trek", "shiva lake", "मंदिर", "word17 word99 lake"]
+
+def build_index(count: int, seed: int = 11) -> BM25Index:
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(3000)] + ["temple", "trek", "lake", "shiva", "mandir", "मंदिर"]
+    index = BM25Index()
+    for i in range(count):
+        fields = (f"place {rng.choice(vocabulary)}", "temple", " ".join(rng.choice(vocabulary) for _ in range(60)))
+        index.upsert({
+            "key": ("tourism_place", i), "type": "tourism_place", "id": i, "title": fields[0],
+            "district": None, "category": None, "fields": fields,
+            "signature": hashlib.blake2b("\x1f".join(fields).encode(), digest_size=8).digest(),
+        })
+    return index
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    return (
+        f"p50 {statistics.median(ordered):.3f} ms, p95 {ordered[int(len(ordered) * 0.95)]:.3f} ms, "
+        f"p99 {ordered[int(len(ordered) * 0.99)]:.3f} ms"
+    )
+
+def main(rounds: int = 100):
+    print("📊 Full-text search benchmark")
+    print("=" * 76)
+    for count in (1000, 10000, 50000):
+        start = time.perf_counter()
+        index = build_index(count)
+        build_seconds = time.perf_counter() - start
+        timings = []
+        for query in QUERIES * rounds:
+            start = time.perf_counter()
+            index.search(tokenize(query), limit=10)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{count:>7} docs  build {build_seconds:6.2f} s  {percentiles(timings)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON responses of the largest list endpoints end to end
+Times the real routes through TestClient against the same handlers on stock FastAPI (response_model + jsonable_encoder + json.dumps)
+"""
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRATCH_DIR = tempfile.mkdtemp()
+SNAPSHOT_FILE = os.path.join(SCRATCH_DIR, "products.json")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'bench.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+os.environ["CATALOGUE_SNAPSHOT_FILE"] = SNAPSHOT_FILE
+sys.path.insert(0, SERVER_DIR)
+# The log routes read logs/*.log relative to the working directory
+os.chdir(SCRATCH_DIR)
+
+def write_products(count: int = 100):
+    with open(os.path.join(SERVER_DIR, "app", "data", "products.json"), "r", encoding="utf-8") as handle:
+        base = json.load(handle)
+    products = [
+        {**base[i % len(base)], "id": i + 1, "name": f"{base[i % len(base)]['name']} #{i}", "in_stock": True}
+        for i in range(count)
+    ]
+    with open(SNAPSHOT_FILE, "w", encoding="utf-8") as handle:
+        json.dump(products, handle)
+
+def write_logs(app_count: int = 1000, ai_count: int = 200):
+    os.makedirs("logs", exist_ok=True)
+    now = datetime.now()
+    with open("logs/app.log", "w", encoding="utf-8") as handle:
+        for i in range(app_count):
+            handle.write(json.dumps({
+                "timestamp": (now - timedelta(seconds=i)).isoformat() + "Z",
+                "level": "INFO",
+                "logger": "deep_shiva.middleware",
+                "message": "API call completed: GET /api/v1/culture/products",
+                "request_id": f"{i:08x}",
+                "endpoint": "/api/v1/culture/products",
+                "response_time": 12.5
+            }) + "\n")
+    with open("logs/ai_responses.log", "w", encoding="utf-8") as handle:
+        for i in range(ai_count):
+            handle.write(json.dumps({
+                "timestamp": (now - timedelta(minutes=i)).isoformat() + "Z",
+                "event_type": "ai_response",
+                "user_id": f"user_{i % 17}",
+                "message_id": f"msg_{i:08x}",
+                "user_message": "What is the best time to visit Kedarnath and how do I get there?",
+                "ai_response": "Kedarnath opens from May to November. The trek starts at Gaurikund... " * 8,
+                "model_used": "gemma3:1b",
+                "processing_time_ms": 1234.5 + i,
+                "language": "en",
+                "success": True,
+                "context": None,
+                "context_used": ["pilgrimage", "travel"],
+                "suggested_actions": ["Check crowd status", "View shrine timings"],
+                "related_topics": ["Temple timings", "Travel routes"]
+            }) + "\n")
+
+write_products()
+write_logs()
+
+from fastapi import Depends, FastAPI, Query
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.catalogue import Product, catalogue
+from app.database import SessionLocal
+from app.http_cache import bump_data_version
+from app.models import User
+from app.replicas import get_read_db
+from app.responses import FastJSONResponse
+from app.routers import chat, culture, database, monitoring
+from app.routers.database import _list_page
+from app.routers.monitoring import LogEntry
+from app.schema_version import migrate
+from app.schemas import UserPage, UserRead
+
+ROUTES = {
+    "products": "/api/v1/culture/products?limit=100",
+    "logs": "/api/v1/monitoring/logs?limit=1000",
+    "ai_logs": "/api/v1/chat/ai-logs?limit=200",
+    "users": "/api/v1/database/users?limit=100",
+}
+
+def seed_users(count: int = 100):
+    migrate()
+    with SessionLocal() as db:
+        db.execute(insert(User), [{
+            "username": f"pilgrim{i}",
+            "email": f"pilgrim{i}@example.com",
+            "full_name": f"Pilgrim {i}",
+            "preferred_language": "hi" if i % 3 else "en",
+            "location": "Dehradun",
+            "interests": ["tourism", "culture", "yoga"],
+            "is_active": True
+        } for i in range(count)])
+        db.commit()
+
+def real_app() -> FastAPI:
+    """The app's routers as mounted in main (middleware left out: it costs the same either way)"""
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(culture.router, prefix="/api/v1/culture")
+    app.include_router(monitoring.router, prefix="/api/v1/monitoring")
+    app.include_router(chat.router, prefix="/api/v1/chat")
+    app.include_router(database.router, prefix="/api/v1/database")
+    return app
+
+def _read_json_lines(path: str, limit: int) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as handle:
+        lines = handle.readlines()
+    return [json.loads(line) for line in reversed(lines[-limit * 2:])][:limit]
+
+def stock_app() -> FastAPI:
+    """The same handlers returning plain data, as they did before FastJSONResponse"""
+    app = FastAPI()
+
+    @app.get("/api/v1/culture/products", response_model=List[Product])
+    async def products(limit: int = Query(20)):
+        return (await catalogue.ensure_fresh()).query(limit=limit)
+
+    @app.get("/api/v1/monitoring/logs", response_model=List[LogEntry])
+    async def logs(limit: int = Query(100)):
+        monitoring.logger.info("Log retrieval request", extra={"limit": limit})
+        logs = [LogEntry(**{field: entry.get(field) for field in LogEntry.model_fields}) for entry in _read_json_lines("logs/app.log", limit)]
+        monitoring.logger.info("Log retrieval completed", extra={"logs_returned": len(logs)})
+        return logs
+
+    @app.get("/api/v1/chat/ai-logs")
+    async def ai_logs(limit: int = Query(50)):
+        chat.logger.info("AI logs requested", extra={"limit": limit})
+        logs = _read_json_lines("logs/ai_responses.log", limit)
+        chat.logger.info("AI logs retrieved", extra={"logs_returned": len(logs)})
+        return {"logs": logs, "total_returned": len(logs), "filters_applied": {"limit": limit}, "timestamp": datetime.now().isoformat()}
+
+    @app.get("/api/v1/database/users", response_model=UserPage, response_model_exclude_unset=True)
+    async def users(limit: int = Query(100), db: AsyncSession = Depends(get_read_db)):
+        return await _list_page(db, User, UserRead, "users", limit, None, None)
+
+    return app
+
+def measure(client: TestClient, path: str, repeat: int, before=None) -> float:
+    """Median milliseconds per request"""
+    assert client.get(path).status_code == 200  # warm up
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        response = client.get(path)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return statistics.median(samples)
+
+def main(repeat: int = 200):
+    seed_users()
+    with TestClient(stock_app()) as stock, TestClient(real_app()) as real:
+        cases = [
+            ("/culture/products (100, ETag miss)", "products", lambda: bump_data_version("catalogue")),
+            ("/culture/products (100, ETag cached)", "products", None),
+            ("/monitoring/logs (1000)", "logs", None),
+            ("/chat/ai-logs (200)", "ai_logs", None),
+            ("/database/users (100, response_model)", "users", None),
+        ]
+        print("📊 Serialization benchmark (median ms per request through TestClient)")
+        print("=" * 76)
+        print(f"{'endpoint':<44}{'stock':>9}{'route':>9}{'speedup':>10}")
+        print("-" * 76)
+        for name, route, before in cases:
+            stock_ms = measure(stock, ROUTES[route], repeat, before)
+            route_ms = measure(real, ROUTES[route], repeat, before)
+            print(f"{name:<44}{stock_ms:>9.3f}{route_ms:>9.3f}{stock_ms / route_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -6,21 +6,23 @@ This script creates tables and optionally seeds data.
 
 import os
 import sys
+import time
 import psycopg2
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from app.database import engine, SessionLocal
-from app.models import Base
+from app.schema_version import migrate
 
 def create_tables():
-    """Create all database tables using SQLAlchemy models."""
-    print("Creating database tables...")
+    """Create or upgrade the schema by running the Alembic migrations."""
+    print("Migrating database schema...")
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✓ Tables created successfully!")
+        start = time.perf_counter()
+        revision = migrate()
+        print(f"✓ Schema at revision {revision} ({(time.perf_counter() - start) * 1000:.0f} ms)")
         return True
     except Exception as e:
-        print(f"✗ Error creating tables: {e}")
+        print(f"✗ Error migrating schema: {e}")
         return False
 
 def run_sql_file(filename):
@@ -72,6 +74,24 @@ def main():
     """Main initialization function."""
     load_dotenv()
     
+    # python init_db.py migrate: apply migrations only (run once per deploy, before the workers)
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        sys.exit(0 if create_tables() else 1)
+    
+    # python init_db.py import <table>.csv|.jsonl ... [--replace] [--keep-indexes]
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        from app.bulk_import import main as bulk_import
+        sys.exit(bulk_import(sys.argv[2:]))
+    
+    # python init_db.py rag-index: rebuild the chat retrieval index (running workers reload it)
+    if len(sys.argv) > 1 and sys.argv[1] == "rag-index":
+        import asyncio
+        from app.services.retrieval import rebuild
+        report = asyncio.run(rebuild())
+        print(f"✓ Retrieval index {report['version']}: {report['records']} records "
+              f"({report['embedded']} embedded, {report['reused']} reused) in {report['duration_ms']}ms")
+        sys.exit(0)
+    
     print("=== Deep-Shiva Database Initialization ===\n")
     
     # Check if DATABASE_URL is set
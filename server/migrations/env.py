@@ -0,0 +1,55 @@
+"""
+Alembic environment for Deep-Shiva
+Runs migrations against DATABASE_URL (or an explicit sqlalchemy.url) with the app's models as target
+"""
+
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool
+
+load_dotenv()
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+from app.models import Base  # noqa: E402  (needs DATABASE_URL loaded first)
+
+target_metadata = Base.metadata
+
+def get_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or os.environ["DATABASE_URL"]
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of executing it (alembic upgrade --sql)"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=get_url().startswith("sqlite")
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connectable = config.attributes.get("connection")
+    if connectable is None:
+        connectable = create_engine(get_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() if hasattr(connectable, "connect") else connectable as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
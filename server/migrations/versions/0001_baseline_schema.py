@@ -0,0 +1,232 @@
+"""baseline schema
+
+Tables and indexes as created by Base.metadata.create_all before migrations were
+introduced. Databases created that way can be adopted with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 23:08:24.052284+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('artisans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=False),
+    sa.Column('district', sa.String(length=100), nullable=False),
+    sa.Column('specialization', sa.String(length=100), nullable=False),
+    sa.Column('experience_years', sa.Integer(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('profile_image', sa.String(length=500), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_index('ix_artisans_id', 'artisans', ['id'], unique=False)
+
+    op.create_table('cultural_sites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=False),
+    sa.Column('district', sa.String(length=100), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('historical_significance', sa.Text(), nullable=True),
+    sa.Column('visiting_hours', sa.String(length=100), nullable=True),
+    sa.Column('entry_fee', sa.String(length=50), nullable=True),
+    sa.Column('best_time_to_visit', sa.String(length=100), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cultural_sites_id', 'cultural_sites', ['id'], unique=False)
+
+    op.create_table('dashboard_metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('metric_name', sa.String(length=100), nullable=False),
+    sa.Column('metric_value', sa.Float(), nullable=False),
+    sa.Column('metric_type', sa.String(length=50), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('date_recorded', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('additional_data', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_dashboard_metrics_id', 'dashboard_metrics', ['id'], unique=False)
+
+    op.create_table('emergency_contacts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('district', sa.String(length=100), nullable=False),
+    sa.Column('service_type', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('phone_number', sa.String(length=20), nullable=False),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('is_24x7', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_emergency_contacts_id', 'emergency_contacts', ['id'], unique=False)
+
+    op.create_table('tourism_places',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=False),
+    sa.Column('district', sa.String(length=100), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('altitude', sa.Integer(), nullable=True),
+    sa.Column('best_time_to_visit', sa.String(length=100), nullable=True),
+    sa.Column('activities', sa.JSON(), nullable=True),
+    sa.Column('accommodation_options', sa.JSON(), nullable=True),
+    sa.Column('transportation', sa.Text(), nullable=True),
+    sa.Column('entry_fee', sa.String(length=50), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('weather_info', sa.JSON(), nullable=True),
+    sa.Column('crowd_level', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tourism_places_id', 'tourism_places', ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('preferred_language', sa.String(length=10), nullable=True),
+    sa.Column('location', sa.String(length=100), nullable=True),
+    sa.Column('interests', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    op.create_table('yoga_poses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('sanskrit_name', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('difficulty_level', sa.String(length=20), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('benefits', sa.JSON(), nullable=True),
+    sa.Column('instructions', sa.JSON(), nullable=True),
+    sa.Column('precautions', sa.Text(), nullable=True),
+    sa.Column('duration', sa.String(length=50), nullable=True),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_yoga_poses_id', 'yoga_poses', ['id'], unique=False)
+
+    op.create_table('artisan_products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('artisan_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('materials_used', sa.Text(), nullable=True),
+    sa.Column('dimensions', sa.String(length=100), nullable=True),
+    sa.Column('weight', sa.String(length=50), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('availability_status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['artisan_id'], ['artisans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_artisan_products_id', 'artisan_products', ['id'], unique=False)
+
+    op.create_table('chats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=True),
+    sa.Column('chat_type', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chats_id', 'chats', ['id'], unique=False)
+
+    op.create_table('chat_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('chat_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('response', sa.Text(), nullable=True),
+    sa.Column('message_type', sa.String(length=20), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['chat_id'], ['chats.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chat_messages_id', 'chat_messages', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_chat_messages_id', table_name='chat_messages')
+
+    op.drop_table('chat_messages')
+    op.drop_index('ix_chats_id', table_name='chats')
+
+    op.drop_table('chats')
+    op.drop_index('ix_artisan_products_id', table_name='artisan_products')
+
+    op.drop_table('artisan_products')
+    op.drop_index('ix_yoga_poses_id', table_name='yoga_poses')
+
+    op.drop_table('yoga_poses')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+
+    op.drop_table('users')
+    op.drop_index('ix_tourism_places_id', table_name='tourism_places')
+
+    op.drop_table('tourism_places')
+    op.drop_index('ix_emergency_contacts_id', table_name='emergency_contacts')
+
+    op.drop_table('emergency_contacts')
+    op.drop_index('ix_dashboard_metrics_id', table_name='dashboard_metrics')
+
+    op.drop_table('dashboard_metrics')
+    op.drop_index('ix_cultural_sites_id', table_name='cultural_sites')
+
+    op.drop_table('cultural_sites')
+    op.drop_index('ix_artisans_id', table_name='artisans')
+
+    op.drop_table('artisans')
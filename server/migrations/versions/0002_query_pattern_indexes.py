@@ -0,0 +1,69 @@
+"""query pattern indexes
+
+(created_at, id) keyset indexes for the paginated list endpoints (partial over
+active rows where the list is filtered), composite
+indexes for the grouped/filtered dashboard counts, foreign-key lookups used when
+relations are embedded, and newest-first / per-chat indexes on chat_messages.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 23:08:55.211044+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+ACTIVE_ROWS = {
+    "postgresql_where": sa.text("is_active = true"),
+    "sqlite_where": sa.text("is_active = 1"),
+}
+
+# Filtered list tables get a partial (created_at, id) index
+KEYSET_TABLES = ["cultural_sites", "artisans", "artisan_products", "tourism_places"]
+
+def upgrade():
+    # Databases created by create_all shortly before migrations existed already have full
+    # (created_at, id) indexes; the baseline does not
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"], if_not_exists=True)
+    for table in KEYSET_TABLES:
+        op.drop_index(f"ix_{table}_created_at_id", table_name=table, if_exists=True)
+        op.create_index(f"ix_{table}_active_created_at_id", table, ["created_at", "id"], **ACTIVE_ROWS)
+
+    op.create_index("ix_cultural_sites_category_active", "cultural_sites", ["category", "is_active"])
+    op.create_index("ix_tourism_places_category_active", "tourism_places", ["category", "is_active"])
+    op.create_index("ix_artisan_products_category_active", "artisan_products", ["category", "is_active"])
+    op.create_index("ix_artisan_products_active_artisan_id", "artisan_products", ["artisan_id"], **ACTIVE_ROWS)
+    op.create_index("ix_artisans_active_verified", "artisans", ["is_verified"], **ACTIVE_ROWS)
+    op.create_index("ix_emergency_contacts_district_service_type", "emergency_contacts", ["district", "service_type"])
+    op.create_index("ix_chats_user_id", "chats", ["user_id"])
+
+    # chat_messages is the largest table; build without blocking writes on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_messages_created_at_desc", "chat_messages", [sa.text("created_at DESC")],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_chat_messages_chat_id_created_at", "chat_messages", ["chat_id", "created_at"],
+            postgresql_concurrently=True
+        )
+
+def downgrade():
+    op.drop_index("ix_chat_messages_chat_id_created_at", table_name="chat_messages")
+    op.drop_index("ix_chat_messages_created_at_desc", table_name="chat_messages")
+    op.drop_index("ix_chats_user_id", table_name="chats")
+    op.drop_index("ix_emergency_contacts_district_service_type", table_name="emergency_contacts")
+    op.drop_index("ix_artisans_active_verified", table_name="artisans")
+    op.drop_index("ix_artisan_products_active_artisan_id", table_name="artisan_products")
+    op.drop_index("ix_artisan_products_category_active", table_name="artisan_products")
+    op.drop_index("ix_tourism_places_category_active", table_name="tourism_places")
+    op.drop_index("ix_cultural_sites_category_active", table_name="cultural_sites")
+
+    for table in KEYSET_TABLES:
+        op.drop_index(f"ix_{table}_active_created_at_id", table_name=table)
+    op.drop_index("ix_users_created_at_id", table_name="users")
@@ -0,0 +1,123 @@
+"""partition chat_messages by month
+
+Postgres: chat_messages becomes a table range-partitioned on created_at with one
+partition per month (from the oldest existing row up to three months ahead). The
+partition key has to be part of the primary key, so the key becomes (id, created_at);
+ids still come from the original sequence and stay unique. Existing rows are copied
+over. A DEFAULT partition takes rows for months that have no partition yet, so inserts
+never fail while maintenance is off. New months are pre-created by app.partitions
+(moving any rows out of the DEFAULT partition) and expired ones archived there.
+
+SQLite keeps a plain table; only created_at becomes NOT NULL.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 23:40:00.000000+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, chat_id, user_id, message, response, message_type, language, created_at"
+
+def _create_indexes():
+    op.create_index("ix_chat_messages_id", "chat_messages", ["id"])
+    op.create_index("ix_chat_messages_created_at_desc", "chat_messages", [sa.text("created_at DESC")])
+    op.create_index("ix_chat_messages_chat_id_created_at", "chat_messages", ["chat_id", "created_at"])
+
+def _drop_indexes(table):
+    op.drop_index("ix_chat_messages_chat_id_created_at", table_name=table)
+    op.drop_index("ix_chat_messages_created_at_desc", table_name=table)
+    op.drop_index("ix_chat_messages_id", table_name=table)
+
+def upgrade():
+    if op.get_context().dialect.name != "postgresql":
+        with op.batch_alter_table("chat_messages") as batch_op:
+            batch_op.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=False)
+        # The batch rebuild recreates expression indexes without their DESC
+        op.drop_index("ix_chat_messages_created_at_desc", table_name="chat_messages")
+        op.create_index("ix_chat_messages_created_at_desc", "chat_messages", [sa.text("created_at DESC")])
+        return
+
+    _drop_indexes("chat_messages")
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_unpartitioned")
+    op.execute("ALTER INDEX chat_messages_pkey RENAME TO chat_messages_unpartitioned_pkey")
+
+    op.execute("""
+        CREATE TABLE chat_messages (
+            id INTEGER NOT NULL DEFAULT nextval('chat_messages_id_seq'),
+            chat_id INTEGER NOT NULL REFERENCES chats (id),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            message TEXT NOT NULL,
+            response TEXT,
+            message_type VARCHAR(20),
+            language VARCHAR(10),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY chat_messages.id")
+
+    op.execute("""
+        DO $$
+        DECLARE
+            bucket date;
+            last_bucket date := (date_trunc('month', now()) + interval '3 months')::date;
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(created_at), now()))::date
+              INTO bucket FROM chat_messages_unpartitioned;
+            WHILE bucket <= last_bucket LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF chat_messages FOR VALUES FROM (%L) TO (%L)',
+                    'chat_messages_p' || to_char(bucket, 'YYYYMM'),
+                    bucket,
+                    (bucket + interval '1 month')::date
+                );
+                bucket := (bucket + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+
+    op.execute(f"""
+        INSERT INTO chat_messages ({COLUMNS})
+        SELECT id, chat_id, user_id, message, response, message_type, language, coalesce(created_at, now())
+        FROM chat_messages_unpartitioned
+    """)
+    op.execute("DROP TABLE chat_messages_unpartitioned")
+
+    # Defined on the parent, so every partition (current and future) gets them
+    _create_indexes()
+
+def downgrade():
+    if op.get_context().dialect.name != "postgresql":
+        with op.batch_alter_table("chat_messages") as batch_op:
+            batch_op.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=True)
+        op.drop_index("ix_chat_messages_created_at_desc", table_name="chat_messages")
+        op.create_index("ix_chat_messages_created_at_desc", "chat_messages", [sa.text("created_at DESC")])
+        return
+
+    _drop_indexes("chat_messages")
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_partitioned")
+    op.execute("ALTER INDEX chat_messages_pkey RENAME TO chat_messages_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE chat_messages (
+            id INTEGER NOT NULL DEFAULT nextval('chat_messages_id_seq') PRIMARY KEY,
+            chat_id INTEGER NOT NULL REFERENCES chats (id),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            message TEXT NOT NULL,
+            response TEXT,
+            message_type VARCHAR(20),
+            language VARCHAR(10),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY chat_messages.id")
+    op.execute(f"INSERT INTO chat_messages ({COLUMNS}) SELECT {COLUMNS} FROM chat_messages_partitioned")
+    op.execute("DROP TABLE chat_messages_partitioned")
+    _create_indexes()
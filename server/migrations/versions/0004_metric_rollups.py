@@ -0,0 +1,38 @@
+"""metric rollups
+
+Time-series table for the dashboard: one row per (resolution, metric, bucket,
+dimension) holding count/sum/min/max, written by app.metrics_rollup as per-minute
+upserts and downsampled into hour and day rows.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:20:00.000000+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('metric_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resolution', sa.String(length=10), nullable=False),
+    sa.Column('metric_name', sa.String(length=100), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('dimension', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('value_sum', sa.Float(), nullable=False),
+    sa.Column('value_min', sa.Float(), nullable=True),
+    sa.Column('value_max', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('resolution', 'metric_name', 'bucket_start', 'dimension', name='uq_metric_rollups_bucket')
+    )
+    op.create_index('ix_metric_rollups_resolution_bucket_start', 'metric_rollups', ['resolution', 'bucket_start'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_metric_rollups_resolution_bucket_start', table_name='metric_rollups')
+    op.drop_table('metric_rollups')
@@ -0,0 +1,59 @@
+"""search vectors
+
+Generated tsvector columns with GIN indexes for /api/v1/search on Postgres:
+names weigh A, category/district B, location C and long text D, indexed with
+both the 'simple' (exact, Hindi) and 'english' (stemmed) configurations.
+SQLite has no tsvector; there the API uses its in-memory BM25 index.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 01:10:00.000000+00:00
+"""
+
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# table -> [(weight, expression)]
+SEARCH_FIELDS = {
+    'cultural_sites': [
+        ('A', 'name'), ('B', 'category'), ('B', 'district'), ('C', 'location'),
+        ('D', 'description'), ('D', 'historical_significance'),
+    ],
+    'tourism_places': [
+        ('A', 'name'), ('B', 'category'), ('B', 'district'), ('C', 'location'),
+        ('D', 'description'), ('D', 'activities::text'),
+    ],
+    'artisans': [
+        ('A', 'name'), ('B', 'specialization'), ('B', 'district'), ('C', 'location'),
+        ('D', 'description'),
+    ],
+}
+
+def _vector(fields):
+    parts = [
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce({expression}, '')), '{weight}')"
+        for weight, expression in fields
+        for config in ('simple', 'english')
+    ]
+    return ' || '.join(parts)
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, fields in SEARCH_FIELDS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({_vector(fields)}) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in SEARCH_FIELDS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,26 @@
+"""product catalogue fields
+
+Columns the culture product catalogue serves that artisan_products did not store:
+whether a product is eco-friendly (a browse filter) and its crafting time.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 02:05:00.000000+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('artisan_products', sa.Column('eco_friendly', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('artisan_products', sa.Column('crafting_time_days', sa.Integer(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('artisan_products') as batch_op:
+        batch_op.drop_column('crafting_time_days')
+        batch_op.drop_column('eco_friendly')
@@ -0,0 +1,59 @@
+"""product reviews
+
+Reviews written behind by app.reviews and the running rating aggregates (count,
+sum and a 1-5 star histogram per product and per artisan) that the catalogue reads
+instead of computing AVG() over reviews.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 03:10:00.000000+00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('product_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('review_uid', sa.String(length=32), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('artisan_name', sa.String(length=100), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.Text(), nullable=False),
+    sa.Column('reviewer_name', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('moderation_reason', sa.String(length=200), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('moderated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('review_uid')
+    )
+    op.create_index('ix_product_reviews_product_status_created_at', 'product_reviews', ['product_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_product_reviews_status_created_at', 'product_reviews', ['status', 'created_at'], unique=False)
+    op.create_table('rating_aggregates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=20), nullable=False),
+    sa.Column('subject', sa.String(length=100), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('stars_1', sa.Integer(), nullable=False),
+    sa.Column('stars_2', sa.Integer(), nullable=False),
+    sa.Column('stars_3', sa.Integer(), nullable=False),
+    sa.Column('stars_4', sa.Integer(), nullable=False),
+    sa.Column('stars_5', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'subject', name='uq_rating_aggregates_subject')
+    )
+
+def downgrade():
+    op.drop_table('rating_aggregates')
+    op.drop_index('ix_product_reviews_status_created_at', table_name='product_reviews')
+    op.drop_index('ix_product_reviews_product_status_created_at', table_name='product_reviews')
+    op.drop_table('product_reviews')
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for response compression
+Checks level mapping, Accept-Encoding negotiation, the size threshold with chunked bodies, SSE flushing and Vary
+"""
+
+import asyncio
+import gzip
+import zlib
+
+from app.compression import (
+    AVAILABLE_ENCODINGS, CompressionMiddleware, CompressionStats, codec_level, negotiate_encoding
+)
+
+def _app(chunks, content_type="application/json", status=200):
+    """ASGI app sending chunks as one streamed body"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", content_type.encode())]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+def _call(app, accept_encoding="gzip", minimum_size=500):
+    """Run the middleware and return (start message, body messages)"""
+    stats = CompressionStats()
+    middleware = CompressionMiddleware(app, minimum_size=minimum_size, stats=stats)
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/api/v1/culture/products",
+        "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    }
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0], sent[1:], stats
+
+def _headers(start):
+    return {key.decode().lower(): value.decode() for key, value in start["headers"]}
+
+def test_codec_levels():
+    """The 1-9 scale spans each codec's own range"""
+    assert [codec_level("gzip", level) for level in (1, 6, 9)] == [1, 6, 9]
+    assert [codec_level("br", level) for level in (1, 4, 9)] == [1, 5, 11]
+    assert [codec_level("zstd", level) for level in (1, 4, 9)] == [1, 8, 19]
+    assert codec_level("br", 0) == 1 and codec_level("zstd", 42) == 19
+    print("✅ Levels mapped onto brotli and zstd ranges")
+
+def test_negotiation():
+    """Preferred available codec the client accepts with q > 0"""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("*") == AVAILABLE_ENCODINGS[0]
+    assert negotiate_encoding("br;q=0, zstd;q=0, *;q=0.5") == "gzip"
+    start, bodies, _ = _call(_app([b"x" * 1000]), accept_encoding="")
+    assert "content-encoding" not in _headers(start) and bodies[0]["body"] == b"x" * 1000
+    print("✅ Accept-Encoding negotiation")
+
+def test_size_threshold():
+    """Small bodies pass through; chunked bodies are buffered until the threshold is known"""
+    start, bodies, _ = _call(_app([b"[1,", b"2]"]))
+    assert "content-encoding" not in _headers(start) and b"".join(b["body"] for b in bodies) == b"[1,2]"
+
+    payload = [b'{"items": [', b"1," * 400, b"2]}"]
+    start, bodies, stats = _call(_app(payload))
+    headers = _headers(start)
+    assert headers["content-encoding"] == "gzip" and headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in headers
+    assert gzip.decompress(b"".join(b["body"] for b in bodies)) == b"".join(payload)
+    assert stats.snapshot()["streamed_responses"] == 1
+
+    # A whole body in one message gets an exact Content-Length
+    start, bodies, stats = _call(_app([b"1," * 400]))
+    headers = _headers(start)
+    assert int(headers["content-length"]) == len(bodies[0]["body"]) < 800
+    assert stats.snapshot()["responses_by_encoding"] == {"gzip": 1}
+
+    # Images and already-encoded bodies are left alone
+    start, _, _ = _call(_app([b"\x89PNG" * 500], content_type="image/png"))
+    assert "content-encoding" not in _headers(start)
+    print("✅ Size threshold, buffering and Vary")
+
+def test_sse_flushes_each_event():
+    """Each SSE event is decodable as soon as it is sent"""
+    events = [b"data: first\n\n", b"data: second\n\n", b"data: done\n\n"]
+    start, bodies, _ = _call(_app(events, content_type="text/event-stream"))
+    assert _headers(start)["content-encoding"] == "gzip"
+    decoder = zlib.decompressobj(31)
+    # Z_SYNC_FLUSH: every chunk decodes to exactly the event it carried
+    assert [decoder.decompress(body["body"]) for body in bodies] == events
+    assert not bodies[-1]["more_body"]
+    print("✅ SSE events flushed chunk by chunk")
+
+if __name__ == "__main__":
+    print("🗜️  Testing response compression...")
+    test_codec_levels()
+    test_negotiation()
+    test_size_threshold()
+    test_sse_flushes_each_event()
+    print("\n🎉 All compression tests passed!")
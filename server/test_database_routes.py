@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the database router
+Migrates a scratch SQLite database and smoke-tests the async endpoints, DatabaseUtils and the projected list schemas against it
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import List, Tuple
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from app.database import SessionLocal
+from app.models import Artisan, ArtisanProduct, Chat, ChatMessage, User
+from app.routers import database
+from app.schema_version import migrate
+from app.schemas import ArtisanProductRead, ChatRead, UserWithChats, projection
+from db_utils import DatabaseUtils
+
+USERNAMES = [f"routes-pilgrim{i}" for i in range(3)]
+ARTISAN_NAME = "Kumaoni Weaves (routes test)"
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(database.router, prefix="/api/v1/database")
+    return TestClient(app)
+
+def _count(model) -> int:
+    with SessionLocal() as db:
+        return db.execute(select(func.count()).select_from(model)).scalar_one()
+
+async def _seed_users() -> List[int]:
+    async with DatabaseUtils() as utils:
+        before = (await utils.get_user_stats())["total_users"]
+        users = [
+            await utils.create_sample_user(name, f"{name}@example.com", name.title())
+            for name in USERNAMES
+        ]
+        assert (await utils.get_user_stats())["total_users"] == before + len(USERNAMES)
+        return [user.id for user in users]
+
+def _seed() -> Tuple[List[int], int]:
+    """Seed rows of our own (other test modules may share the scratch database)"""
+    migrate()
+    user_ids = asyncio.run(_seed_users())
+    with SessionLocal() as db:
+        chat = Chat(user_id=user_ids[0], chat_type="general", is_active=True)
+        artisan = Artisan(
+            name=ARTISAN_NAME, email="weaves@example.com", phone="+91 99999 00000",
+            location="Almora", district="Almora", specialization="textiles", is_active=True
+        )
+        db.add_all([chat, artisan])
+        db.flush()
+        db.execute(insert(ChatMessage), [
+            {"chat_id": chat.id, "user_id": user_ids[0], "message": f"namaste {i}", "message_type": "user", "language": "hi"}
+            for i in range(4)
+        ])
+        db.execute(insert(ArtisanProduct), [
+            {"artisan_id": artisan.id, "name": "Pashmina shawl", "category": "textiles", "description": "Hand woven",
+             "dimensions": "200x70 cm", "is_active": True},
+            {"artisan_id": artisan.id, "name": "Retired stole", "category": "textiles", "is_active": False},
+        ])
+        db.commit()
+        return user_ids, chat.id
+
+USER_IDS, CHAT_ID = _seed()
+
+def test_database_utils():
+    """DatabaseUtils reads through the async engine"""
+    async def check():
+        async with DatabaseUtils() as utils:
+            assert (await utils.get_chat_stats())["total_messages"] == _count(ChatMessage)
+            activity = await utils.get_recent_activity(limit=2)
+            assert len(activity) == 2 and {"message", "user_id", "created_at"} <= set(activity[0])
+    asyncio.run(check())
+    print("✅ DatabaseUtils on the async engine")
+
+def test_endpoints():
+    """Health, overview, recent activity and list endpoints answer from the async session"""
+    with _client() as client:
+        health = client.get("/api/v1/database/health").json()
+        assert health["status"] == "healthy" and health["sample_count"] == _count(User)
+
+        overview = client.get("/api/v1/database/stats/overview")
+        assert overview.status_code == 200 and "Age" in overview.headers
+        assert overview.json()["users"]["total"] >= len(USERNAMES)
+
+        activity = client.get("/api/v1/database/stats/recent-activity?limit=3").json()["recent_activity"]
+        assert len(activity) == 3
+
+        users = client.get("/api/v1/database/users?limit=500").json()["users"]
+        assert [user["username"] for user in users if user["username"] in USERNAMES] == USERNAMES
+        for path in ("cultural-sites", "artisans", "artisan-products", "tourism-places"):
+            response = client.get(f"/api/v1/database/{path}?limit=1")
+            assert response.status_code == 200 and "has_more" in response.json(), path
+    print("✅ Database endpoints")
+
+def test_projection():
+    """Only schema columns are selected; relation fields are not columns"""
+    assert [column.key for column in projection(User, UserWithChats)] == [
+        "id", "username", "email", "full_name", "preferred_language", "location", "interests", "created_at", "is_active"
+    ]
+    assert "dimensions" not in {column.key for column in projection(ArtisanProduct, ArtisanProductRead)}
+    print("✅ Schema projections")
+
+def test_include_relations():
+    """include embeds relations loaded per page; responses carry only schema fields"""
+    with _client() as client:
+        users = {user["id"]: user for user in client.get("/api/v1/database/users?include=chats&limit=500").json()["users"]}
+        assert CHAT_ID in [chat["id"] for chat in users[USER_IDS[0]]["chats"]]
+        assert all(chat["user_id"] == user["id"] for user in users.values() for chat in user["chats"])
+        assert set(users[USER_IDS[0]]["chats"][0]) == set(ChatRead.model_fields)
+        assert "chats" not in client.get("/api/v1/database/users").json()["users"][0]
+
+        artisans = client.get("/api/v1/database/artisans?include=products&limit=500").json()["artisans"]
+        artisan = next(artisan for artisan in artisans if artisan["name"] == ARTISAN_NAME)
+        assert "email" not in artisan and "phone" not in artisan
+        assert [product["name"] for product in artisan["products"]] == ["Pashmina shawl"]
+        assert not {"description", "dimensions"} & set(artisan["products"][0])
+
+        response = client.get("/api/v1/database/users?include=chats,orders")
+        assert response.status_code == 400 and "orders" in response.json()["detail"]
+    print("✅ Included relations and unknown includes")
+
+if __name__ == "__main__":
+    print("🗄️  Testing database router...")
+    test_database_utils()
+    test_endpoints()
+    test_projection()
+    test_include_relations()
+    print("\n🎉 All database router tests passed!")
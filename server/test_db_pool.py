@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for connection pool configuration and metrics
+Builds instrumented pools on a scratch SQLite file and checks the counters, wait histogram and health-detailed report
+"""
+
+import os
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.config import settings
+from app.db_pool import PoolMetrics, WAIT_BUCKETS_MS, attach_pool_metrics, pool_options
+from app.routers import monitoring
+
+def test_pool_options():
+    """File databases get the configured, instrumented QueuePool; in-memory SQLite keeps its own"""
+    url = f"sqlite:///{os.path.join(SCRATCH_DIR, 'pool.db')}"
+    metrics = PoolMetrics("test")
+    options = pool_options(url, settings, metrics)
+    assert options["pool_size"] == settings.db_pool_size and options["max_overflow"] == settings.db_max_overflow
+    assert options["poolclass"].__name__ == "InstrumentedQueuePool"
+    assert metrics.max_overflow == settings.db_max_overflow
+    assert "poolclass" not in pool_options("sqlite://", settings, PoolMetrics("memory"))
+    print("✅ Pool options from settings")
+
+def test_pool_metrics():
+    """Checkouts, check-ins and waits are counted; timeouts are recorded"""
+    url = f"sqlite:///{os.path.join(SCRATCH_DIR, 'metrics.db')}"
+    metrics = PoolMetrics("test")
+    options = {**pool_options(url, settings, metrics), "pool_size": 1, "max_overflow": 0, "pool_timeout": 0.05}
+    metrics.max_overflow = 0
+    engine = create_engine(url, **options)
+    attach_pool_metrics(engine, metrics)
+
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    held = engine.connect()
+    try:
+        engine.connect()
+        raise AssertionError("second checkout should time out")
+    except exc.TimeoutError:
+        pass
+    held.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["pool_class"] == "InstrumentedQueuePool"
+    assert snapshot["connects"] == 1 and snapshot["checkouts"] == 4 and snapshot["checkins"] == 4
+    assert snapshot["checkout_timeouts"] == 1 and snapshot["checked_out"] == 0
+    assert (snapshot["size"], snapshot["max_overflow"]) == (1, 0)
+    assert snapshot["wait_time_ms"]["count"] == 5
+    assert sum(snapshot["wait_time_ms"]["histogram"].values()) - snapshot["wait_time_ms"]["histogram"]["gt_last"] == 5
+    assert snapshot["wait_time_ms"]["max"] >= 50 and snapshot["wait_time_ms"]["p99"] in WAIT_BUCKETS_MS
+    engine.dispose()
+    print("✅ Pool counters and wait histogram")
+
+def test_health_detailed_reports_pools():
+    """The monitoring endpoint lists every engine's pool"""
+    app = FastAPI()
+    app.include_router(monitoring.router, prefix="/api/v1/monitoring")
+    with TestClient(app) as client:
+        response = client.get("/api/v1/monitoring/health-detailed")
+    assert response.status_code == 200
+    pools = response.json()["database_pools"]
+    assert {"sync", "async"} <= set(pools)
+    assert pools["sync"]["max_overflow"] == settings.db_max_overflow
+    print("✅ Pools reported by health-detailed")
+
+if __name__ == "__main__":
+    print("🔌 Testing connection pools...")
+    test_pool_options()
+    test_pool_metrics()
+    test_health_detailed_reports_pools()
+    print("\n🎉 All connection pool tests passed!")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the dashboard overview
+Checks the single-query overview against plain COUNT queries and the snapshot cache's background refresh
+"""
+
+import asyncio
+import gc
+import os
+import tempfile
+import time
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from sqlalchemy import func, insert, select
+
+from app.database import AsyncSessionLocal, SessionLocal
+from app.db_stats import OverviewSnapshotCache, fetch_overview
+from app.models import (
+    Artisan, ArtisanProduct, Chat, ChatMessage, CulturalSite,
+    EmergencyContact, TourismPlace, User, YogaPose
+)
+from app.schema_version import migrate
+
+def _seed():
+    migrate()
+    place = {"location": "Garhwal", "district": "Chamoli"}
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"username": f"u{i}", "email": f"u{i}@example.com", "is_active": i % 4 != 0} for i in range(9)
+        ])
+        db.execute(insert(Chat), [
+            {"user_id": 1 + i % 9, "chat_type": ["general", "tourism", None][i % 3], "is_active": i % 5 != 0}
+            for i in range(11)
+        ])
+        db.execute(insert(ChatMessage), [
+            {"chat_id": 1 + i % 11, "user_id": 1, "message": "hello", "message_type": "user"} for i in range(23)
+        ])
+        db.execute(insert(CulturalSite), [
+            {"name": f"site{i}", "category": "temple", "is_active": i != 2, **place} for i in range(4)
+        ])
+        db.execute(insert(Artisan), [
+            {"name": f"a{i}", "specialization": "woodwork", "is_active": i != 0, "is_verified": i % 2 == 1, **place}
+            for i in range(6)
+        ])
+        db.execute(insert(ArtisanProduct), [
+            {"artisan_id": 1 + i % 6, "name": f"p{i}", "category": "woodwork", "is_active": i % 3 != 0} for i in range(10)
+        ])
+        db.execute(insert(TourismPlace), [
+            {"name": f"t{i}", "category": ["hill_station", "trek"][i % 2], "is_active": i != 4, **place} for i in range(7)
+        ])
+        db.execute(insert(YogaPose), [
+            {"name": f"y{i}", "difficulty_level": "beginner", "category": "standing", "is_active": i != 1} for i in range(3)
+        ])
+        db.execute(insert(EmergencyContact), [
+            {"district": "Chamoli", "service_type": "police", "name": f"e{i}", "phone_number": "100", "is_active": i != 0}
+            for i in range(5)
+        ])
+        db.commit()
+
+_seed()
+
+def _count(db, model, *criteria) -> int:
+    return db.execute(select(func.count()).select_from(model).where(*criteria)).scalar_one()
+
+def _grouped(db, column, *criteria) -> dict:
+    return dict(db.execute(select(column, func.count()).where(*criteria).group_by(column)).all())
+
+def test_overview_matches_counts():
+    """The UNION ALL overview gives the same numbers as one COUNT per figure"""
+    async def load():
+        async with AsyncSessionLocal() as db:
+            return await fetch_overview(db)
+    overview = asyncio.run(load())
+
+    with SessionLocal() as db:
+        users = _count(db, User)
+        active_users = _count(db, User, User.is_active == True)
+        artisans = _count(db, Artisan, Artisan.is_active == True)
+        verified = _count(db, Artisan, Artisan.is_active == True, Artisan.is_verified == True)
+        expected = {
+            "users": {"total": users, "active": active_users, "inactive": users - active_users},
+            "chats": {
+                "total": _count(db, Chat),
+                "active": _count(db, Chat, Chat.is_active == True),
+                "messages": _count(db, ChatMessage),
+                "types": _grouped(db, Chat.chat_type)
+            },
+            "culture": {
+                "sites": _count(db, CulturalSite, CulturalSite.is_active == True),
+                "artisans": {"total": artisans, "verified": verified, "pending": artisans - verified},
+                "products": _count(db, ArtisanProduct, ArtisanProduct.is_active == True)
+            },
+            "tourism": {
+                "places": _count(db, TourismPlace, TourismPlace.is_active == True),
+                "categories": _grouped(db, TourismPlace.category, TourismPlace.is_active == True)
+            },
+            "yoga": {"poses": _count(db, YogaPose, YogaPose.is_active == True)},
+            "emergency": {"contacts": _count(db, EmergencyContact, EmergencyContact.is_active == True)}
+        }
+    assert overview == expected, overview
+    print("✅ Overview matches plain COUNT queries")
+
+def test_stale_refresh_failure_is_retrieved():
+    """A failed background refresh is logged and counted, and the stale snapshot keeps being served"""
+    unretrieved = []
+
+    async def failing_loader(db):
+        raise RuntimeError("replica down")
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        cache = OverviewSnapshotCache(loader=failing_loader, session_factory=AsyncSessionLocal, ttl=0, max_stale=60)
+        cache._snapshot = (time.monotonic(), {"users": {"total": 1}})
+        data, _ = await cache.get()
+        assert data == {"users": {"total": 1}}
+        # Nobody awaits the refresh: drop it once done and let the task be collected
+        while not cache._task.done():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        cache._task = None
+        gc.collect()
+        return cache
+    cache = asyncio.run(run())
+    gc.collect()
+    assert cache.refresh_failures == 1 and cache.stale_hits == 1
+    assert unretrieved == [], unretrieved
+    print("✅ Background refresh failures are retrieved and logged")
+
+if __name__ == "__main__":
+    print("📊 Testing dashboard overview...")
+    test_overview_matches_counts()
+    test_stale_refresh_failure_is_retrieved()
+    print("\n🎉 All dashboard overview tests passed!")
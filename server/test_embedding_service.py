@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedding service
+Checks content-hash deduplication, micro-batching, persistence across instances and failure handling with a counting embed function
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+import numpy as np
+
+from app.services.embedding_service import EmbeddingService, EmbeddingStore, content_key
+
+DIM = 8
+
+class CountingEmbedder:
+    """Deterministic vectors per text; records every upstream batch"""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def __call__(self, texts):
+        if self.fail:
+            raise ConnectionError("ollama unavailable")
+        self.batches.append(list(texts))
+        return [
+            np.frombuffer(hashlib.sha256(text.encode()).digest()[:DIM], dtype=np.uint8).astype(np.float32) / 255
+            for text in texts
+        ]
+
+def _service(directory, embedder, **kwargs):
+    return EmbeddingService("test-model", directory, embed_fn=embedder, batch_window_ms=5, **kwargs)
+
+async def _batching_and_dedup():
+    directory = os.path.join(SCRATCH_DIR, "batching")
+    embedder = CountingEmbedder()
+    service = _service(directory, embedder)
+
+    # Concurrent callers with overlapping texts share one upstream call
+    a, b, c = await asyncio.gather(
+        service.embed(["Kedarnath temple", "Badrinath"]),
+        service.embed(["Badrinath", "Valley of Flowers"]),
+        service.embed_one("Kedarnath temple"),
+    )
+    assert len(embedder.batches) == 1
+    assert sorted(embedder.batches[0]) == ["Badrinath", "Kedarnath temple", "Valley of Flowers"]
+    assert np.allclose(a[1], b[0], atol=1e-3) and np.allclose(a[0], c, atol=1e-3)
+    assert service.stats["deduplicated"] == 2
+    print("✅ Concurrent requests batched and deduplicated")
+
+    # Stored vectors are never recomputed, including whitespace variants
+    again = await service.embed(["Kedarnath  temple ", "Badrinath"])
+    assert len(embedder.batches) == 1 and np.allclose(again[0], a[0])
+    assert service.stats["cache_hits"] == 2
+
+    # A new instance (restart or another worker) reads the same store
+    other_embedder = CountingEmbedder()
+    other = _service(directory, other_embedder)
+    vectors = await other.embed(["Valley of Flowers"])
+    assert other_embedder.batches == [] and vectors.shape == (1, DIM)
+    expected = np.asarray(CountingEmbedder()(["Valley of Flowers"])[0])
+    assert np.allclose(vectors[0], expected, atol=1e-3)
+    print("✅ Persisted vectors reused without upstream calls")
+
+    # Large requests are split into max_batch chunks
+    chunked = _service(os.path.join(SCRATCH_DIR, "chunked"), CountingEmbedder(), max_batch=64)
+    result = await chunked.embed([f"place {i}" for i in range(150)])
+    assert result.shape == (150, DIM)
+    assert [len(batch) for batch in chunked.embed_fn.batches] == [64, 64, 22]
+    print("✅ Batches capped at max_batch")
+
+def test_batching_and_dedup():
+    asyncio.run(_batching_and_dedup())
+
+async def _failures_are_not_stored():
+    embedder = CountingEmbedder()
+    service = _service(os.path.join(SCRATCH_DIR, "failures"), embedder)
+    embedder.fail = True
+    try:
+        await service.embed(["Gangotri"])
+        raise AssertionError("expected the upstream error")
+    except ConnectionError:
+        pass
+    assert len(service.store) == 0 and not service._inflight
+
+    embedder.fail = False
+    assert (await service.embed(["Gangotri"])).shape == (1, DIM)
+    assert service.get_stats()["failures"] == 1 and len(service.store) == 1
+    print("✅ Upstream failures propagate and are retried")
+
+def test_failures_are_not_stored():
+    asyncio.run(_failures_are_not_stored())
+
+async def _cancelled_caller():
+    embedder = CountingEmbedder()
+    service = _service(os.path.join(SCRATCH_DIR, "cancelled"), embedder)
+    a = asyncio.create_task(service.embed(["Kedarnath temple", "Badrinath"]))
+    b = asyncio.create_task(service.embed(["Badrinath", "Kedarnath temple"]))
+    c = asyncio.create_task(service.embed_one("Badrinath"))
+    while len(service._inflight) < 2 or service.stats["deduplicated"] < 3:
+        await asyncio.sleep(0.001)
+
+    # a gives up while its texts are still waiting for the batch
+    a.cancel()
+    vectors, single = await asyncio.gather(b, c)
+    assert a.cancelled() and vectors.shape == (2, DIM) and np.allclose(vectors[0], single, atol=1e-3)
+    assert len(embedder.batches) == 1 and not service._inflight
+    print("✅ A cancelled caller leaves shared batches to the others")
+
+def test_cancelled_caller():
+    asyncio.run(_cancelled_caller())
+
+def test_store_shared_between_processes():
+    """Appends by one store instance become visible to another on the next miss"""
+    directory = os.path.join(SCRATCH_DIR, "shared")
+    writer, reader = EmbeddingStore(directory), EmbeddingStore(directory)
+    keys = [content_key("m", text) for text in ("a", "b")]
+    assert writer.put(keys, np.ones((2, DIM), dtype=np.float32)) == 2
+    assert writer.put(keys, np.ones((2, DIM), dtype=np.float32)) == 0
+    found = reader.get(keys)
+    assert set(found) == set(keys) and found[keys[0]].dtype == np.float32
+    assert os.path.getsize(writer.vectors_file) == 2 * DIM * 2  # float16 on disk
+    print("✅ Store shared between instances")
+
+if __name__ == "__main__":
+    print("🧮 Testing embedding service...")
+    test_batching_and_dedup()
+    test_failures_are_not_stored()
+    test_cancelled_caller()
+    test_store_shared_between_processes()
+    print("\n🎉 All embedding service tests passed!")
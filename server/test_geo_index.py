@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the nearest-service geo index
+Checks k-nearest ranking against brute-force haversine and change-driven rebuilds on a scratch SQLite database
+"""
+
+import asyncio
+import math
+import os
+import random
+import tempfile
+import time
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.geo_index import GeoIndex, geo_index
+from app.models import CulturalSite, EmergencyContact, TourismPlace
+from app.routers import tourism
+
+KEDARNATH = (30.7352, 79.0669)
+
+def _haversine(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+def test_nearest_matches_brute_force():
+    """Top-k order and distances equal a full haversine scan"""
+    rng = random.Random(7)
+    points = [
+        {
+            "type": rng.choice(["hospital", "police", "tourism_place"]), "source": "test", "id": i,
+            "name": f"p{i}", "district": "Rudraprayag",
+            "latitude": rng.uniform(28.7, 31.5), "longitude": rng.uniform(77.5, 81.1)
+        }
+        for i in range(5000)
+    ]
+    index = GeoIndex()
+    index.build(points)
+
+    for kind in (None, "hospital"):
+        results = index.nearest(*KEDARNATH, kind=kind, k=10)
+        pool = [p for p in points if kind is None or p["type"] == kind]
+        expected = sorted(pool, key=lambda p: _haversine(*KEDARNATH, p["latitude"], p["longitude"]))[:10]
+        assert [r["id"] for r in results] == [p["id"] for p in expected]
+        assert abs(results[0]["distance_km"] - _haversine(*KEDARNATH, expected[0]["latitude"], expected[0]["longitude"])) < 0.001
+    assert all(r["type"] == "hospital" for r in index.nearest(*KEDARNATH, kind="hospital", k=10))
+
+    within = index.nearest(*KEDARNATH, k=50, max_km=15)
+    assert within and all(r["distance_km"] <= 15 for r in within)
+    assert index.nearest(*KEDARNATH, kind="fire") == []
+    print("✅ k-nearest matches brute-force haversine")
+
+async def _rebuild_on_change():
+    path = os.path.join(SCRATCH_DIR, "geo.db")
+    engine = create_engine(f"sqlite:///{path}")
+    for model in (EmergencyContact, TourismPlace, CulturalSite):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(EmergencyContact.__table__.insert(), [
+            {"district": "Rudraprayag", "service_type": "hospital", "name": "District Hospital",
+             "phone_number": "108", "latitude": 30.2849, "longitude": 78.9812, "is_active": True},
+            {"district": "Dehradun", "service_type": "police", "name": "No coordinates",
+             "phone_number": "112", "latitude": None, "longitude": None, "is_active": True},
+        ])
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    index = GeoIndex(session_factory=async_sessionmaker(bind=async_engine), check_interval=3600)
+    await index.ensure_fresh()
+    assert index.types == ["hospital"]
+    assert index.nearest(*KEDARNATH, kind="hospital", k=1)[0]["name"] == "District Hospital"
+
+    with engine.begin() as conn:
+        conn.execute(EmergencyContact.__table__.insert(), [
+            {"district": "Rudraprayag", "service_type": "hospital", "name": "Kedarnath Base Camp",
+             "phone_number": "108", "latitude": 30.7300, "longitude": 79.0650, "is_active": True},
+        ])
+    index.invalidate()
+    await index.ensure_fresh()
+    await index._task
+    assert index.builds == 2
+    nearest = index.nearest(*KEDARNATH, kind="hospital", k=2)
+    assert [r["name"] for r in nearest] == ["Kedarnath Base Camp", "District Hospital"]
+    print("✅ Index rebuilt after the table changed")
+
+    # Unchanged fingerprint: no rebuild
+    index.invalidate()
+    await index.ensure_fresh()
+    await index._task
+    assert index.builds == 2
+    await async_engine.dispose()
+    engine.dispose()
+
+def test_rebuild_on_change():
+    """New rows show up after the fingerprint check"""
+    asyncio.run(_rebuild_on_change())
+
+def test_nearby_type_validation():
+    """Unsupported types are a 400; a supported type with no rows is an empty list"""
+    geo_index.build([{
+        "type": "hospital", "source": "test", "id": 1, "name": "District Hospital",
+        "district": "Rudraprayag", "latitude": 30.2849, "longitude": 78.9812,
+    }])
+    check_interval = geo_index.check_interval
+    geo_index.check_interval = 3600
+    geo_index._checked_at = time.monotonic()
+    app = FastAPI()
+    app.include_router(tourism.router, prefix="/api/v1/tourism")
+    client = TestClient(app)
+    try:
+        url = "/api/v1/tourism/nearby"
+        params = {"lat": KEDARNATH[0], "lon": KEDARNATH[1]}
+
+        hospital = client.get(url, params={**params, "type": "hospital"})
+        assert hospital.status_code == 200
+        assert [r["name"] for r in hospital.json()["results"]] == ["District Hospital"]
+
+        for kind in ("fire", "cultural_site"):
+            empty = client.get(url, params={**params, "type": kind})
+            assert empty.status_code == 200, empty.text
+            assert empty.json()["results"] == []
+
+        unknown = client.get(url, params={**params, "type": "spaceport"})
+        assert unknown.status_code == 400
+        assert "cultural_site" in unknown.json()["detail"]
+    finally:
+        geo_index.check_interval = check_interval
+        geo_index.partitions = {}
+    print("✅ /nearby validates type against the supported types")
+
+if __name__ == "__main__":
+    print("📍 Testing geo index...")
+    test_nearest_matches_brute_force()
+    test_rebuild_on_change()
+    test_nearby_type_validation()
+    print("\n🎉 All geo index tests passed!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for HTTP caching
+Drives the cached catalogue and pose routes through TestClient and checks ETags, If-None-Match revalidation, Cache-Control and invalidation on catalogue swaps
+"""
+
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.catalogue import catalogue, load_snapshot_file, validate_products
+from app.http_cache import CACHE_POLICIES, bump_data_version, response_cache
+from app.routers import culture, vision
+
+PRODUCTS = validate_products(load_snapshot_file())
+CHECK_INTERVAL = catalogue.check_interval
+ROUTES = ["/api/v1/culture/products", "/api/v1/culture/products/browse", "/api/v1/culture/categories"]
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(culture.router, prefix="/api/v1/culture")
+    app.include_router(vision.router, prefix="/api/v1/vision")
+    return TestClient(app)
+
+def _serve(products):
+    """Serve products from the global catalogue without a database check"""
+    catalogue.swap(products, "test")
+    catalogue.check_interval = 3600
+    catalogue._checked_at = time.monotonic()
+
+def test_etag_and_cache_control():
+    """One ETag per data version and route, with the route's Cache-Control policy"""
+    _serve(PRODUCTS)
+    with _client() as client:
+        for path in ROUTES:
+            first, second = client.get(path), client.get(path)
+            assert first.status_code == second.status_code == 200
+            assert first.headers["etag"] == second.headers["etag"] and first.headers["etag"].startswith('W/"')
+            assert first.content == second.content
+            assert first.headers["cache-control"] == CACHE_POLICIES["catalogue"]
+        filtered = client.get(ROUTES[0], params={"category": "Textiles"})
+        assert filtered.headers["etag"] != client.get(ROUTES[0]).headers["etag"]
+        poses = client.get("/api/v1/vision/poses")
+        assert poses.status_code == 200 and poses.headers["cache-control"] == CACHE_POLICIES["reference"]
+    print("✅ Stable ETags and Cache-Control policies")
+
+def test_if_none_match():
+    """Exact, weak, strong, listed and * validators return an empty 304; others a full 200"""
+    _serve(PRODUCTS)
+    with _client() as client:
+        for path in ROUTES:
+            etag = client.get(path).headers["etag"]
+            opaque = etag[2:]
+            for validator in (etag, opaque, f'"other", {etag}', f'W/"other",{opaque}', "*"):
+                response = client.get(path, headers={"If-None-Match": validator})
+                assert response.status_code == 304, (path, validator)
+                assert response.content == b"" and response.headers["etag"] == etag
+                assert response.headers["cache-control"] == CACHE_POLICIES["catalogue"]
+            response = client.get(path, headers={"If-None-Match": 'W/"other", "stale"'})
+            assert response.status_code == 200 and response.content
+    print("✅ If-None-Match revalidation")
+
+def test_invalidation():
+    """A version bump rebuilds the body; a catalogue swap with new data changes the ETag"""
+    _serve(PRODUCTS)
+    with _client() as client:
+        etag = client.get(ROUTES[0]).headers["etag"]
+        misses = response_cache.get_stats()["misses"]
+        bump_data_version("catalogue")
+        # Rebuilt from the same data: same content hash
+        assert client.get(ROUTES[0]).headers["etag"] == etag
+        assert response_cache.get_stats()["misses"] == misses + 1
+
+        etags = {path: client.get(path).headers["etag"] for path in ROUTES[:2]}
+        repriced = [product.model_copy(update={"price": product.price + 1}) for product in PRODUCTS]
+        _serve(repriced)
+        for path, old in etags.items():
+            response = client.get(path, headers={"If-None-Match": old})
+            assert response.status_code == 200 and response.headers["etag"] != old, path
+            assert response.json()
+    catalogue.check_interval = CHECK_INTERVAL
+    catalogue.invalidate()
+    print("✅ ETags change with the catalogue")
+
+if __name__ == "__main__":
+    print("🏷️  Testing HTTP caching...")
+    test_etag_and_cache_control()
+    test_if_none_match()
+    test_invalidation()
+    print("\n🎉 All HTTP caching tests passed!")
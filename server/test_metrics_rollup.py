@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for dashboard metric rollups
+Flushes collected metrics into a scratch SQLite database and checks the hour/day rollups and range reads
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.metrics_rollup import (
+    LATENCY_BUCKETS_MS, MetricsCollector, MetricsRollup, choose_resolution, fetch_series
+)
+from app.models import MetricRollup
+
+NOW = datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc)
+RETENTION = {"minute": timedelta(hours=2), "hour": timedelta(days=3), "day": None}
+
+def _sessions():
+    path = os.path.join(SCRATCH_DIR, "rollups.db")
+    engine = create_engine(f"sqlite:///{path}")
+    MetricRollup.__table__.create(engine)
+    engine.dispose()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    return async_engine, async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+async def _rollup():
+    async_engine, sessions = _sessions()
+    collector = MetricsCollector()
+    rollup = MetricsRollup(collector, RETENTION, session_factory=sessions)
+
+    # Two flushes into the same minute merge instead of overwriting
+    for latency in (120, 800):
+        collector.observe("llm_latency_ms", latency, buckets=LATENCY_BUCKETS_MS, now=NOW - timedelta(minutes=5))
+    collector.increment("messages", "hi", now=NOW - timedelta(minutes=5))
+    await rollup.run_once(now=NOW)
+    collector.observe("llm_latency_ms", 40000, buckets=LATENCY_BUCKETS_MS, now=NOW - timedelta(minutes=5))
+    collector.increment("llm_fallbacks", now=NOW - timedelta(minutes=5))
+    collector.increment("messages", "en", amount=3, now=NOW - timedelta(minutes=65))
+    report = await rollup.run_once(now=NOW)
+    assert report["minute_rows"] == 4 and len(collector) == 0
+
+    async with sessions() as db:
+        minute = (await db.execute(select(MetricRollup).where(
+            MetricRollup.resolution == "minute", MetricRollup.metric_name == "llm_latency_ms"
+        ))).scalar_one()
+        assert (minute.count, minute.value_min, minute.value_max) == (3, 120, 40000)
+        print("✅ Minute rows upserted additively")
+
+        hours = await fetch_series(db, "messages", NOW - timedelta(hours=3), NOW, "hour")
+        assert [point["by_dimension"] for point in hours] == [{"en": 3}, {"hi": 1}]
+        latency = await fetch_series(db, "llm_latency_ms", NOW - timedelta(days=1), NOW, "day")
+        assert latency[0]["count"] == 3 and latency[0]["p50"] == 1000 and latency[0]["p99"] == 60000
+        rate = await fetch_series(db, "fallback_rate", NOW - timedelta(hours=1), NOW, "minute")
+        assert rate == [{"bucket": (NOW - timedelta(minutes=5)).isoformat(), "calls": 3, "fallbacks": 1, "value": 0.3333}]
+        print("✅ Hour and day rollups keep counts and percentiles")
+
+    # Past the minute retention only the rolled-up levels remain
+    later = NOW + timedelta(hours=3)
+    report = await rollup.run_once(now=later)
+    assert report["expired_rows"] > 0
+    async with sessions() as db:
+        levels = dict((await db.execute(
+            select(MetricRollup.resolution, func.sum(MetricRollup.count))
+            .where(MetricRollup.metric_name == "messages")
+            .group_by(MetricRollup.resolution)
+        )).all())
+    assert levels == {"hour": 4, "day": 4}
+    print("✅ Expired minute rows removed after downsampling")
+    await async_engine.dispose()
+
+def test_resolution_choice():
+    """Short recent ranges read minutes; long or old ones read coarser levels"""
+    assert choose_resolution(NOW - timedelta(hours=1), NOW, NOW, RETENTION) == "minute"
+    assert choose_resolution(NOW - timedelta(hours=24), NOW, NOW, RETENTION) == "hour"
+    assert choose_resolution(NOW - timedelta(days=10), NOW - timedelta(days=9), NOW, RETENTION) == "day"
+    print("✅ Resolution chosen from range width and retention")
+
+def test_rollup_pipeline():
+    """Flush, roll up, read back and expire"""
+    asyncio.run(_rollup())
+
+if __name__ == "__main__":
+    print("📈 Testing dashboard metric rollups...")
+    test_resolution_choice()
+    test_rollup_pipeline()
+    print("\n🎉 All metric rollup tests passed!")
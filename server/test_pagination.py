@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for keyset pagination
+Walks cursors over rows with tied and NULL created_at on a scratch SQLite database, and checks the removed skip parameter
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timezone
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Chat, User
+from app.pagination import decode_cursor, encode_cursor, paginate
+from app.replicas import get_read_db
+from app.routers import database
+
+PATH = os.path.join(SCRATCH_DIR, "pages.db")
+# (id, created_at): a tie on 2024-01-02 and three undated rows
+ROWS = [
+    (1, datetime(2024, 1, 3, 9)), (2, None), (3, datetime(2024, 1, 1, 9)), (4, datetime(2024, 1, 2, 9)),
+    (5, None), (6, datetime(2024, 1, 2, 9)), (7, datetime(2024, 1, 4, 9)), (8, None),
+]
+EXPECTED = [3, 4, 6, 1, 7, 2, 5, 8]
+
+def _seed():
+    engine = create_engine(f"sqlite:///{PATH}")
+    for model in (User, Chat):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": row_id, "username": f"u{row_id}", "email": f"u{row_id}@example.com", "created_at": created_at}
+            for row_id, created_at in ROWS
+        ])
+    engine.dispose()
+
+_seed()
+SessionFactory = async_sessionmaker(bind=create_async_engine(f"sqlite+aiosqlite:///{PATH}"))
+
+async def _read_db():
+    async with SessionFactory() as db:
+        yield db
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(database.router, prefix="/api/v1/database")
+    app.dependency_overrides[get_read_db] = _read_db
+    return TestClient(app)
+
+def test_cursor_round_trip():
+    """Cursors carry datetimes and NULL explicitly; garbage is a 400"""
+    stamp = datetime(2024, 1, 2, 9, 0, tzinfo=timezone.utc)
+    assert decode_cursor("postgresql", encode_cursor(stamp, 6)) == (stamp, 6)
+    assert decode_cursor("postgresql", encode_cursor(None, 5)) == (None, 5)
+    assert decode_cursor("sqlite", encode_cursor("2024-01-02 09:00:00", 6)) == ("2024-01-02 09:00:00", 6)
+    for token in ("not-a-cursor", encode_cursor("yesterday", 1)):
+        try:
+            decode_cursor("postgresql", token)
+            raise AssertionError(f"{token} should be rejected")
+        except HTTPException as e:
+            assert e.status_code == 400
+    print("✅ Cursor encoding")
+
+def test_walk_pages():
+    """Every page size visits each row once, ties by id, NULL created_at last"""
+    async def walk(limit):
+        seen, cursor, pages = [], None, 0
+        async with SessionFactory() as db:
+            while True:
+                page = await paginate(db, User, "users", limit, cursor)
+                seen += [user.id for user in page["users"]]
+                pages += 1
+                assert ("total_estimate" in page) == (cursor is None)
+                if not page["has_more"]:
+                    return seen, pages
+                cursor = page["next_cursor"]
+
+    for limit in (1, 2, 3, 5, 8, 20):
+        seen, pages = asyncio.run(walk(limit))
+        assert seen == EXPECTED, (limit, seen)
+        assert pages == max(1, -(-len(EXPECTED) // limit)), (limit, pages)
+    print("✅ Pages walk every row once with NULL created_at last")
+
+def test_endpoint_cursor_and_removed_skip():
+    """The list endpoint follows next_cursor; skip/offset are rejected instead of ignored"""
+    with _client() as client:
+        seen, cursor = [], None
+        while True:
+            response = client.get("/api/v1/database/users", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200
+            body = response.json()
+            seen += [user["id"] for user in body["users"]]
+            if not body["has_more"]:
+                break
+            cursor = body["next_cursor"]
+        assert seen == EXPECTED
+
+        for params in ({"skip": 3}, {"offset": 3, "limit": 3}):
+            response = client.get("/api/v1/database/users", params=params)
+            assert response.status_code == 400 and "next_cursor" in response.json()["detail"]
+        assert client.get("/api/v1/database/users", params={"cursor": "bogus"}).status_code == 400
+    print("✅ Endpoint cursors and removed skip")
+
+if __name__ == "__main__":
+    print("📄 Testing keyset pagination...")
+    test_cursor_round_trip()
+    test_walk_pages()
+    test_endpoint_cursor_and_removed_skip()
+    print("\n🎉 All pagination tests passed!")
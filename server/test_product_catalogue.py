@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the culture product catalogue
+Checks snapshot queries against the old filter/sort loop, database loading and atomic hot swaps on a scratch SQLite database
+"""
+
+import asyncio
+import itertools
+import os
+import tempfile
+from datetime import datetime
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+from pydantic import ValidationError
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.catalogue import CatalogueSnapshot, ProductCatalogue, load_snapshot_file, validate_products
+from app.http_cache import get_data_version
+from app.models import Artisan, ArtisanProduct, RatingAggregate
+
+def _reference(items, category, min_price, max_price, eco_friendly, in_stock, sort_by, limit):
+    """The per-request filter/sort the culture router used to run"""
+    result = items
+    if category:
+        result = [p for p in result if p["category"].lower() == category.lower()]
+    if min_price is not None:
+        result = [p for p in result if p["price"] >= min_price]
+    if max_price is not None:
+        result = [p for p in result if p["price"] <= max_price]
+    if eco_friendly is not None:
+        result = [p for p in result if p["eco_friendly"] == eco_friendly]
+    if in_stock is not None:
+        result = [p for p in result if p["in_stock"] == in_stock]
+    if sort_by == "price":
+        result = sorted(result, key=lambda x: x["price"])
+    elif sort_by == "rating":
+        result = sorted(result, key=lambda x: x["rating"], reverse=True)
+    elif sort_by == "name":
+        result = sorted(result, key=lambda x: x["name"])
+    return [p["id"] for p in result[:limit]]
+
+def test_snapshot_matches_reference():
+    """Every filter/sort combination returns what the old loop returned"""
+    items = load_snapshot_file()
+    snapshot = CatalogueSnapshot(validate_products(items), "snapshot")
+    combinations = itertools.product(
+        [None, "textiles", "Utensils"], [None, 800], [None, 2000], [None, True], [None, True, False],
+        ["name", "price", "rating", "unknown"], [2, 20]
+    )
+    for args in combinations:
+        assert [p.id for p in snapshot.query(*args)] == _reference(items, *args), args
+
+    assert snapshot.get(3).name == "Ringal Basket" and snapshot.get(999) is None
+    assert [p.id for p in snapshot.search("wool")[1]] == [2, 7]
+    assert len(snapshot.featured) == 5 and all(p.in_stock for p in snapshot.featured)
+    try:
+        snapshot.get(3).price = 1
+        raise AssertionError("products should be immutable")
+    except ValidationError:
+        pass
+    print("✅ Snapshot queries match the per-request implementation")
+
+async def _database_and_hot_swap():
+    path = os.path.join(SCRATCH_DIR, "catalogue.db")
+    engine = create_engine(f"sqlite:///{path}")
+    for model in (Artisan, ArtisanProduct, RatingAggregate):
+        model.__table__.create(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    catalogue = ProductCatalogue(session_factory=async_sessionmaker(bind=async_engine), check_interval=3600)
+
+    # Empty table: the bundled snapshot file
+    first = await catalogue.ensure_fresh()
+    assert first.source == "snapshot" and len(first) == len(load_snapshot_file())
+    version = get_data_version("catalogue")
+
+    with engine.begin() as conn:
+        conn.execute(Artisan.__table__.insert(), [
+            {"id": 1, "name": "Meera Devi", "location": "Almora", "district": "Almora",
+             "specialization": "Aipan", "is_active": True},
+        ])
+        conn.execute(ArtisanProduct.__table__.insert(), [
+            {"artisan_id": 1, "name": "Aipan Thali", "category": "Art & Paintings", "price": 749.6,
+             "materials_used": "Brass, Natural Pigments", "availability_status": "available",
+             "eco_friendly": True, "crafting_time_days": 2, "images": ["/images/thali.jpg"], "is_active": True},
+            {"artisan_id": 1, "name": "Custom Mural", "category": "Art & Paintings", "price": 9000,
+             "materials_used": None, "availability_status": "custom_order",
+             "eco_friendly": False, "crafting_time_days": None, "images": None, "is_active": True},
+        ])
+
+    # Change detected: a new snapshot replaces the old one; the old one is untouched
+    catalogue.invalidate()
+    await catalogue.ensure_fresh()
+    await catalogue._task
+    second = catalogue.snapshot
+    assert second is not first and second.source == "database" and len(first) == len(load_snapshot_file())
+    assert get_data_version("catalogue") > version
+    thali = second.query(category="art & paintings")[0]
+    assert (thali.price, thali.materials, thali.origin_village, thali.image) == (750, ["Brass", "Natural Pigments"], "Almora", "/images/thali.jpg")
+    assert [p.name for p in second.query(in_stock=False)] == ["Custom Mural"]
+    assert second.query(eco_friendly=False, in_stock=None)[0].crafting_time_days == 0
+
+    # Unchanged fingerprint: no rebuild
+    catalogue.invalidate()
+    await catalogue.ensure_fresh()
+    await catalogue._task
+    assert catalogue.snapshot is second and catalogue.builds == 2
+
+    with engine.begin() as conn:
+        conn.execute(update(Artisan.__table__).values(is_active=False, updated_at=datetime(2030, 1, 1)))
+    catalogue.invalidate()
+    await catalogue.ensure_fresh()
+    await catalogue._task
+    assert catalogue.snapshot.source == "snapshot"
+    await async_engine.dispose()
+    engine.dispose()
+
+def test_database_and_hot_swap():
+    """Database rows replace the snapshot file and are swapped on change"""
+    asyncio.run(_database_and_hot_swap())
+    print("✅ Database loading and atomic hot swap")
+
+if __name__ == "__main__":
+    print("🛍️  Testing product catalogue...")
+    test_snapshot_matches_reference()
+    test_database_and_hot_swap()
+    print("\n🎉 All product catalogue tests passed!")
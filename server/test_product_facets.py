@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for faceted product browsing
+Checks bitmap filtering and disjunctive facet counts against brute force on a synthetic catalogue
+"""
+
+import os
+import random
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}")
+
+from app.catalogue import CatalogueSnapshot, Product
+
+CATEGORIES = ["Textiles", "Art & Paintings", "Home & Decor", "Utensils", "Jewelry"]
+VILLAGES = ["Almora", "Chamoli", "Munsiyari", "Bageshwar", "Pithoragarh", "Mana"]
+MATERIALS = ["Pure Wool", "Copper", "Ringal Bamboo", "Silver", "Natural Dyes", "Brass"]
+
+def _catalogue(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    return [
+        Product(
+            id=i + 1, name=f"Item {rng.randrange(10 ** 6):06d}", description="", price=rng.randrange(100, 10000),
+            artisan="Artisan", image="", category=rng.choice(CATEGORIES), rating=round(rng.uniform(3, 5), 1),
+            reviews_count=0, in_stock=rng.random() < 0.8, materials=rng.sample(MATERIALS, rng.randint(1, 3)),
+            origin_village=rng.choice(VILLAGES), crafting_time_days=1, eco_friendly=rng.random() < 0.5
+        )
+        for i in range(count)
+    ]
+
+def _matches(product, filters, min_price, max_price, skip=None):
+    checks = {
+        "category": lambda values: product.category.lower() in values,
+        "village": lambda values: product.origin_village.lower() in values,
+        "material": lambda values: any(m.lower() in values for m in product.materials),
+        "eco_friendly": lambda values: product.eco_friendly in values,
+        "in_stock": lambda values: product.in_stock in values,
+    }
+    for name, values in filters.items():
+        if values and name != skip and not checks[name](values):
+            return False
+    if skip != "price":
+        if min_price is not None and product.price < min_price:
+            return False
+        if max_price is not None and product.price > max_price:
+            return False
+    return True
+
+def test_browse_matches_brute_force():
+    """Totals, pages and facet counts equal a full scan"""
+    products = _catalogue(3000)
+    snapshot = CatalogueSnapshot(products, "test")
+    rng = random.Random(9)
+    for _ in range(60):
+        categories = rng.sample(CATEGORIES, rng.randint(0, 2))
+        villages = rng.sample(VILLAGES, rng.randint(0, 2))
+        materials = rng.sample(MATERIALS, rng.randint(0, 1))
+        eco = rng.choice([None, True, False])
+        stock = rng.choice([None, True])
+        min_price = rng.choice([None, 500, 2500])
+        max_price = rng.choice([None, 4000, 9000])
+        sort_by = rng.choice(["name", "price", "rating"])
+        page = snapshot.browse(categories, villages, materials, eco, stock, min_price, max_price, sort_by, 5, 10)
+
+        filters = {
+            "category": [c.lower() for c in categories], "village": [v.lower() for v in villages],
+            "material": [m.lower() for m in materials],
+            "eco_friendly": [] if eco is None else [eco], "in_stock": [] if stock is None else [stock],
+        }
+        key = {"name": lambda p: p.name, "price": lambda p: p.price, "rating": lambda p: -p.rating}[sort_by]
+        expected = sorted((p for p in products if _matches(p, filters, min_price, max_price)), key=key)
+        assert page["total"] == len(expected)
+        assert [p.id for p in page["results"]] == [p.id for p in expected[5:15]]
+
+        for value in page["facets"]["village"]:
+            count = sum(
+                1 for p in products
+                if p.origin_village == value["value"] and _matches(p, filters, min_price, max_price, skip="village")
+            )
+            assert value["count"] == count, value
+        materials_counted = {value["value"]: value["count"] for value in page["facets"]["material"]}
+        for material in MATERIALS:
+            count = sum(
+                1 for p in products
+                if material in p.materials and _matches(p, filters, min_price, max_price, skip="material")
+            )
+            assert materials_counted.get(material, 0) == count
+        allowed = [p.price for p in products if _matches(p, filters, None, None, skip="price")]
+        assert page["price_range"]["min"] == (min(allowed) if allowed else None)
+    print("✅ Facet filtering and counts match brute force")
+
+if __name__ == "__main__":
+    print("🧭 Testing faceted product browsing...")
+    test_browse_matches_brute_force()
+    print("\n🎉 All facet tests passed!")
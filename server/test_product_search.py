@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for product search
+Checks stemming, typo tolerance, prefix completion, ranking and incremental updates
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}")
+
+from app.catalogue import CatalogueSnapshot, load_snapshot_file, validate_products
+from app.product_search import ProductSearchIndex, edit_distance
+
+def test_matching_and_ranking():
+    """Plurals, typos and partial words find the right products"""
+    snapshot = CatalogueSnapshot(validate_products(load_snapshot_file()), "snapshot")
+    names = lambda q: [product.name for product in snapshot.search(q)[1]]
+    assert names("shawls")[0] == "Woolen Shawl"
+    assert names("pashmna")[0] == "Pashmina Scarf"
+    assert names("copp")[0] == "Copper Water Bottle"
+    assert names("copper botle")[0] == "Copper Water Bottle"
+    assert names("prayer beads") == []  # out of stock
+    assert snapshot.suggest("woolen sh")["completions"] == ["woolen shawl"]
+    assert edit_distance("shawl", "shwal", 1) == 1 and edit_distance("shawl", "scarf", 2) == 3
+    print("✅ Stemming, typo tolerance and prefix completion")
+
+def test_rating_breaks_ties():
+    """Equally relevant products are ordered by rating"""
+    base = validate_products(load_snapshot_file())[1]
+    products = [base.model_copy(update={"id": i, "rating": rating}) for i, rating in ((1, 3.5), (2, 4.9), (3, 4.2))]
+    snapshot = CatalogueSnapshot(products, "test")
+    assert [product.id for product in snapshot.search("shawl")[1]] == [2, 3, 1]
+    print("✅ Rating breaks relevance ties")
+
+def test_incremental_sync():
+    """Only changed products are re-indexed and removed terms disappear"""
+    products = validate_products(load_snapshot_file())
+    index = ProductSearchIndex()
+    assert index.sync(products) == {"updated": len(products), "removed": 0}
+    renamed = products[1].model_copy(update={"name": "Kumaoni Tapestry"})
+    assert index.sync([renamed] + products[2:]) == {"updated": 1, "removed": 1}
+    assert index.search_products("tapestry")[1][0][1] == renamed.id
+    assert index.search_products("aipan")[0] == 0 and "aipan" not in index.vocabulary
+    print("✅ Incremental index updates")
+
+if __name__ == "__main__":
+    print("🔎 Testing product search...")
+    test_matching_and_ranking()
+    test_rating_breaks_ties()
+    test_incremental_sync()
+    print("\n🎉 All product search tests passed!")
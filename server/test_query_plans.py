@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression test
+Migrates a scratch SQLite database to head and asserts the app's queries are served by their indexes
+"""
+
+import os
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import sqlite
+
+from app.db_stats import overview_query
+from app.models import Artisan, ArtisanProduct, CulturalSite, EmergencyContact, TourismPlace, User
+from app.pagination import keyset_query
+from app.routers.database import recent_activity_query, relation_query
+from app.schemas import ArtisanProductRead, ArtisanRead, CulturalSiteRead, TourismPlaceRead, UserRead, projection
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+# Migrated separately from the app database so create_all never pre-creates its tables
+URL = f"sqlite:///{os.path.join(SCRATCH_DIR, 'query_plans.db')}"
+
+def _migrate_and_seed():
+    config = Config(os.path.join(SERVER_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(SERVER_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", URL)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+    engine = create_engine(URL)
+    with engine.begin() as conn:
+        for i in range(300):
+            active = int(i % 10 != 0)
+            conn.execute(text(
+                "INSERT INTO users (username, email, is_active) VALUES (:n, :e, :a)"
+            ), {"n": f"user{i}", "e": f"user{i}@example.com", "a": active})
+            conn.execute(text(
+                "INSERT INTO chats (user_id, chat_type, is_active) VALUES (:u, 'general', 1)"
+            ), {"u": i + 1})
+            conn.execute(text(
+                "INSERT INTO chat_messages (chat_id, user_id, message) VALUES (:c, :u, 'namaste')"
+            ), {"c": i + 1, "u": i + 1})
+            for table, extra in [
+                ("cultural_sites", {"category": f"cat{i % 7}"}),
+                ("tourism_places", {"category": f"cat{i % 7}"}),
+            ]:
+                conn.execute(text(
+                    f"INSERT INTO {table} (name, location, district, category, is_active) "
+                    "VALUES ('x', 'y', :d, :category, :a)"
+                ), {"d": f"district{i % 13}", "a": active, **extra})
+            conn.execute(text(
+                "INSERT INTO artisans (name, location, district, specialization, is_verified, is_active) "
+                "VALUES ('x', 'y', 'z', 'woodwork', :v, :a)"
+            ), {"v": int(i % 3 == 0), "a": active})
+            conn.execute(text(
+                "INSERT INTO artisan_products (artisan_id, name, category, is_active) VALUES (:p, 'x', :c, :a)"
+            ), {"p": i + 1, "c": f"cat{i % 5}", "a": active})
+            conn.execute(text(
+                "INSERT INTO emergency_contacts (district, service_type, name, phone_number) "
+                "VALUES (:d, :s, 'x', '112')"
+            ), {"d": f"district{i % 13}", "s": ["police", "hospital", "fire"][i % 3]})
+        conn.execute(text("ANALYZE"))
+    return engine
+
+def _plan(engine, query) -> str:
+    sql = str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql)).all()
+    return "\n".join(row[-1] for row in rows)
+
+def test_query_plans_use_indexes():
+    """Every hot query should search an index instead of scanning its table"""
+    engine = _migrate_and_seed()
+    after = ("2000-01-01 00:00:00", 1)
+
+    expectations = [
+        (
+            "users keyset page",
+            keyset_query("sqlite", User, 50, columns=projection(User, UserRead), after=after),
+            "ix_users_created_at_id"
+        ),
+        (
+            "cultural sites keyset page",
+            keyset_query(
+                "sqlite", CulturalSite, 50, CulturalSite.is_active == True,
+                columns=projection(CulturalSite, CulturalSiteRead), after=after
+            ),
+            "ix_cultural_sites_active_created_at_id"
+        ),
+        (
+            "artisans keyset page",
+            keyset_query(
+                "sqlite", Artisan, 50, Artisan.is_active == True,
+                columns=projection(Artisan, ArtisanRead), after=after
+            ),
+            "ix_artisans_active_created_at_id"
+        ),
+        (
+            "artisan products keyset page",
+            keyset_query(
+                "sqlite", ArtisanProduct, 50, ArtisanProduct.is_active == True,
+                columns=projection(ArtisanProduct, ArtisanProductRead), after=after
+            ),
+            "ix_artisan_products_active_created_at_id"
+        ),
+        (
+            "tourism places keyset page",
+            keyset_query(
+                "sqlite", TourismPlace, 50, TourismPlace.is_active == True,
+                columns=projection(TourismPlace, TourismPlaceRead), after=after
+            ),
+            "ix_tourism_places_active_created_at_id"
+        ),
+        ("recent activity", recent_activity_query(10), "ix_chat_messages_created_at_desc"),
+        ("include=chats", relation_query(User, "chats", [1, 2, 3]), "ix_chats_user_id"),
+        (
+            "include=products",
+            relation_query(Artisan, "products", [1, 2, 3]),
+            "ix_artisan_products_active_artisan_id"
+        ),
+        ("overview tourism categories", overview_query(), "ix_tourism_places_category_active"),
+        (
+            "emergency contacts by district",
+            select(EmergencyContact.id).where(
+                EmergencyContact.district == "district1",
+                EmergencyContact.service_type == "police"
+            ),
+            "ix_emergency_contacts_district_service_type"
+        ),
+    ]
+
+    for name, query, index in expectations:
+        plan = _plan(engine, query)
+        assert index in plan, f"{name} does not use {index}:\n{plan}"
+        print(f"✅ {name} uses {index}")
+
+    engine.dispose()
+
+if __name__ == "__main__":
+    print("🔍 Checking query plans...")
+    test_query_plans_use_indexes()
+    print("\n🎉 All query plans use their indexes!")
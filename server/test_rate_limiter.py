@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the sliding-window rate limiter
+Verifies route weights, window sliding and that limits are shared between workers
+"""
+
+import os
+import tempfile
+
+from app.rate_limiter import LocalRateLimitBackend, RateLimiter, SharedMemoryRateLimitBackend, fcntl
+
+def test_route_costs():
+    """Chat requests should cost more than health probes"""
+    limiter = RateLimiter(LocalRateLimitBackend(), limit=10, window=60)
+
+    assert limiter.cost_for("/api/v1/chat/query") > limiter.cost_for("/health")
+    assert limiter.cost_for("/api/v1/culture/products") == 1.0
+
+    # Two chat queries (cost 5 each) exhaust a limit of 10
+    assert limiter.reserve("1.2.3.4", "/api/v1/chat/query", now=1000).allowed
+    assert limiter.reserve("1.2.3.4", "/api/v1/chat/query", now=1000).allowed
+    denied = limiter.reserve("1.2.3.4", "/api/v1/chat/query", now=1000)
+    assert not denied.allowed
+    assert denied.retry_after > 0
+    print("✅ Route cost weights applied")
+
+def test_window_slides():
+    """Previous window counts decay as the window slides"""
+    limiter = RateLimiter(LocalRateLimitBackend(), limit=10, window=60)
+
+    for _ in range(10):
+        assert limiter.reserve("client", "/api/v1/culture/products", now=1020).allowed
+    assert not limiter.reserve("client", "/api/v1/culture/products", now=1079).allowed
+
+    # Half way through the next window only half of the old count remains
+    assert limiter.reserve("client", "/api/v1/culture/products", now=1110).allowed
+    print("✅ Sliding window decays previous counts")
+
+def test_shared_backend_across_workers():
+    """Two backends mapping the same file behave like one limiter"""
+    if fcntl is None:
+        print("⏭️  Shared backend not supported on this platform")
+        return
+
+    path = os.path.join(tempfile.mkdtemp(), "rate_limit.bin")
+    worker_a = RateLimiter(SharedMemoryRateLimitBackend(path, slots=64), limit=10, window=60)
+    worker_b = RateLimiter(SharedMemoryRateLimitBackend(path, slots=64), limit=10, window=60)
+
+    for _ in range(5):
+        assert worker_a.reserve("client", "/api/v1/culture/products", now=1000).allowed
+    for _ in range(5):
+        assert worker_b.reserve("client", "/api/v1/culture/products", now=1000).allowed
+
+    assert not worker_a.reserve("client", "/api/v1/culture/products", now=1000).allowed
+    assert not worker_b.reserve("client", "/api/v1/culture/products", now=1000).allowed
+
+    worker_a.backend.close()
+    worker_b.backend.close()
+    os.remove(path)
+    print("✅ Limits shared across workers")
+
+if __name__ == "__main__":
+    print("🧪 Testing Rate Limiter")
+    print("=" * 40)
+    test_route_costs()
+    test_window_slides()
+    test_shared_backend_across_workers()
+    print("\n🎉 All rate limiter tests passed!")
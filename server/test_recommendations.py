@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for product recommendations
+Checks neighbour lists against brute-force cosine similarity, co-view updates, personalized featured lists and the culture endpoints
+"""
+
+import asyncio
+import math
+import os
+import random
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}")
+
+from app.catalogue import CatalogueSnapshot, Product, load_snapshot_file, validate_products
+from app.recommendations import Recommender, content_neighbours, product_features
+
+def _catalogue(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    materials = [f"Material {i}" for i in range(40)]
+    return [
+        Product(
+            id=i + 1, name=f"Item {i}", description="", price=100, artisan=f"Artisan {rng.randrange(30)}", image="",
+            category=rng.choice(["Textiles", "Utensils", "Art", "Jewelry"]), rating=round(rng.uniform(3, 5), 1),
+            reviews_count=0, in_stock=rng.random() < 0.9, materials=rng.sample(materials, rng.randint(1, 3)),
+            origin_village=rng.choice(["Almora", "Chamoli", "Munsiyari", "Mana", "Joshimath"]),
+            crafting_time_days=1, eco_friendly=False
+        )
+        for i in range(count)
+    ]
+
+def _brute_force(products, i):
+    """Cosine similarity of product i to every other, computed directly"""
+    n = len(products)
+    frequency = {}
+    for product in products:
+        for key in product_features(product):
+            frequency[key] = frequency.get(key, 0) + 1
+    vectors = [
+        {key: weight * math.log1p(n / frequency[key]) for key, weight in product_features(product).items()}
+        for product in products
+    ]
+    norm = lambda vector: math.sqrt(sum(value * value for value in vector.values()))
+    return [
+        sum(value * vectors[j].get(key, 0) for key, value in vectors[i].items()) / (norm(vectors[i]) * norm(vectors[j]))
+        if j != i else 0.0
+        for j in range(n)
+    ]
+
+def test_neighbours_match_brute_force():
+    """Blocked sparse similarity gives the exact top-k scores"""
+    import app.recommendations as recommendations
+    products = _catalogue(400)
+    recommendations.BLOCK_CELLS, block_cells = 5000, recommendations.BLOCK_CELLS  # several blocks
+    try:
+        neighbours, scores = content_neighbours(products, 10)
+    finally:
+        recommendations.BLOCK_CELLS = block_cells
+    for i in random.Random(1).sample(range(len(products)), 25):
+        expected = sorted(_brute_force(products, i), reverse=True)[:10]
+        assert all(abs(a - b) < 1e-5 for a, b in zip(scores[i], expected)), i
+        assert all(products[j].id != products[i].id for j in neighbours[i])
+    print("✅ Neighbour lists match brute-force cosine similarity")
+
+async def _co_views_and_featured():
+    snapshot = CatalogueSnapshot(validate_products(load_snapshot_file()), "snapshot")
+    recommender = Recommender(neighbours=5, recent_views=3)
+    await recommender.ensure_fresh(snapshot)
+    assert [other for other, _ in recommender.neighbours(2)] == [7]  # both Textiles
+
+    # Honey and the copper bottle share nothing, until sessions view them together
+    assert 4 not in dict(recommender.neighbours(5))
+    for session in ("a", "b", "c"):
+        recommender.record_view(session, 5)
+        recommender.record_view(session, 4)
+    assert recommender.neighbours(5)[0][0] == 4 and recommender.co_views[4][5] == 3
+
+    recommender.record_view("d", 2)
+    picks = [product.id for product in recommender.featured("d")]
+    assert picks[0] == 7 and 2 not in picks and len(picks) == 5
+    assert [product.id for product in recommender.featured(None)] == [product.id for product in snapshot.featured]
+    # Only the last recent_views views of a session count
+    for product_id in (1, 3, 5, 7):
+        recommender.record_view("e", product_id)
+    assert list(recommender.sessions["e"]) == [3, 5, 7]
+
+    related = recommender.related(2)
+    assert [product.id for product in related["related"]] == [7]
+
+    # A new snapshot is picked up in the background while the old model keeps serving
+    changed = CatalogueSnapshot(validate_products(load_snapshot_file()), "snapshot")
+    model = await recommender.ensure_fresh(changed)
+    assert model.snapshot is snapshot
+    await recommender._task
+    assert recommender.model.snapshot is changed
+
+def test_co_views_and_featured():
+    """Co-views reshape neighbours; featured follows the session's recent views"""
+    asyncio.run(_co_views_and_featured())
+    print("✅ Co-views and personalized featured products")
+
+def test_endpoints():
+    """Views with X-Session-ID drive /featured-products; /related lists neighbours"""
+    from fastapi.testclient import TestClient
+    from app.catalogue import catalogue
+    from app.routers.culture import router
+    from fastapi import FastAPI
+
+    catalogue.swap(validate_products(load_snapshot_file()), "snapshot")
+    catalogue._checked_at = float("inf")  # serve the swapped snapshot, no database checks
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1/culture")
+    with TestClient(app) as client:
+        assert client.get("/api/v1/culture/products/2", headers={"X-Session-ID": "visitor"}).status_code == 200
+        featured = client.get("/api/v1/culture/featured-products", headers={"X-Session-ID": "visitor"}).json()
+        assert featured[0]["id"] == 7 and all(product["id"] != 2 for product in featured)
+        related = client.get("/api/v1/culture/products/2/related").json()
+        assert [product["id"] for product in related["related"]] == [7]
+        assert client.get("/api/v1/culture/products/999/related").status_code == 404
+    print("✅ Culture recommendation endpoints")
+
+if __name__ == "__main__":
+    print("🧩 Testing product recommendations...")
+    test_neighbours_match_brute_force()
+    test_co_views_and_featured()
+    test_endpoints()
+    print("\n🎉 All recommendation tests passed!")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for read-replica routing
+Uses two local SQLite databases as primary and replica, and an unreachable replica behind the database routes
+"""
+
+import asyncio
+import os
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import replicas
+from app.models import User
+from app.replicas import ReplicaRouter
+from app.routers import database
+
+def _database(name: str, users: int) -> str:
+    """A SQLite file holding `users` rows; returns its async URL"""
+    path = os.path.join(SCRATCH_DIR, f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    User.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"username": f"{name}{i}", "email": f"{name}{i}@example.com"} for i in range(users)
+        ])
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{path}"
+
+async def _route_reads():
+    primary = create_async_engine(_database("primary", 2))
+    replica = create_async_engine(_database("replica", 5))
+    lag = {"seconds": 0.0}
+
+    async def probe(engine):
+        await asyncio.sleep(0)
+        return lag["seconds"]
+
+    router = ReplicaRouter(
+        primary,
+        {"replica_1": replica},
+        max_lag=5.0,
+        check_interval=3600,
+        lag_probe=probe,
+        primary_sessions=async_sessionmaker(bind=primary)
+    )
+
+    async def count_users() -> int:
+        _, session = router.session()
+        async with session as db:
+            return (await db.execute(select(func.count()).select_from(User))).scalar_one()
+
+    # Unknown replica health: primary until the first check passes
+    assert await count_users() == 2
+    await router.check_replicas()
+    assert await count_users() == 5
+    print("✅ Reads go to a healthy replica")
+
+    lag["seconds"] = 30.0
+    await router.check_replicas()
+    assert await count_users() == 2
+    assert router.get_stats()["replicas"]["replica_1"]["lag_seconds"] == 30.0
+    print("✅ Lagging replica falls back to primary")
+
+    lag["seconds"] = 0.5
+    await router.check_replicas()
+    assert await count_users() == 5
+
+    async def failing_probe(engine):
+        raise ConnectionError("replica down")
+
+    router.lag_probe = failing_probe
+    await router.check_replicas()
+    assert await count_users() == 2
+    assert router.get_stats()["replicas"]["replica_1"]["error"] == "replica down"
+    print("✅ Unreachable replica falls back to primary")
+
+    await primary.dispose()
+    await replica.dispose()
+
+def test_replica_routing():
+    """Replica used only while healthy and within the lag limit"""
+    asyncio.run(_route_reads())
+
+def test_failed_read_moves_to_primary():
+    """A query that fails on a replica inside a route takes it out of rotation at once"""
+    async def probe(engine):
+        return 0.0
+
+    primary_url = _database("route_primary", 3)
+    primary = create_async_engine(primary_url)
+    # The lag probe says healthy, but the database file cannot be opened
+    replica = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(SCRATCH_DIR, 'missing', 'replica.db')}")
+    router = ReplicaRouter(
+        primary, {"replica_1": replica}, check_interval=3600, lag_probe=probe,
+        primary_sessions=async_sessionmaker(bind=primary)
+    )
+    asyncio.run(router.check_replicas())
+    assert router.get_stats()["replicas"]["replica_1"]["healthy"]
+
+    app = FastAPI()
+    app.include_router(database.router, prefix="/api/v1/database")
+    saved, replicas.replica_router = replicas.replica_router, router
+    try:
+        with TestClient(app) as client:
+            assert client.get("/api/v1/database/users").status_code == 500
+            stats = router.get_stats()["replicas"]["replica_1"]
+            assert not stats["healthy"] and "unable to open database file" in stats["error"]
+            response = client.get("/api/v1/database/users")
+            assert response.status_code == 200 and len(response.json()["users"]) == 3
+            assert router.primary_reads == 1 and stats["reads"] == 1
+    finally:
+        replicas.replica_router = saved
+        asyncio.run(primary.dispose())
+        asyncio.run(replica.dispose())
+    print("✅ Failed replica read moves the next read to the primary")
+
+if __name__ == "__main__":
+    print("🔀 Testing read-replica routing...")
+    test_replica_routing()
+    test_failed_read_moves_to_primary()
+    print("\n🎉 All replica routing tests passed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for JSON responses
+Checks that dumps() (pydantic-core for models, orjson for the rest, and the stdlib fallback without orjson) decodes to what json.dumps(jsonable_encoder(...)) gives
+"""
+
+import json
+import math
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field
+
+from app import responses
+from app.responses import FastJSONResponse, dumps
+
+ORJSON = responses.orjson
+
+class Mood(Enum):
+    CALM = "calm"
+
+class Stop(BaseModel):
+    name: str
+    reached_at: datetime
+    fee: Decimal
+
+class Trip(BaseModel):
+    trip_id: uuid.UUID
+    title: str = Field(alias="tripTitle")
+    day: date
+    stops: List[Stop]
+    mood: Mood
+    tags: Dict[str, int]
+    note: Optional[str] = None
+    altitude: float = 0.0
+
+STAMP = datetime(2024, 5, 1, 6, 30, 15, 250000, tzinfo=timezone.utc)
+TRIP = Trip(
+    trip_id=uuid.UUID("12345678-1234-5678-1234-567812345678"), tripTitle="Kedarnath यात्रा", day=date(2024, 5, 1),
+    stops=[Stop(name="Gaurikund", reached_at=STAMP, fee=Decimal("1.50")), Stop(name="Kedarnath", reached_at=STAMP.replace(tzinfo=None), fee=Decimal("0"))],
+    mood=Mood.CALM, tags={"trek": 16}
+)
+CASES = {
+    "model": TRIP,
+    "list of models": [TRIP, TRIP.model_copy(update={"note": "second"})],
+    "dict of models": {"total": 1, "trips": [TRIP], "first": TRIP.stops[0]},
+    "scalars": {
+        "aware": STAMP, "naive": STAMP.replace(tzinfo=None, microsecond=0), "day": date(2024, 2, 29),
+        "fee": Decimal("12.50"), "count": Decimal("3"), "id": uuid.UUID(int=7), "mood": Mood.CALM,
+        "text": "नमस्ते \"quoted\"", "none": None, "nested": [(1, 2), {"a": [True, False]}],
+    },
+    "non-str keys": {1: "one", 2.5: "two and a half", False: "no", None: "nothing", date(2024, 1, 1): "new year"},
+}
+
+def _expected(value):
+    return json.loads(json.dumps(jsonable_encoder(value)))
+
+def _paths():
+    """dumps() on the orjson path, then on the fallback used when orjson is not installed"""
+    for name, module in (("orjson", ORJSON), ("fallback", None)):
+        if name == "orjson" and module is None:
+            continue
+        responses.orjson = module
+        try:
+            yield name
+        finally:
+            responses.orjson = ORJSON
+
+def _strict_loads(body: bytes):
+    def reject(constant):
+        raise ValueError(f"invalid JSON constant {constant}")
+    return json.loads(body, parse_constant=reject)
+
+def test_matches_jsonable_encoder():
+    """Models, lists of models, datetime/date/Decimal/UUID/Enum and non-str keys encode like FastAPI's encoder"""
+    assert ORJSON is not None, "orjson is a requirement; the fallback is covered separately"
+    for path in _paths():
+        for name, value in CASES.items():
+            assert _strict_loads(dumps(value)) == _expected(value), (path, name)
+            assert FastJSONResponse(value).body == dumps(value)
+    assert _expected(TRIP)["tripTitle"] == "Kedarnath यात्रा" and _expected(TRIP)["stops"][0]["fee"] == "1.50"
+    print("✅ Same JSON as jsonable_encoder on every path")
+
+def test_nan_and_infinity():
+    """Non-finite floats become null on every path (json.dumps would emit invalid NaN/Infinity)"""
+    values = {"nan": math.nan, "inf": math.inf, "list": [1.5, -math.inf]}
+    model = TRIP.model_copy(update={"altitude": math.nan})
+    for path in _paths():
+        assert _strict_loads(dumps(values)) == {"nan": None, "inf": None, "list": [1.5, None]}, path
+        assert _strict_loads(dumps(model))["altitude"] is None, path
+        assert _strict_loads(dumps({"trip": model}))["trip"]["altitude"] is None, path
+    print("✅ NaN and infinities serialize as null")
+
+if __name__ == "__main__":
+    print("🧾 Testing JSON responses...")
+    test_matches_jsonable_encoder()
+    test_nan_and_infinity()
+    print("\n🎉 All JSON response tests passed!")
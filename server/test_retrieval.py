@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for chat retrieval
+Checks fact selection, incremental rebuilds and cross-worker reloads on a scratch SQLite database
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import CulturalSite, EmergencyContact, TourismPlace
+from app.services.ollama_service import ollama_service
+from app.services.retrieval import RetrievalIndex
+
+def _seed(engine):
+    for model in (TourismPlace, CulturalSite, EmergencyContact):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(CulturalSite.__table__.insert(), [
+            {"name": "Kedarnath Temple", "location": "Kedarnath", "district": "Rudraprayag", "category": "temple",
+             "visiting_hours": "4:00 AM - 9:00 PM", "entry_fee": "Free", "best_time_to_visit": "May-June",
+             "description": "Jyotirlinga of Lord Shiva", "is_active": True},
+            {"name": "Har Ki Pauri", "location": "Haridwar", "district": "Haridwar", "category": "ghat",
+             "visiting_hours": "Open all day", "entry_fee": "Free", "best_time_to_visit": "October-March",
+             "description": "Ganga aarti every evening", "is_active": True},
+        ])
+        conn.execute(TourismPlace.__table__.insert(), [
+            {"name": "Valley of Flowers", "location": "Chamoli", "district": "Chamoli", "category": "national_park",
+             "altitude": 3658, "best_time_to_visit": "July-August", "entry_fee": "₹150 for Indians",
+             "activities": ["trekking", "photography"], "description": "Alpine meadows", "is_active": True},
+        ])
+        conn.execute(EmergencyContact.__table__.insert(), [
+            {"name": "District Hospital Rudraprayag", "district": "Rudraprayag", "service_type": "hospital",
+             "phone_number": "01364-233012", "is_24x7": True, "is_active": True},
+        ])
+
+async def _build_and_reload():
+    path = os.path.join(SCRATCH_DIR, "rag.db")
+    index_dir = os.path.join(SCRATCH_DIR, "rag_index")
+    engine = create_engine(f"sqlite:///{path}")
+    _seed(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    sessions = async_sessionmaker(bind=async_engine)
+
+    worker = RetrievalIndex(index_dir, session_factory=sessions, check_interval=3600)
+    await worker.ensure_fresh()
+    assert worker.last_build["records"] == 4 and worker.last_build["embedded"] == 4
+
+    facts = worker.retrieve("Kedarnath temple timings")
+    assert facts[0]["key"].startswith("cultural_site:") and "4:00 AM - 9:00 PM" in facts[0]["fact"]
+    assert worker.retrieve("hospital phone number in Rudraprayag")[0]["key"].startswith("emergency_contact:")
+    assert "₹150" in worker.retrieve("valley of flowers entry fee")[0]["fact"]
+    assert len(worker.retrieve("Kedarnath temple timings", token_budget=30)) <= 1
+    assert worker.retrieve("xyzzy plugh") == []
+    print("✅ Relevant facts selected within the token budget")
+
+    # A second worker maps the same files without building
+    other = RetrievalIndex(index_dir, session_factory=sessions, check_interval=3600)
+    await other.ensure_fresh()
+    assert other.builds == 0 and other.snapshot.version == worker.snapshot.version
+
+    # One changed row: only it is re-embedded, and the other worker reloads the new version
+    with engine.begin() as conn:
+        conn.execute(
+            update(CulturalSite.__table__).where(CulturalSite.__table__.c.name == "Kedarnath Temple")
+            .values(visiting_hours="5:00 AM - 8:00 PM", updated_at=datetime(2030, 1, 1))
+        )
+    assert await worker.refresh()
+    assert worker.last_build["embedded"] == 1 and worker.last_build["reused"] == 3
+    assert other.load() and other.snapshot.version == worker.snapshot.version
+    assert "5:00 AM - 8:00 PM" in other.retrieve("Kedarnath temple timings")[0]["fact"]
+    assert not await other.refresh()
+    assert len([name for name in os.listdir(index_dir) if name.startswith("vectors-")]) <= 2
+    print("✅ Incremental rebuild picked up by another worker")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+def test_build_and_reload():
+    """Build from the database, rebuild one change, reload elsewhere"""
+    asyncio.run(_build_and_reload())
+
+def test_prompt_includes_facts():
+    """Retrieved facts are placed in the system prompt"""
+    prompt = ollama_service._build_system_prompt(None, "- Kedarnath Temple: hours 4:00 AM - 9:00 PM")
+    assert "Facts from the Deep-Shiva database" in prompt and "4:00 AM - 9:00 PM" in prompt
+    assert "Facts from" not in ollama_service._build_system_prompt(None, "")
+    print("✅ Facts injected into the system prompt")
+
+if __name__ == "__main__":
+    print("📚 Testing chat retrieval...")
+    test_build_and_reload()
+    test_prompt_includes_facts()
+    print("\n🎉 All retrieval tests passed!")
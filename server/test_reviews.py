@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Test script for product reviews
+Submits reviews into a scratch SQLite database and checks batched writes, running rating aggregates, moderation and the catalogue ratings
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.catalogue import ProductCatalogue, load_snapshot_file, validate_products
+from app.config import settings
+from app.models import Artisan, ArtisanProduct, ProductReview, RatingAggregate
+from app.reviews import ReviewStore, load_rating_aggregates, moderation_issues, review_store
+from app.routers import culture
+
+PRODUCTS = {product.id: product for product in validate_products(load_snapshot_file())}
+
+def _sessions(name, tables=(Artisan, ArtisanProduct, ProductReview, RatingAggregate)):
+    path = os.path.join(SCRATCH_DIR, name)
+    engine = create_engine(f"sqlite:///{path}")
+    for model in tables:
+        model.__table__.create(engine)
+    engine.dispose()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    return async_engine, async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+async def _expected(sessions, scope_column):
+    """Aggregates recomputed from the review rows (what AVG() at read time would give)"""
+    async with sessions() as db:
+        rows = (await db.execute(
+            select(scope_column, ProductReview.rating, func.count())
+            .where(ProductReview.status == "approved")
+            .group_by(scope_column, ProductReview.rating)
+        )).all()
+    expected = {}
+    for subject, rating, count in rows:
+        aggregate = expected.setdefault(str(subject), [0] * 7)
+        aggregate[0] += count
+        aggregate[1] += rating * count
+        aggregate[1 + rating] += count
+    return expected
+
+async def _check_aggregates(sessions):
+    async with sessions() as db:
+        for scope, column in (("product", ProductReview.product_id), ("artisan", ProductReview.artisan_name)):
+            stored = {subject: values for subject, values in (await load_rating_aggregates(db, scope)).items() if values[0]}
+            assert stored == await _expected(sessions, column), scope
+
+def test_moderation_checks():
+    """Links, contact details, blocked terms, shouting and repeated characters are held"""
+    assert moderation_issues("Beautiful shawl, very warm and soft", "Asha") == []
+    assert moderation_issues("Buy cheaper at www.example.com today", "Asha") == ["contains a link"]
+    assert moderation_issues("Call me on 9876543210 for more", "Asha") == ["contains contact details"]
+    assert moderation_issues("This is a total scam product", "Asha", ["scam"]) == ["blocked terms: scam"]
+    assert moderation_issues("THIS IS THE WORST BASKET I HAVE EVER BOUGHT", "Asha") == ["mostly capitals"]
+    assert moderation_issues("Sooooooo good, loved it", "Asha") == ["repeated characters"]
+
+    # Long reasons are cut to the column length
+    terms = [f"blockedterm{i}" for i in range(40)]
+    store = ReviewStore(blocked_terms=terms)
+    review = store.submit(PRODUCTS[1], 2, " ".join(terms) + " at www.example.com", "Asha")
+    store.moderate_new()
+    assert review["moderation_reason"].startswith("contains a link; blocked terms: blockedterm0")
+    assert len(review["moderation_reason"]) == ProductReview.moderation_reason.type.length
+    print("✅ Automatic moderation checks")
+
+async def _write_behind():
+    async_engine, sessions = _sessions("reviews.db")
+    changed = []
+    store = ReviewStore(
+        session_factory=sessions, read_session_factory=sessions, batch_size=1000,
+        blocked_terms=["scam"], on_ratings_changed=lambda: changed.append(1)
+    )
+    rng = random.Random(7)
+
+    # Submitting only buffers; one flush writes every review in one batch
+    submitted = [
+        store.submit(PRODUCTS[rng.randint(1, 3)], rng.randint(1, 5), f"Lovely piece number {i}", f"Reviewer {i}")
+        for i in range(250)
+    ]
+    assert all(review["status"] == "pending" for review in submitted)
+    async with sessions() as db:
+        assert (await db.execute(select(func.count()).select_from(ProductReview))).scalar() == 0
+    report = await store.flush()
+    assert report["reviews"] == 250 and store.stats["flushes"] == 1 and changed == [1]
+    assert store.stats["approved"] == 250 and store.get_stats()["buffered"] == 0
+    await _check_aggregates(sessions)
+    print("✅ Buffered reviews written in one batch with running aggregates")
+
+    # Suspicious and duplicate reviews never reach the aggregates on their own
+    held = store.submit(PRODUCTS[1], 1, "Total scam, see www.example.com", "Spammer")
+    store.submit(PRODUCTS[submitted[0]["product_id"]], 5, "lovely  piece number 0", "reviewer 0")
+    buffered = store.submit(PRODUCTS[2], 2, "Colours faded after one wash", "Kiran")
+    assert (await store.moderate(buffered["review_uid"], "reject", "off-topic"))["status"] == "rejected"
+    await store.flush()
+    assert store.stats["rejected"] == 1 and store.stats["flagged"] == 1
+    queue = await store.pending()
+    assert [review["review_uid"] for review in queue] == [held["review_uid"]]
+    assert "contains a link" in queue[0]["moderation_reason"]
+    await _check_aggregates(sessions)
+    print("✅ Flagged reviews queued, duplicates rejected")
+
+    # Manual decisions on written reviews move their rating in and out of the aggregates
+    before = await store.product_reviews(1)
+    assert (await store.moderate(held["review_uid"], "approve"))["status"] == "approved"
+    after = await store.product_reviews(1)
+    assert after["reviews_count"] == before["reviews_count"] + 1
+    assert after["histogram"]["1"] == before["histogram"]["1"] + 1
+    assert after["reviews"][0]["review_id"] == held["review_uid"]
+    await store.moderate(submitted[0]["review_uid"], "reject", "abusive")
+    await _check_aggregates(sessions)
+    assert await store.moderate("missing", "approve") is None
+    assert sum(after["histogram"].values()) == after["reviews_count"]
+    print("✅ Manual moderation adjusts aggregates")
+
+    # Ratings from the aggregates are merged into the catalogue (seeded figures are the baseline)
+    catalogue = ProductCatalogue(session_factory=sessions, check_interval=3600)
+    snapshot = await catalogue.ensure_fresh()
+    async with sessions() as db:
+        count, total = (await db.execute(
+            select(RatingAggregate.review_count, RatingAggregate.rating_sum)
+            .where(RatingAggregate.scope == "product", RatingAggregate.subject == "3")
+        )).one()
+    seeded = PRODUCTS[3]
+    assert snapshot.get(3).reviews_count == seeded.reviews_count + count
+    assert snapshot.get(3).rating == round((seeded.rating * seeded.reviews_count + total) / (seeded.reviews_count + count), 1)
+    assert snapshot.get(5).rating == PRODUCTS[5].rating
+    print("✅ Catalogue ratings read from the aggregates")
+    await async_engine.dispose()
+
+async def _failed_write():
+    async_engine, sessions = _sessions("missing_tables.db", tables=())
+    store = ReviewStore(session_factory=sessions, read_session_factory=sessions)
+    store.submit(PRODUCTS[4], 4, "Sturdy copper, good finish", "Dev")
+    failed = False
+    try:
+        await store.flush()
+    except Exception:
+        failed = True
+    assert failed and store.stats["failures"] == 1
+    assert store.get_stats()["buffered"] == 1 and store.get_stats()["pending_aggregate_updates"] == 2
+    await async_engine.dispose()
+
+    # The same buffered review and deltas are written once the database is back
+    async_engine, sessions = _sessions("recovered.db")
+    store.session_factory = sessions
+    assert (await store.flush())["reviews"] == 1
+    await _check_aggregates(sessions)
+    await async_engine.dispose()
+    print("✅ Failed flush keeps the buffer for the next attempt")
+
+class _StalledSession:
+    """A session that never connects, to cancel a flush mid-write"""
+
+    async def __aenter__(self):
+        await asyncio.sleep(3600)
+
+    async def __aexit__(self, *exc):
+        return False
+
+async def _cancel_and_poison():
+    store = ReviewStore(session_factory=_StalledSession, read_session_factory=_StalledSession)
+    store.submit(PRODUCTS[4], 4, "Sturdy copper, good finish", "Dev")
+    flush = asyncio.create_task(store.flush())
+    await asyncio.sleep(0.01)
+    flush.cancel()
+    try:
+        await flush
+    except asyncio.CancelledError:
+        pass
+    assert store.get_stats()["buffered"] == 1 and store.get_stats()["pending_aggregate_updates"] == 2
+    print("✅ Cancelled flush keeps the buffer")
+
+    # A row the database refuses is retried alone and dropped after max_attempts; the rest are written
+    async_engine, sessions = _sessions("poison.db")
+    store.session_factory = store.read_session_factory = sessions
+    poison = store.submit(PRODUCTS[2], 5, "Lovely colours", "Meera")
+    poison["artisan_name"] = None
+    failures = 0
+    for attempt in range(store.max_attempts + 1):
+        store.submit(PRODUCTS[1], 3, f"Warm enough, flush {attempt}", f"Guest {attempt}")
+        try:
+            await store.flush()
+        except Exception:
+            failures += 1
+    assert failures == store.max_attempts + 1
+    assert list(store.failed) == [poison["review_uid"]] and store.stats["given_up"] == 1
+    assert store.get_stats()["buffered"] == 0 and store.get_stats()["retrying"] == 0
+    async with sessions() as db:
+        assert (await db.execute(select(func.count()).select_from(ProductReview))).scalar() == store.max_attempts + 2
+    await _check_aggregates(sessions)
+
+    # stop() ends the loop after a last flush
+    store.submit(PRODUCTS[3], 5, "Fine weave", "Lata")
+    loop = asyncio.create_task(store.run(3600))
+    await asyncio.sleep(0.01)
+    store.stop()
+    await asyncio.wait_for(loop, timeout=5)
+    assert store.get_stats()["buffered"] == 0
+    await async_engine.dispose()
+    print("✅ Failing rows are isolated and dropped, stop() flushes before returning")
+
+def test_moderation_requires_admin_token():
+    """The moderation endpoints answer 403 without a configured token and 401 without the right header"""
+    app = FastAPI()
+    app.include_router(culture.router, prefix="/api/v1/culture")
+    async_engine, sessions = _sessions("admin.db")
+    factories = review_store.session_factory, review_store.read_session_factory
+    review_store.session_factory = review_store.read_session_factory = sessions
+    queue, decide = "/api/v1/culture/reviews/moderation", "/api/v1/culture/reviews/missing/moderation"
+    try:
+        with TestClient(app) as client:
+            settings.review_admin_token = ""
+            assert client.get(queue, headers={"X-Admin-Token": ""}).status_code == 403
+            settings.review_admin_token = "s3cret"
+            for headers in ({}, {"X-Admin-Token": "wrong"}):
+                assert client.get(queue, headers=headers).status_code == 401
+                assert client.post(decide, json={"action": "approve"}, headers=headers).status_code == 401
+            admin = {"X-Admin-Token": "s3cret"}
+            assert client.get(queue, headers=admin).json() == {"total": 0, "reviews": []}
+            assert client.post(decide, json={"action": "approve"}, headers=admin).status_code == 404
+    finally:
+        settings.review_admin_token = ""
+        review_store.session_factory, review_store.read_session_factory = factories
+        asyncio.run(async_engine.dispose())
+    print("✅ Moderation endpoints need the admin token")
+
+def test_write_behind():
+    """Batched inserts, aggregates, moderation and catalogue ratings"""
+    asyncio.run(_write_behind())
+
+def test_failed_write():
+    """Nothing is lost when a flush fails"""
+    asyncio.run(_failed_write())
+
+def test_cancelled_and_failing_rows():
+    """Cancelled flushes restore the buffer; one bad row cannot block later flushes"""
+    asyncio.run(_cancel_and_poison())
+
+if __name__ == "__main__":
+    print("⭐ Testing product reviews...")
+    test_moderation_checks()
+    test_write_behind()
+    test_failed_write()
+    test_cancelled_and_failing_rows()
+    test_moderation_requires_admin_token()
+    print("\n🎉 All product review tests passed!")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for schema migrations
+Adopts databases created by create_all before migrations existed (stamp 0001, upgrade to head) and checks the startup schema modes on scratch SQLite databases
+"""
+
+import asyncio
+import os
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.main as main
+from app.config import settings
+from app.models import Base
+from app.schema_version import SchemaVersionError, alembic_config, check_schema, head_revision, migrate
+
+# Full (created_at, id) indexes that create_all added in the release before migrations
+PRE_MIGRATION_INDEXES = ["users", "cultural_sites", "artisans", "artisan_products", "tourism_places"]
+
+def _baseline(name: str, keyset_indexes: bool = False) -> str:
+    """A database as create_all built it before migrations: baseline tables, no alembic_version"""
+    url = f"sqlite:///{os.path.join(SCRATCH_DIR, name)}"
+    command.upgrade(alembic_config(url, configure_logger=False), "0001")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+        if keyset_indexes:
+            for table in PRE_MIGRATION_INDEXES:
+                conn.execute(text(f"CREATE INDEX ix_{table}_created_at_id ON {table} (created_at, id)"))
+    engine.dispose()
+    return url
+
+def _adopt(url: str):
+    """The documented adoption path: alembic stamp 0001, then alembic upgrade head"""
+    config = alembic_config(url, configure_logger=False)
+    command.stamp(config, "0001")
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == head_revision()
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            expected = {index.name for index in table.indexes}
+            assert expected <= indexes, (table.name, expected - indexes)
+            assert not {f"ix_{table.name}_created_at_id"} & indexes - expected, table.name
+    engine.dispose()
+
+def test_adopt_baseline():
+    """A create_all database from before migrations upgrades to head"""
+    _adopt(_baseline("baseline.db"))
+    print("✅ Baseline database stamped 0001 and upgraded to head")
+
+def test_adopt_with_keyset_indexes():
+    """Full (created_at, id) indexes from the last create_all release are replaced"""
+    _adopt(_baseline("keyset.db", keyset_indexes=True))
+    print("✅ Pre-migration keyset indexes replaced by the partial ones")
+
+def _check(url: str) -> str:
+    async def run():
+        engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        try:
+            return await check_schema(engine)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+def _check_fails(url: str) -> str:
+    try:
+        _check(url)
+    except SchemaVersionError as e:
+        return str(e)
+    raise AssertionError(f"{url} should fail the schema check")
+
+def test_check_schema():
+    """No alembic_version or a stale revision fails fast naming the head; head passes"""
+    empty = f"sqlite:///{os.path.join(SCRATCH_DIR, 'empty.db')}"
+    message = _check_fails(empty)
+    assert "no alembic_version revision" in message and head_revision() in message and "init_db.py migrate" in message
+
+    stale = f"sqlite:///{os.path.join(SCRATCH_DIR, 'stale.db')}"
+    command.upgrade(alembic_config(stale, configure_logger=False), "0003")
+    message = _check_fails(stale)
+    assert "revision 0003" in message and f"expected head {head_revision()}" in message
+
+    assert migrate(stale, configure_logger=False) == head_revision()
+    assert _check(stale) == head_revision()
+    print("✅ Schema check fails fast off head")
+
+def test_migrate_adopts_create_all_database():
+    """migrate stamps a create_all database at the baseline before upgrading"""
+    url = _baseline("adopted.db", keyset_indexes=True)
+    assert "no alembic_version revision" in _check_fails(url)
+    assert migrate(url, configure_logger=False) == head_revision()
+    assert _check(url) == head_revision()
+    print("✅ migrate adopts create_all databases")
+
+def test_startup_records_revision():
+    """The API boots on a database at head and records the revision"""
+    url = f"sqlite:///{os.path.join(SCRATCH_DIR, 'boot.db')}"
+    migrate(url, configure_logger=False)
+    names = ("db_startup_mode", "chat_partition_maintenance_interval", "metrics_flush_interval", "review_flush_interval")
+    saved = {name: getattr(settings, name) for name in names} | {"engine": main.async_engine}
+
+    async def boot():
+        main.async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        try:
+            async with main.lifespan(main.app):
+                return dict(main.app.state.startup)
+        finally:
+            await main.async_engine.dispose()
+
+    try:
+        settings.db_startup_mode = "check"
+        settings.chat_partition_maintenance_interval = settings.metrics_flush_interval = settings.review_flush_interval = 0
+        startup = asyncio.run(boot())
+    finally:
+        main.async_engine = saved.pop("engine")
+        for name, value in saved.items():
+            setattr(settings, name, value)
+    assert startup["schema_mode"] == "check" and startup["schema_revision"] == head_revision()
+    print("✅ Startup check passes at head")
+
+if __name__ == "__main__":
+    print("🧱 Testing schema migrations...")
+    test_adopt_baseline()
+    test_adopt_with_keyset_indexes()
+    test_check_schema()
+    test_migrate_adopts_create_all_database()
+    test_startup_records_revision()
+    print("\n🎉 All schema migration tests passed!")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for full-text search
+Checks Hindi/English analysis, BM25 ranking and incremental reindexing on a scratch SQLite database
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Artisan, CulturalSite, TourismPlace
+from app.search_index import BM25Index, postgres_search_query, search_service
+from app.text_analysis import highlight, tokenize
+
+def _doc(kind, doc_id, title, keywords="", body=""):
+    import hashlib
+    fields = (title, keywords, body)
+    return {
+        "key": (kind, doc_id), "type": kind, "id": doc_id, "title": title,
+        "district": None, "category": None, "fields": fields,
+        "signature": hashlib.blake2b("\x1f".join(fields).encode(), digest_size=8).digest(),
+    }
+
+def test_text_analysis():
+    """Stopwords, English stemming, Hindi normalization/stemming and snippets"""
+    assert tokenize("The Temples of Kedarnath and trekking") == ["temple", "kedarnath", "trek"]
+    assert tokenize("मंदिरों में पूजा") == tokenize("मंदिर पूजा")
+    assert tokenize("पहाड़ियों") == tokenize("पहाडियों")
+
+    snippet = highlight("Kedarnath Temple sits at 3,583 m <near> the Mandakini river.", {"temple", "mandakini"})
+    assert "<mark>Temple</mark>" in snippet and "<mark>Mandakini</mark>" in snippet
+    assert "&lt;near&gt;" in snippet
+    assert highlight("x" * 400, {"temple"}, width=50).endswith("…")
+    print("✅ Text analysis and highlighting")
+
+def test_bm25_ranking_and_updates():
+    """Title matches outrank body matches; upsert/remove keep postings exact"""
+    index = BM25Index()
+    index.upsert(_doc("cultural_site", 1, "Kedarnath Temple", "temple Rudraprayag", "Shiva shrine in the Himalaya"))
+    index.upsert(_doc("tourism_place", 2, "Chopta", "hill_station", "Trek to Tungnath temple from the meadows"))
+    index.upsert(_doc("artisan", 3, "Ramesh", "woodwork Almora", "Carves temple doors"))
+
+    ranked = index.search(tokenize("kedarnath temple"))
+    assert ranked[0][1]["id"] == 1
+    assert {document["id"] for _, document in ranked} == {1, 2, 3}
+    assert [d["id"] for _, d in index.search(tokenize("temple"), kind="artisan")] == [3]
+
+    # Unchanged content is a no-op; changed content replaces the old terms
+    assert not index.upsert(_doc("artisan", 3, "Ramesh", "woodwork Almora", "Carves temple doors"))
+    assert index.upsert(_doc("artisan", 3, "Ramesh", "woodwork Almora", "Carves deodar panels"))
+    assert [d["id"] for _, d in index.search(tokenize("temple"), kind="artisan")] == []
+    assert index.remove(("tourism_place", 2)) and not index.remove(("tourism_place", 2))
+    assert "tungnath" not in index.postings
+    assert len(index) == 2 and index.total_length == sum(index.doc_lengths.values())
+    print("✅ BM25 ranking with incremental updates")
+
+async def _reindex_on_writes():
+    path = os.path.join(SCRATCH_DIR, "search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    for model in (CulturalSite, TourismPlace, Artisan):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(CulturalSite.__table__.insert(), [
+            {"name": "Kedarnath Temple", "location": "Kedarnath", "district": "Rudraprayag",
+             "category": "temple", "description": "One of the twelve Jyotirlingas", "is_active": True},
+        ])
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    search_service.session_factory = session_factory
+    search_service.check_interval = 3600
+
+    results = await search_service.search("jyotirlinga")
+    assert [r["title"] for r in results] == ["Kedarnath Temple"]
+    assert "<mark>Jyotirlingas</mark>" in results[0]["snippet"]
+
+    # ORM writes are reindexed once the transaction commits
+    async with session_factory() as db:
+        db.add(TourismPlace(
+            name="Valley of Flowers", location="Chamoli", district="Chamoli", category="trek",
+            description="Alpine meadows with brahma kamal", activities=["trekking", "photography"]
+        ))
+        await db.commit()
+        await db.rollback()
+    assert search_service._dirty
+    await search_service.refresh()
+    assert [r["title"] for r in await search_service.search("meadows trek")] == ["Valley of Flowers"]
+
+    async with session_factory() as db:
+        db.add(Artisan(name="Rolled back", location="Almora", district="Almora", specialization="meadows"))
+        await db.flush()
+        await db.rollback()
+    assert not search_service._dirty
+
+    # Writes made outside the ORM are picked up by the fingerprint check
+    with engine.begin() as conn:
+        conn.execute(update(CulturalSite.__table__).values(is_active=False, updated_at=datetime(2030, 1, 1)))
+    search_service.invalidate()
+    await search_service.refresh()
+    assert await search_service.search("jyotirlinga") == []
+    assert search_service.get_stats()["documents"] == 1
+
+    await async_engine.dispose()
+    engine.dispose()
+
+def test_reindex_on_writes():
+    """Committed inserts, rolled-back inserts and external updates"""
+    asyncio.run(_reindex_on_writes())
+    print("✅ Incremental reindexing on writes")
+
+def test_postgres_query_compiles():
+    """tsquery/GIN query for the Postgres backend"""
+    sql = str(postgres_search_query("kedarnath temple", None, 10).compile(dialect=postgresql.dialect()))
+    assert "websearch_to_tsquery" in sql and "ts_rank_cd" in sql and "search_vector @@" in sql
+    assert sql.count("UNION ALL") == 2
+    print("✅ Postgres search query")
+
+if __name__ == "__main__":
+    print("🔎 Testing full-text search...")
+    test_text_analysis()
+    test_bm25_ranking_and_updates()
+    test_reindex_on_writes()
+    test_postgres_query_compiles()
+    print("\n🎉 All search tests passed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the suspicious request scanner
+Checks URL and streamed body matching (including patterns split over many chunks), rule loading and the middleware on rejected requests
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.middleware import SecurityMiddleware
+from app.security_scanner import DEFAULT_RULES, SuspiciousRequestScanner, load_rules, security_scanner
+
+def _stream(scanner, chunks):
+    """Feed chunks through wrap_receive; returns the rules reported once the body ends"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    reported = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def run():
+        scanning = scanner.wrap_receive(receive, reported.append)
+        for _ in chunks:
+            await scanning()
+
+    asyncio.run(run())
+    return reported
+
+def test_url_scan():
+    """Path and decoded query string are scanned in one pass"""
+    scanner = SuspiciousRequestScanner()
+    assert scanner.scan_request({"path": "/api/v1/search", "query_string": b"q=%3Cscript%3E"}) == ["xss"]
+    assert scanner.scan_request({"path": "/files/../../etc/passwd", "query_string": b""}) == ["path_traversal"]
+    assert scanner.scan_request({"path": "/api/v1/culture/products", "query_string": b"limit=5"}) == []
+    assert scanner.get_stats()["scanned_requests"] == 3
+    print("✅ URL and query scanning")
+
+def test_body_chunk_boundaries():
+    """A pattern split over chunks, even several shorter than the overlap, is found"""
+    scanner = SuspiciousRequestScanner()
+    assert _stream(scanner, [b'{"comment": "<scri', b'pt>"}']) == [["xss"]]
+    # "etc/passwd" (10 bytes) arrives one byte per chunk
+    body = b'{"path": "/etc/passwd"}'
+    assert _stream(scanner, [body[i:i + 1] for i in range(len(body))]) == [["path_traversal"]]
+    assert _stream(scanner, [b'{"a": "ev', b"a", b"l", b'(1)"}']) == [["code_injection"]]
+    assert _stream(scanner, [b'{"comment": "lovely ', b'shawl"}']) == []
+
+    # Only the first max_body_bytes are inspected
+    bounded = SuspiciousRequestScanner(max_body_bytes=16)
+    assert _stream(bounded, [b"x" * 16, b"<script>"]) == []
+    print("✅ Body matches across chunk boundaries")
+
+def test_load_rules():
+    """Rule files accept lists or a single string; bad files fall back to the defaults"""
+    path = os.path.join(SCRATCH_DIR, "rules.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"secrets": "api_key", "xss": ["<script", "javascript:"]}, f)
+    assert load_rules(path) == {"secrets": ["api_key"], "xss": ["<script", "javascript:"]}
+    assert SuspiciousRequestScanner(load_rules(path)).scan_request({"path": "/x", "query_string": b"api_key=1"}) == ["secrets"]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("not json")
+    assert load_rules(path) is DEFAULT_RULES
+    assert load_rules(None) is DEFAULT_RULES
+    print("✅ Rule loading")
+
+class Comment(BaseModel):
+    rating: int
+    comment: str
+
+def test_middleware_on_rejected_request():
+    """Bodies are still scanned when the route rejects the request with a 4xx"""
+    app = FastAPI()
+    app.add_middleware(SecurityMiddleware)
+
+    @app.post("/comments")
+    async def add_comment(comment: Comment):
+        return {"ok": True}
+
+    before = security_scanner.match_counts["xss"]
+    with TestClient(app) as client:
+        assert client.post("/comments", json={"rating": 5, "comment": "fine"}).status_code == 200
+        response = client.post("/comments", json={"rating": "five", "comment": "<script>alert(1)</script>"})
+        assert response.status_code == 422
+        assert client.get("/missing?q=<script>").status_code == 404
+    assert security_scanner.match_counts["xss"] == before + 2
+    print("✅ Middleware scans bodies of rejected requests")
+
+if __name__ == "__main__":
+    print("🛡️  Testing security scanner...")
+    test_url_scan()
+    test_body_chunk_boundaries()
+    test_load_rules()
+    test_middleware_on_rejected_request()
+    print("\n🎉 All security scanner tests passed!")